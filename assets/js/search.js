@@ -0,0 +1,132 @@
+/* OX500 search client — reads the sharded index written by `build.py --search`.
+ *
+ *   ox500Search("machine dream").then(results => ...)
+ *   // [{id, title, url, date, score}, ...] best first
+ *
+ * Only /search/meta.json, the term shards of the query words and the doc blocks
+ * of the hits are fetched. Words must all match; the last one also matches as a prefix.
+ *
+ * Every form[data-ox500-search] (the box `build.py --search` adds to each page) gets
+ * live results: hits are listed as links in its .site-search-results list.
+ */
+(function () {
+  "use strict";
+
+  var ROOT = "/search/";
+  var STOPWORDS = new Set(("a an and are as at be but by for from in is it " +
+    "of on or that the this to was with").split(" "));
+  var cache = new Map();
+
+  function getJSON(path) {
+    if (!cache.has(path)) {
+      cache.set(path, fetch(ROOT + path).then(function (r) {
+        return r.ok ? r.json() : {};
+      }));
+    }
+    return cache.get(path);
+  }
+
+  // same rules as build.py search_tokens()
+  function tokens(text) {
+    var words = (text || "").toLowerCase().match(/[\p{L}\p{N}]+(?:['’][\p{L}\p{N}]+)*/gu) || [];
+    return words.map(function (w) { return w.replace(/['’]/g, ""); })
+      .filter(function (w) { return w.length >= 2 && !STOPWORDS.has(w); });
+  }
+
+  function shardName(term, prefixLen) {
+    var prefix = Array.from(term).slice(0, prefixLen).join("");
+    if (/^[a-z0-9]+$/.test(prefix)) return prefix;
+    return "u" + Array.from(prefix).map(function (c) { return c.codePointAt(0).toString(16); }).join("-");
+  }
+
+  function postings(shard, term, prefix) {
+    // id -> weight; the last query word also matches longer terms ("drea" -> "dream", "dreams")
+    var out = new Map();
+    Object.keys(shard).forEach(function (t) {
+      if (t !== term && !(prefix && t.startsWith(term))) return;
+      var flat = shard[t];
+      for (var i = 0; i < flat.length; i += 2) {
+        out.set(flat[i], (out.get(flat[i]) || 0) + flat[i + 1]);
+      }
+    });
+    return out;
+  }
+
+  function search(query, limit) {
+    var words = tokens(query);
+    if (!words.length) return Promise.resolve([]);
+    return getJSON("meta.json").then(function (meta) {
+      var shards = new Set(meta.shards || []);
+      return Promise.all(words.map(function (w) {
+        var name = shardName(w, meta.prefix_len);
+        return shards.has(name) ? getJSON("t/" + name + ".json") : Promise.resolve({});
+      })).then(function (loaded) {
+        var scores = null;
+        words.forEach(function (w, i) {
+          var p = postings(loaded[i], w, i === words.length - 1);
+          if (scores === null) {
+            scores = p;
+            return;
+          }
+          scores.forEach(function (score, id) {
+            if (p.has(id)) scores.set(id, score + p.get(id));
+            else scores.delete(id);
+          });
+        });
+        var hits = Array.from(scores.entries())
+          .sort(function (a, b) { return b[1] - a[1] || b[0] - a[0]; })
+          .slice(0, limit || 50);
+        // doc blocks are cached, so each block is fetched once however many hits it holds
+        return Promise.all(hits.map(function (h) {
+          return getJSON("d/" + Math.floor(h[0] / meta.docs_block) + ".json").then(function (docs) {
+            var d = docs[String(h[0])] || ["", "", ""];
+            return { id: h[0], title: d[0], url: d[1], date: d[2], score: h[1] };
+          });
+        }));
+      });
+    });
+  }
+
+  function bind(form) {
+    var input = form.elements.q;
+    var list = form.querySelector(".site-search-results");
+    var timer = null;
+
+    function show() {
+      var query = input.value;
+      if (!query.trim()) {
+        list.textContent = "";
+        return;
+      }
+      search(query, 20).then(function (hits) {
+        if (input.value !== query) return;  // a newer query is on its way
+        list.textContent = "";
+        hits.forEach(function (h) {
+          var li = document.createElement("li");
+          var a = document.createElement("a");
+          a.href = h.url;
+          a.textContent = h.title + " — " + h.date;
+          li.appendChild(a);
+          list.appendChild(li);
+        });
+        if (!hits.length) {
+          var none = document.createElement("li");
+          none.textContent = "NO SIGNAL";
+          list.appendChild(none);
+        }
+      });
+    }
+
+    form.addEventListener("submit", function (e) {
+      e.preventDefault();
+      show();
+    });
+    input.addEventListener("input", function () {
+      clearTimeout(timer);
+      timer = setTimeout(show, 200);
+    });
+  }
+
+  window.ox500Search = search;
+  document.querySelectorAll("form[data-ox500-search]").forEach(bind);
+})();
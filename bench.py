@@ -0,0 +1,356 @@
+"""OX500 build benchmarks.
+
+    python bench.py render [--pages N]
+    python bench.py micro [--number N]
+    python bench.py generate --logs N --out FILE [archive options]
+    python bench.py build --logs N [--logs M ...] [archive options] [--build-args="--jobs 4 --stream"]
+
+Every command takes --save FILE (JSON results) and --compare FILE (a previous --save).
+"""
+import argparse
+import html
+import json
+import os
+import random
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from datetime import date, timedelta
+from pathlib import Path
+
+import build
+
+# what a build needs besides the archive; copied into a scratch tree per run
+BUILD_TREE = ("build.py", "template-index.html", "template-log.html", "template-series.html", "style.css", "assets")
+
+WORDS = (
+    "signal noise static core breach archive node pulse scream machine dream burn wire ghost "
+    "rust veins loop error system memory silence fire glass code spark cold light dark "
+    "collapse drift frame grid echo fracture override mirror void lattice shell"
+).split()
+
+
+def legacy_render(template: str, mapping: dict) -> str:
+    # render() before compiled templates: one full pass over the template per key
+    out = template
+    for k, v in mapping.items():
+        out = out.replace("{{" + k + "}}", v)
+    return out
+
+
+def sample_log_mapping(site: dict, log: dict) -> dict:
+    base_url = site["base_url"].rstrip("/")
+    y, m = build.ym_from_date(log.get("date", ""))
+    url_path = f"/logs/{y}/{m}/log-{log['id']}-{log['slug']}.html"
+    page_title = f"LOG {log['id']} // {log['title']} — OX500"
+    return {
+        "LANG": site.get("default_lang", "en"),
+        "PAGE_TITLE": html.escape(page_title),
+        "DESCRIPTION": html.escape(f"{log.get('title', '')} — {log.get('excerpt', '')[:150]}"),
+        "CANONICAL": f"{base_url}{url_path}",
+        "OG_TITLE": html.escape(page_title),
+        "OG_DESC": html.escape(log.get("excerpt", "")[:200]),
+        "OG_IMAGE": site["og_image"],
+        "JSONLD": build.jsonld_article(
+            base_url, url_path, page_title, log.get("date", ""), site["og_image"], site.get("github", "")
+        ),
+        "LOG_ID": html.escape(log["id"]),
+        "LOG_TITLE": html.escape(log["title"]),
+        "LOG_DATE": html.escape(log.get("date", "")),
+        "LOG_TEXT": html.escape(log.get("text", "").rstrip()) + "\n",
+        "NODE_META": "",
+        "FULL_NAV": '<a class="nav-home" href="/" rel="home">← CORE INTERFACE</a>',
+        "YOUTUBE": site["youtube"],
+        "BANDCAMP": site.get("bandcamp", ""),
+        "GITHUB": site.get("github", ""),
+        "BASE_URL": base_url,
+    }
+
+
+def bench_render(pages: int) -> dict:
+    cfg = json.loads(build.read_text(build.ROOT / "logs.json"))
+    site = cfg["site"]
+    base_url = site["base_url"].rstrip("/")
+    log = dict(cfg["logs"][0], slug=build.slugify(cfg["logs"][0].get("slug", "")))
+    mapping = sample_log_mapping(site, log)
+
+    src = build.read_text(build.ROOT / "template-log.html")
+    compiled = build.compile_template(
+        build.rewrite_css_links(src, base_url), "template-log.html", build.LOG_TEMPLATE_KEYS
+    )
+
+    def legacy():
+        return build.rewrite_css_links(legacy_render(src, mapping), base_url)
+
+    def current():
+        return build.render(compiled, mapping)
+
+    if legacy() != current():
+        raise SystemExit("render mismatch: compiled template output differs from legacy render()")
+
+    legacy_s = min(timeit.repeat(legacy, number=pages, repeat=5))
+    current_s = min(timeit.repeat(current, number=pages, repeat=5))
+    return {
+        "pages": pages,
+        "legacy_us_per_page": legacy_s / pages * 1e6,
+        "compiled_us_per_page": current_s / pages * 1e6,
+        "speedup": legacy_s / current_s,
+    }
+
+
+# ---------------------------
+# MICRO BENCHMARKS
+# ---------------------------
+def bench_micro(number: int) -> dict:
+    """µs per call of the per-log hot helpers."""
+    cfg = json.loads(build.read_text(build.ROOT / "logs.json"))
+    site = cfg["site"]
+    base_url = site["base_url"].rstrip("/")
+    log = dict(cfg["logs"][0], slug=build.slugify(cfg["logs"][0].get("slug", "")))
+    mapping = sample_log_mapping(site, log)
+    compiled = build.compile_template(
+        build.rewrite_css_links(build.read_text(build.ROOT / "template-log.html"), base_url),
+        "template-log.html",
+        build.LOG_TEMPLATE_KEYS,
+    )
+    cases = {
+        "slugify": lambda: build.slugify("I’M NOT DONE — Static in my veins, still walkin’"),
+        "disruption_display_name": lambda: build.disruption_display_name("DISRUPTION_SERIES // ARCHIVE SNAPSHOT"),
+        "render": lambda: build.render(compiled, mapping),
+        "jsonld_article": lambda: build.jsonld_article(
+            base_url, "/logs/2025/12/log-01612-im-not-done.html", "LOG 01612 // I’M NOT DONE", "2025-12-07",
+            site["og_image"], site.get("github", ""), "ARCHIVE SNAPSHOT", f"{base_url}/disruption/archive-snapshot.html",
+        ),
+    }
+    return {name: min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6 for name, fn in cases.items()}
+
+
+# ---------------------------
+# SYNTHETIC ARCHIVES
+# ---------------------------
+def generate_archive(
+    path: Path,
+    logs: int,
+    text_lines: tuple = (4, 40),
+    disruptions: int = 40,
+    years: tuple = (2015, 2025),
+    future: float = 0.01,
+    seed: int = 1,
+) -> dict:
+    """Write a logs.json with `logs` synthetic entries, streamed (1M logs never sit in memory).
+
+    Ids ascend with dates like the real archive; `future` is the share of entries dated after
+    today, which the build must drop. Returns a summary of what was written.
+    """
+    rng = random.Random(seed)
+    site = json.loads(build.read_text(build.ROOT / "logs.json"))["site"]
+    start = date(years[0], 1, 1)
+    span = (date(years[1], 12, 31) - start).days
+    today = date.today()
+    n_future = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"site": ' + json.dumps(site, ensure_ascii=False) + ',\n"logs": [\n')
+        for i in range(logs):
+            if rng.random() < future:
+                d = today + timedelta(days=rng.randint(1, 365))
+                n_future += 1
+            else:
+                d = min(start + timedelta(days=span * i // max(1, logs - 1)), today)
+            title_words = rng.sample(WORDS, rng.randint(2, 5))
+            lines = [" ".join(rng.choices(WORDS, k=rng.randint(3, 9))) for _ in range(rng.randint(*text_lines))]
+            k = rng.randrange(disruptions)  # one draw: exactly `disruptions` distinct series
+            record = {
+                "id": f"{i + 1:05d}",
+                "title": " ".join(title_words).upper(),
+                "date": d.isoformat(),
+                "tag": "DISRUPTION",
+                "series": f"DISRUPTION_SERIES // {WORDS[k % len(WORDS)].upper()} {k}",
+                "slug": "-".join(title_words),
+                "excerpt": lines[0],
+                "text": "\n".join(lines),
+            }
+            f.write(("," if i else "") + json.dumps(record, ensure_ascii=False) + "\n")
+        f.write("]}\n")
+    return {"logs": logs, "future": n_future, "bytes": path.stat().st_size}
+
+
+# ---------------------------
+# BUILD BENCHMARKS
+# ---------------------------
+def run_measured(cmd: list, cwd: Path) -> dict:
+    """Run cmd, return wall time and the peak RSS of that process (and its waited-for workers)."""
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - t0
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode:
+        raise SystemExit(f"{' '.join(cmd)} failed with exit code {proc.returncode}")
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    return {"wall_s": round(wall, 3), "cpu_s": round(usage.ru_utime + usage.ru_stime, 3), "peak_rss_bytes": rss}
+
+
+def tree_size(path: Path) -> tuple:
+    files = size = 0
+    for root, _, names in os.walk(path, followlinks=True):
+        for name in names:
+            files += 1
+            size += os.stat(os.path.join(root, name)).st_size
+    return files, size
+
+
+def bench_build(logs: int, build_args: list, keep: bool = False, **archive) -> dict:
+    """Full build, then an --incremental rebuild with nothing changed, in a scratch tree."""
+    work = Path(tempfile.mkdtemp(prefix=f"ox500-bench-{logs}-"))
+    try:
+        for name in BUILD_TREE:
+            src = build.ROOT / name
+            if src.is_dir():
+                shutil.copytree(src, work / name)
+            elif src.exists():
+                shutil.copy2(src, work / name)
+        summary = generate_archive(work / "logs.json", logs, **archive)
+        cmd = [sys.executable, "build.py", *build_args]
+        full = run_measured(cmd, work)
+        files, size = tree_size(work / "dist")
+        noop = run_measured(cmd + ["--incremental"], work)
+        return {
+            "logs": logs,
+            "future": summary["future"],
+            "archive_bytes": summary["bytes"],
+            "build_args": build_args,
+            "full": full,
+            "incremental_noop": noop,
+            "output_files": files,
+            "output_bytes": size,
+        }
+    finally:
+        if keep:
+            print(f"kept {work}")
+        else:
+            shutil.rmtree(work, ignore_errors=True)
+
+
+# ---------------------------
+# RESULTS
+# ---------------------------
+def compare(current, previous, path: str = "") -> list:
+    """[(path, previous, current, ratio)] for every numeric leaf present in both."""
+    rows = []
+    if isinstance(current, dict) and isinstance(previous, dict):
+        for k in current:
+            if k in previous:
+                rows += compare(current[k], previous[k], f"{path}.{k}" if path else str(k))
+    elif isinstance(current, list) and isinstance(previous, list):
+        for i, (c, p) in enumerate(zip(current, previous)):
+            rows += compare(c, p, f"{path}[{i}]")
+    elif isinstance(current, (int, float)) and isinstance(previous, (int, float)) and not isinstance(current, bool):
+        rows.append((path, previous, current, current / previous if previous else None))
+    return rows
+
+
+def print_results(cmd: str, results) -> None:
+    if cmd == "render":
+        print(f"legacy render + rewrite_css_links: {results['legacy_us_per_page']:8.2f} µs/page")
+        print(f"compiled template:                 {results['compiled_us_per_page']:8.2f} µs/page")
+        print(f"speedup: x{results['speedup']:.1f}")
+    elif cmd == "micro":
+        for name, us in results.items():
+            print(f"{name:<26}{us:10.3f} µs/call")
+    elif cmd == "generate":
+        print(f"{results['logs']:,} logs ({results['future']:,} future-dated), {results['bytes']:,} bytes")
+    elif cmd == "build":
+        print(f"{'logs':>10}{'full s':>9}{'rss MB':>9}{'noop s':>9}{'rss MB':>9}{'files':>10}{'out MB':>9}")
+        for r in results:
+            print(
+                f"{r['logs']:>10,}{r['full']['wall_s']:>9.2f}{r['full']['peak_rss_bytes'] / 2**20:>9.0f}"
+                f"{r['incremental_noop']['wall_s']:>9.2f}{r['incremental_noop']['peak_rss_bytes'] / 2**20:>9.0f}"
+                f"{r['output_files']:>10,}{r['output_bytes'] / 2**20:>9.1f}"
+            )
+
+
+def span(value: str) -> tuple:
+    lo, _, hi = value.partition(":")
+    return int(lo), int(hi or lo)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OX500 build benchmarks")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--save", type=Path, metavar="FILE", help="write results as JSON")
+    common.add_argument("--compare", type=Path, metavar="FILE", help="print ratios against a previous --save")
+    archive = argparse.ArgumentParser(add_help=False)
+    archive.add_argument("--text-lines", type=span, default=(4, 40), metavar="MIN:MAX", help="lines of text per log")
+    archive.add_argument("--disruptions", type=int, default=40, help="number of distinct disruption series")
+    archive.add_argument("--years", type=span, default=(2015, 2025), metavar="FROM:TO", help="date spread")
+    archive.add_argument("--future", type=float, default=0.01, help="share of future-dated logs (dropped by the build)")
+    archive.add_argument("--seed", type=int, default=1)
+
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_render = sub.add_parser(
+        "render", parents=[common], help="per-page render cost: str.replace loop vs compiled template"
+    )
+    p_render.add_argument("--pages", type=int, default=5000)
+    p_micro = sub.add_parser(
+        "micro", parents=[common], help="slugify / disruption_display_name / render / jsonld_article per call"
+    )
+    p_micro.add_argument("--number", type=int, default=20000)
+    p_gen = sub.add_parser("generate", parents=[common, archive], help="write a synthetic logs.json")
+    p_gen.add_argument("--logs", type=int, required=True)
+    p_gen.add_argument("--out", type=Path, required=True)
+    p_build = sub.add_parser(
+        "build", parents=[common, archive], help="build time, peak RSS and output size on synthetic archives"
+    )
+    p_build.add_argument("--logs", type=int, action="append", required=True, help="archive size (repeatable)")
+    p_build.add_argument("--build-args", default="", help='extra build.py arguments, e.g. --build-args="--jobs 4 --stream"')
+    p_build.add_argument("--keep", action="store_true", help="keep the scratch trees")
+    args = parser.parse_args(argv)
+
+    if args.cmd in ("generate", "build"):
+        archive_opts = {
+            "text_lines": args.text_lines,
+            "disruptions": args.disruptions,
+            "years": args.years,
+            "future": args.future,
+            "seed": args.seed,
+        }
+    if args.cmd == "render":
+        results = bench_render(args.pages)
+    elif args.cmd == "micro":
+        results = bench_micro(args.number)
+    elif args.cmd == "generate":
+        results = generate_archive(args.out, args.logs, **archive_opts)
+    else:
+        results = [bench_build(n, shlex.split(args.build_args), args.keep, **archive_opts) for n in args.logs]
+    print_results(args.cmd, results)
+
+    if args.compare:
+        previous = json.loads(args.compare.read_text(encoding="utf-8"))["results"]
+        print(f"vs {args.compare}:")
+        for path, old, new, ratio in compare(results, previous):
+            print(f"  {path:<40}{old:>14,.3f} → {new:>14,.3f}" + (f"  x{ratio:.2f}" if ratio is not None else ""))
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(
+            json.dumps(
+                {
+                    "command": args.cmd,
+                    "argv": sys.argv[1:] if argv is None else list(argv),
+                    "python": sys.version.split()[0],
+                    "build_py": build.file_hash(build.ROOT / "build.py"),
+                    "results": results,
+                },
+                ensure_ascii=False,
+                indent=1,
+            ),
+            encoding="utf-8",
+        )
+
+
+if __name__ == "__main__":
+    main()
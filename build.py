@@ -1,10 +1,49 @@
+import argparse
+import codecs
+import cProfile
+import gzip
+import hashlib
+import heapq
+import hmac
+import http.client
+import io
 import json
+import mimetypes
+import os
+import posixpath
+import pstats
 import re
 import shutil
-from datetime import datetime, timezone
+import tarfile
+import tempfile
+import threading
+import time
+import tracemalloc
+import zipfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache, partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from urllib.parse import quote, unquote, urlsplit
 import html
 
+try:  # optional: .br siblings
+    import brotli
+except ImportError:
+    brotli = None
+
+try:  # optional: --optimize-images
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = ImageOps = None
+
+try:  # optional: .zst siblings
+    import zstandard
+except ImportError:
+    zstandard = None
+
 ROOT = Path(__file__).parent
 DIST = ROOT / "dist"
 
@@ -21,10 +60,163 @@ ASSETS_DIST = DIST / "assets"
 BG_SRC = ASSETS_SRC / "bg"
 BG_DIST = ASSETS_DIST / "bg"
 ICONS_SRC = ASSETS_SRC / "icons"
+# Node / archive listings: logs per page (page 1 = newest, rest under <page>/page/N.html)
+LIST_PAGE_SIZE = 500
+
 # HOME: ile disruptions pokazać i ile logów w preview
 HOME_DISRUPTION_LIMIT = 3
 HOME_DISRUPTION_PREVIEW_LOGS = 6
 
+# Incremental builds: hashes of every input + per-page dependency keys
+CACHE_DIR = ROOT / ".build-cache"
+BUILD_MANIFEST = CACHE_DIR / "manifest.json"
+BUILD_MANIFEST_VERSION = 1
+
+# Optional sharded sources: logs/*.json, same {"site"?, "logs": [...]} schema as logs.json
+# (e.g. one file per disruption or per month). Pass-1 indexes are cached per file.
+LOGS_DIR = ROOT / "logs"
+SOURCE_CACHE_DIR = CACHE_DIR / "sources"
+
+# Added / changed / deleted dist/ paths of the last build (for delta deploys)
+CHANGES_PATH = CACHE_DIR / "changes.json"
+
+# --if-needed: key of the last build's inputs + the next day its output changes on its own
+# (a future-dated log goes live, a retired fingerprinted asset expires)
+RELEASE_STAMP = CACHE_DIR / "release.json"
+
+# serve / watch: source polling interval, settle time after a change, live reload endpoint
+WATCH_INTERVAL = 0.1
+WATCH_SETTLE = 0.05
+LIVE_RELOAD_PATH = "/__build"
+LIVE_RELOAD_WAIT = 25  # seconds a reload long-poll is held open
+
+# Staged builds: dist/ is a symlink to the live generation in GENERATIONS_DIR
+GENERATIONS_DIR = ROOT / ".dist-gens"
+KEEP_GENERATIONS = 2
+STAGING_MAX_AGE = 24 * 3600  # seconds; where process liveness can't be checked (Windows), older stages are leftovers
+
+# Streamed release archives (ArchiveOutput): format -> tarfile stream mode (None = zip)
+ARCHIVE_MODES = {"tar": "w|", "tar.gz": "w|gz", "tgz": "w|gz", "tar.xz": "w|xz", "zip": None}
+
+# deploy: dist/ -> S3-compatible bucket; the remote manifest records what is live there
+DEPLOY_MANIFEST_KEY = ".deploy-manifest.json"
+DEPLOY_MANIFEST_VERSION = 1
+DEPLOY_CONNECTIONS = 16
+DEPLOY_RETRIES = 4  # per request, on connection errors / 5xx / 429, with backoff
+DEPLOY_TIMEOUT = 60
+DEPLOY_CACHE_CONTROL = "public, max-age=300"
+DEPLOY_CACHE_IMMUTABLE = "public, max-age=31536000, immutable"  # fingerprinted names (--fingerprint)
+DEPLOY_CACHE_NONE = "no-cache"  # sw.js: browsers must see a new worker on their next visit
+DEPLOY_ENCODINGS = {"gz": "gzip", "br": "br", "zst": "zstd"}  # precompressed sibling suffix -> Content-Encoding
+DEPLOY_CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".js": "text/javascript; charset=utf-8",
+    ".mjs": "text/javascript; charset=utf-8",
+    ".json": "application/json",
+    ".xml": "application/xml",
+    ".txt": "text/plain; charset=utf-8",
+    ".webmanifest": "application/manifest+json",
+    ".svg": "image/svg+xml",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+    ".avif": "image/avif",
+    ".gif": "image/gif",
+    ".ico": "image/x-icon",
+    ".woff": "font/woff",
+    ".woff2": "font/woff2",
+    ".gz": "application/gzip",  # a file that is gzip, not a gzip-encoded sibling (sitemaps/*.xml.gz)
+}
+
+# --compress: precompressed siblings for static servers (gzip_static / brotli_static)
+COMPRESSIBLE_SUFFIXES = {".html", ".css", ".xml", ".txt", ".js", ".json", ".svg", ".webmanifest"}
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+ZSTD_LEVEL = 19
+COMPRESSION_REPORT = CACHE_DIR / "compression.json"
+
+# --optimize-css: minified stylesheet + critical CSS inlined per template
+CSS_REPORT = CACHE_DIR / "css-report.json"
+
+# --optimize-images: recompressed rasters + OG / logo variants (needs Pillow)
+IMAGE_CACHE_DIR = CACHE_DIR / "images"
+IMAGE_PIPELINE_VERSION = "1"
+IMAGE_DIRS = ("img", "bg")
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp"}
+IMAGE_MAX_SIZE = (1920, 1920)
+IMAGE_QUALITY = {"JPEG": 82, "WEBP": 75}
+# variant -> (box, fit, format); published as assets/img/<stem>.<variant>.<ext>
+IMAGE_VARIANTS = {
+    "og": ((1200, 630), "cover", "JPEG"),  # og:image / twitter:image (summary_large_image)
+    "logo": ((512, 512), "contain", "WEBP"),  # JSON-LD publisher logo
+}
+IMAGE_FORMAT_SUFFIX = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp"}
+# PNGs still over this once recompressed also get assets/.../<stem>.compact.webp at IMAGE_MAX_SIZE;
+# templates and style.css point at that copy, the PNG stays for outside links
+IMAGE_COMPACT_MIN_BYTES = 256 * 1024
+IMAGE_COMPACT_FORMAT = "WEBP"
+
+# --profile: per-phase timing report
+PROFILE_REPORT = CACHE_DIR / "profile.json"
+PROFILE_PSTATS = CACHE_DIR / "profile.pstats"
+PROFILE_TOP_PAGES = 15
+
+# --api: static JSON API + feeds
+API_DIR = Path("api")
+API_PAGE_SIZE = 100
+FEED_SIZE = 20
+JSON_FEED_REL_PATH = Path("feed.json")
+ATOM_FEED_REL_PATH = Path("atom.xml")
+
+# --search: client-side full-text index, sharded by term prefix
+SEARCH_DIR = Path("search")
+SEARCH_INDEX_VERSION = 1
+SEARCH_PREFIX_LEN = 2
+SEARCH_DOCS_BLOCK = 1000
+SEARCH_FIELDS = (("title", 3), ("excerpt", 2), ("text", 1))
+SEARCH_CACHE = CACHE_DIR / "search.json"
+SEARCH_SCRIPT_REL = Path("assets") / "js" / "search.js"  # client; published only with --search
+
+# sitemap.xml is an index of sitemaps/<type>.xml children (protocol limits per child)
+SITEMAP_DIR = Path("sitemaps")
+SITEMAP_MAX_URLS = 50_000
+SITEMAP_MAX_BYTES = 50 * 1024 * 1024
+
+# --service-worker: /sw.js precaches the page shell (stylesheet, background, favicon) by content hash
+SW_REL_PATH = Path("sw.js")
+SW_CACHE_VERSION = 1  # bump when the worker's cache layout changes
+SW_HASH_LEN = 16
+SW_PAGE_CACHE_LIMIT = 200  # visited / prefetched pages kept for repeat visits
+
+# --audit: page-weight budgets in bytes per page type (0 = no limit); a page over one fails the build
+AUDIT_REPORT = CACHE_DIR / "audit.json"
+AUDIT_CACHE = CACHE_DIR / "audit-cache.json"  # page sha256 -> [html bytes, gzip bytes, asset refs]
+AUDIT_GZIP_LEVEL = 6  # what servers typically use for on-the-fly gzip
+AUDIT_TOP_PAGES = 20
+AUDIT_MAX_LISTED = 200  # over-budget entries listed in the report (all are counted)
+AUDIT_METRICS = ("html_bytes", "gzip_bytes", "asset_count", "asset_bytes")
+# what a browser fetches to show a page (sitemaps, feeds, ... linked from <head> are not page weight)
+AUDIT_ASSET_SUFFIXES = {
+    ".css", ".js", ".mjs", ".png", ".jpg", ".jpeg", ".webp", ".avif", ".gif", ".svg", ".ico", ".woff", ".woff2",
+}
+PAGE_BUDGETS = {
+    "log": {"html_bytes": 50_000, "gzip_bytes": 15_000, "asset_count": 10, "asset_bytes": 300_000},
+    "node": {"html_bytes": 250_000, "gzip_bytes": 40_000, "asset_count": 10, "asset_bytes": 300_000},
+    "archive": {"html_bytes": 250_000, "gzip_bytes": 40_000, "asset_count": 10, "asset_bytes": 300_000},
+    "index": {"html_bytes": 60_000, "gzip_bytes": 15_000, "asset_count": 10, "asset_bytes": 300_000},
+}
+
+# --check-links: internal href / src / url() / sitemap <loc> of every generated page, resolved before publish
+LINK_REPORT = CACHE_DIR / "links.json"
+LINK_MAX_LISTED = 500  # broken links / orphans / unused assets listed in the report (all are counted)
+
+# --fingerprint: hashed asset names + map of /assets/<path> -> hashed URL
+ASSET_MAP_REL = Path("assets") / "asset-map.json"
+ASSET_HASH_LEN = 10
+ASSET_RETENTION_DAYS = 30
+
 
 def slugify(s: str) -> str:
     s = (s or "").lower().strip()
@@ -43,550 +235,3513 @@ def write_text(path: Path, content: str) -> None:
     path.write_text(content, encoding="utf-8")
 
 
-def render(template: str, mapping: dict) -> str:
-    out = template
-    for k, v in mapping.items():
-        out = out.replace("{{" + k + "}}", v)
-    return out
+# ---------------------------
+# HASHING / BUILD MANIFEST
+# ---------------------------
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
 
 
-def rewrite_css_links(html_str: str, base_url: str) -> str:
-    """Rewrite any hardcoded /style.css references to /assets/css/style.css.
+def text_hash(s: str) -> str:
+    return sha256_bytes(s.encode("utf-8"))
 
-    This lets you migrate CSS location without immediately editing every template,
-    and keeps fallback templates working.
-    """
-    if not html_str:
-        return html_str
 
-    # Common absolute + relative patterns
-    html_str = html_str.replace('href="/style.css"', 'href="/assets/css/style.css"')
-    html_str = html_str.replace("href='/style.css'", "href='/assets/css/style.css'")
+# json.dumps() with non-default options builds a new encoder per call; record_hash runs per log
+_RECORD_ENCODER = json.JSONEncoder(ensure_ascii=False, sort_keys=True, separators=(",", ":"))
 
-    # Replace absolute base_url/style.css (if present)
-    if base_url:
-        html_str = html_str.replace(f'href="{base_url}/style.css"', f'href="{base_url}/assets/css/style.css"')
-        html_str = html_str.replace(f"href='{base_url}/style.css'", f"href='{base_url}/assets/css/style.css'")
 
-    # Historical hardcode
-    html_str = html_str.replace('href="https://ox500.com/style.css"', 'href="https://ox500.com/assets/css/style.css"')
-    html_str = html_str.replace("href='https://ox500.com/style.css'", "href='https://ox500.com/assets/css/style.css'")
+def record_hash(obj) -> str:
+    """Stable hash of a JSON-able value (key order does not matter)."""
+    return text_hash(_RECORD_ENCODER.encode(obj))
 
-    return html_str
 
+def file_hash(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
 
-def normalize_date(date_str: str) -> str:
-    s = (date_str or "").strip()
+
+def dep_key(*parts: str) -> str:
+    """Combine dependency hashes into a single key for one output file."""
+    return text_hash("|".join(parts))
+
+
+def load_manifest(path: Path = BUILD_MANIFEST) -> dict:
     try:
-        d = datetime.fromisoformat(s)
-        return d.date().isoformat()
-    except Exception:
-        return datetime.now(timezone.utc).date().isoformat()
+        manifest = json.loads(read_text(path))
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != BUILD_MANIFEST_VERSION:
+        return {}
+    return manifest
 
 
-def ym_from_date(date_str: str):
+def save_manifest(manifest: dict, path: Path = BUILD_MANIFEST) -> None:
+    # compact: the C encoder, instead of the pure-Python one indent= falls back to
+    write_text(path, json.dumps(manifest, ensure_ascii=False, separators=(",", ":"), sort_keys=True))
+
+
+def link_or_copy(src: Path, dst: Path) -> None:
+    """Reuse an unchanged file from the previous generation: hardlink, or copy across filesystems."""
+    if src == dst:  # in-place build (serve / watch): already there
+        return
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    # in-place builds can hit an existing dst: swap it, never write through its inode
+    tmp = dst.with_name(dst.name + ".tmp") if dst.exists() else dst
     try:
-        d = datetime.fromisoformat((date_str or "").strip())
-    except Exception:
-        d = datetime.now(timezone.utc)
-    return f"{d.year:04d}", f"{d.month:02d}"
+        os.link(src, tmp)
+    except OSError:
+        shutil.copy2(src, tmp)
+    if tmp != dst:
+        os.replace(tmp, dst)
 
 
-# ---------------------------
-# DISRUPTION / SERIES CLEANUP
-# ---------------------------
-def disruption_display_name(raw: str) -> str:
+def write_output(rel: Path, data: bytes, out_dir: Path, prev_dir: Path = None) -> tuple:
+    """Write out_dir/<rel>, reusing prev_dir/<rel> when it already holds exactly these bytes.
+
+    Reused files are hardlinked (same inode, old mtime), so rsync / CDN uploaders see only
+    real changes and nothing is copied twice.
+    -> (rel posix path, sha256 of data, "added" | "changed" | "unchanged")
     """
-    Zamienia np:
-      'DISRUPTION_SERIES // I'M NOT DONE' -> 'I'M NOT DONE'
-      'DISRUPTION // WRITE AI TO CONTINUE' -> 'WRITE AI TO CONTINUE'
-      'I'M NOT DONE' -> 'I'M NOT DONE'
+    path = out_dir / rel
+    prev = prev_dir / rel if prev_dir else None
+    try:
+        if prev is None:
+            raise FileNotFoundError
+        same = prev.stat().st_size == len(data) and prev.read_bytes() == data
+        status = "unchanged" if same else "changed"
+    except FileNotFoundError:
+        status = "added"
+    if status == "unchanged":
+        link_or_copy(prev, path)
+    elif prev == path:
+        # in-place build: replace, never write through an inode older generations share
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    return rel.as_posix(), sha256_bytes(data), status
+
+
+class StreamedOutput:
+    """Write a large output file piece by piece, with the same reuse rule as write_output().
+
+    Content goes to a temp file while being hashed; if prev_dir/<rel> has the same hash the
+    temp file is dropped and the previous file is linked instead. gzipped=True writes a
+    reproducible .gz (no name / mtime in the header).
     """
-    s = (raw or "").strip()
-    if not s:
-        return ""
 
-    # jeśli jest " // " bierz prawą stronę
-    if "//" in s:
-        s = s.split("//", 1)[1].strip()
+    def __init__(self, rel: Path, out_dir: Path, prev_dir: Path = None, gzipped: bool = False):
+        self.rel = rel
+        self.path = out_dir / rel
+        self.prev = prev_dir / rel if prev_dir else None
+        self.tmp = self.path.with_name(self.path.name + ".tmp")
+        self.result = None
+        self.size = 0  # uncompressed bytes written so far
+        self._sha = None if gzipped else hashlib.sha256()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._raw = self.tmp.open("wb")
+        self._f = gzip.GzipFile(filename="", mode="wb", fileobj=self._raw, mtime=0) if gzipped else self._raw
 
-    # usuń typowe prefixy jeśli ktoś wpisał bez "//"
-    s = re.sub(r"^disruption_series[\s:_-]*", "", s, flags=re.I).strip()
-    s = re.sub(r"^disruption[\s:_-]*", "", s, flags=re.I).strip()
-    s = re.sub(r"^series[\s:_-]*", "", s, flags=re.I).strip()
+    def write(self, s: str) -> None:
+        data = s.encode("utf-8")
+        self.size += len(data)
+        if self._sha is not None:
+            self._sha.update(data)
+        self._f.write(data)
 
-    return s.strip() or raw.strip()
+    def __enter__(self):
+        return self
 
+    def __exit__(self, exc_type, exc, tb):
+        self._f.close()
+        self._raw.close()
+        if exc_type is not None:
+            self.tmp.unlink()
+            return False
+        sha = self._sha.hexdigest() if self._sha is not None else file_hash(self.tmp)
+        if self.prev is None or not self.prev.exists():
+            status = "added"
+        elif file_hash(self.prev) == sha:
+            status = "unchanged"
+        else:
+            status = "changed"
+        if status == "unchanged":
+            self.tmp.unlink()
+            link_or_copy(self.prev, self.path)
+        else:
+            os.replace(self.tmp, self.path)
+        self.result = (self.rel.as_posix(), sha, status)
+        return False
 
-def disruption_slug(raw: str) -> str:
-    """
-    Slug robimy z SAMEGO tytułu disruption (bez 'disruption-series' itp.)
+
+# ---------------------------
+# SITEMAPS
+# ---------------------------
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+SITEMAP_URLSET_HEAD = f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NS}">'
+SITEMAP_URLSET_TAIL = "\n</urlset>"
+
+
+def sitemap_url_entry(loc: str, lastmod: str, priority: str) -> str:
+    return (
+        "\n  <url>"
+        f"\n    <loc>{loc}</loc>"
+        f"\n    <lastmod>{lastmod}</lastmod>"
+        f"\n    <priority>{priority}</priority>"
+        "\n  </url>"
+    )
+
+
+def write_sitemap_children(name: str, entries, output, gzipped: bool = False):
+    """Stream (loc, lastmod, priority) into sitemaps/<name>.xml, <name>-2.xml, ...
+
+    A child is closed before it would pass SITEMAP_MAX_URLS urls or SITEMAP_MAX_BYTES
+    (uncompressed). Yields (write result, child rel path, newest lastmod in it).
     """
-    name = disruption_display_name(raw)
-    return slugify(name)
+    f = None
+    part = count = 0
+    newest = ""
+    try:
+        for loc, lastmod, priority in entries:
+            entry = sitemap_url_entry(loc, lastmod, priority)
+            size = len(entry.encode("utf-8"))
+            if f is None or count >= SITEMAP_MAX_URLS or f.size + size + len(SITEMAP_URLSET_TAIL) > SITEMAP_MAX_BYTES:
+                if f is not None:
+                    f.write(SITEMAP_URLSET_TAIL)
+                    f.__exit__(None, None, None)
+                    yield f.result, f.rel, newest
+                part += 1
+                suffix = "" if part == 1 else f"-{part}"
+                rel = SITEMAP_DIR / f"{name}{suffix}.xml{'.gz' if gzipped else ''}"
+                f = output.stream(rel, gzipped=gzipped)
+                f.write(SITEMAP_URLSET_HEAD)
+                count = 0
+                newest = ""
+            f.write(entry)
+            count += 1
+            newest = max(newest, lastmod)
+    except BaseException as e:
+        if f is not None and f.result is None:
+            f.__exit__(type(e), e, e.__traceback__)
+        raise
+    if f is not None:
+        f.write(SITEMAP_URLSET_TAIL)
+        f.__exit__(None, None, None)
+        yield f.result, f.rel, newest
 
 
 # ---------------------------
-# JSON-LD
+# PRECOMPRESSION (.gz / .br / .zst siblings)
 # ---------------------------
-def jsonld_article(base_url, url_path, title, date, og_image, github_repo, disruption_name=None, disruption_url=None):
-    date = normalize_date(date)
+def compressors() -> dict:
+    """Sibling suffix -> compress(bytes) for every encoding available here."""
+    encs = {"gz": lambda data: gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        encs["br"] = lambda data: brotli.compress(data, quality=BROTLI_QUALITY)
+    if zstandard is not None:
+        encs["zst"] = lambda data: zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return encs
 
-    is_part_of = {
-        "@type": "CreativeWork",
-        "name": "OX500 // system archive",
-        "url": f"{base_url}/",
-        "codeRepository": github_repo,
-    }
 
-    if disruption_name and disruption_url:
-        # log jako część disruption node
-        is_part_of = [
-            {
-                "@type": "CreativeWorkSeries",
-                "name": f"DISRUPTION // {disruption_name}",
-                "url": disruption_url,
-            },
-            is_part_of,
-        ]
+def is_compressible(rel_s: str) -> bool:
+    return Path(rel_s).suffix in COMPRESSIBLE_SUFFIXES
 
-    data = {
-        "@context": "https://schema.org",
-        "@type": "Article",
-        "headline": title,
-        "author": {
-            "@type": "Organization",
-            "name": "OX500",
-            "url": base_url,
-            "sameAs": [github_repo] if github_repo else [],
-        },
-        "publisher": {
-            "@type": "Organization",
-            "name": "OX500",
-            "logo": {"@type": "ImageObject", "url": og_image},
-        },
-        "datePublished": date,
-        "dateModified": date,
-        "mainEntityOfPage": {"@type": "WebPage", "@id": f"{base_url}{url_path}"},
-        "inLanguage": "en",
-        "isPartOf": is_part_of,
-    }
 
-    return json.dumps(data, ensure_ascii=False, indent=2)
+def compress_outputs(files: dict, old_files: dict, output, jobs: int = 1):
+    """Write precompressed siblings for every text file in files (rel -> sha256) to output.
 
+    A sibling is reused from output.prev_dir when its source hash did not change. Siblings
+    that would not be smaller than the original are not written.
+    Yields (write_output()-style result, encoding, raw bytes, compressed bytes, reused).
+    """
+    encs = compressors()
+    prev_dir = output.prev_dir
 
-def jsonld_disruption_node(base_url, url_path, disruption_name, date, og_image, github_repo):
-    date = normalize_date(date)
-    data = {
-        "@context": "https://schema.org",
-        "@type": "CollectionPage",
-        "name": f"DISRUPTION // {disruption_name}",
-        "description": f"OX500 disruption node: {disruption_name}",
-        "url": f"{base_url}{url_path}",
-        "dateModified": date,
-        "isPartOf": {
-            "@type": "WebSite",
-            "name": "OX500",
-            "url": f"{base_url}/",
-            "codeRepository": github_repo,
-        },
-        "publisher": {
-            "@type": "Organization",
-            "name": "OX500",
-            "logo": {"@type": "ImageObject", "url": og_image},
-        },
-    }
-    return json.dumps(data, ensure_ascii=False, indent=2)
+    def one(rel_s: str) -> list:
+        sha = files[rel_s]
+        results = []
+        data = None
+        for ext, compress in encs.items():
+            sib = f"{rel_s}.{ext}"
+            prev = prev_dir / sib if prev_dir else None
+            if old_files.get(rel_s) == sha and sib in old_files and prev is not None and prev.exists():
+                link_or_copy(prev, output.stage / sib)
+                results.append(((sib, old_files[sib], "unchanged"), ext, None, prev.stat().st_size, True))
+                continue
+            if data is None:
+                data = output.read(rel_s)
+            packed = compress(data)
+            if len(packed) >= len(data):
+                continue
+            results.append((output.write(Path(sib), packed), ext, len(data), len(packed), False))
+        return results
 
+    todo = sorted(rel_s for rel_s in files if is_compressible(rel_s))
+    # zlib / brotli / zstd release the GIL while compressing, so threads are enough
+    if jobs > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            for results in pool.map(one, todo):
+                yield from results
+    else:
+        for rel_s in todo:
+            yield from one(rel_s)
 
-def build():
-    # ===== CLEAN DIST =====
-    if DIST.exists():
-        shutil.rmtree(DIST)
-    DIST.mkdir(parents=True, exist_ok=True)
-    # ===== COPY STATIC ASSETS (assets/* -> dist/assets/*) =====
-    # Copy everything under /assets into /dist/assets (bg/css/img/icons etc.)
-    if ASSETS_SRC.exists():
-        ASSETS_DIST.mkdir(parents=True, exist_ok=True)
-        shutil.copytree(ASSETS_SRC, ASSETS_DIST, dirs_exist_ok=True)
 
-    # ===== COPY FAVICONS TO DIST ROOT (assets/icons/* -> dist/*) =====
-    # Browsers and crawlers commonly expect these at the site root:
-    # /favicon.ico, /apple-touch-icon.png, /site.webmanifest, etc.
-    if ICONS_SRC.exists():
-        for p in ICONS_SRC.iterdir():
-            if p.is_file():
-                shutil.copy2(p, DIST / p.name)
+# ---------------------------
+# GENERATIONS (atomic dist/ swap)
+# ---------------------------
+# Every build is written to a fresh staging dir under GENERATIONS_DIR. When it is complete
+# dist/ (a symlink) is switched to it in one rename, so dist/ is never half-built.
+def staging_owner_alive(stage: Path) -> bool:
+    """Is the build that owns staging-<pid>-* still running? (unknown counts as yes)"""
+    try:
+        pid = int(stage.name.split("-")[1])
+    except (IndexError, ValueError):
+        return False
+    if os.name == "nt":
+        # os.kill() would terminate the process there; fall back to the stage's age
+        try:
+            return time.time() - stage.stat().st_mtime < STAGING_MAX_AGE
+        except OSError:
+            return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
 
 
-    cfg = json.loads(read_text(ROOT / "logs.json"))
-    site = cfg["site"]
-    logs = cfg["logs"]
+def new_staging_dir(generations: Path = GENERATIONS_DIR) -> Path:
+    generations.mkdir(parents=True, exist_ok=True)
+    # leftovers of builds that crashed before publishing; a concurrent build's stage is left alone
+    for old in generations.glob("staging-*"):
+        if not staging_owner_alive(old):
+            shutil.rmtree(old, ignore_errors=True)
+    # unique per build, even for several builds in one process
+    stage = Path(tempfile.mkdtemp(prefix=f"staging-{os.getpid()}-", dir=generations))
+    stage.chmod(0o755)  # mkdtemp makes it 0700; it becomes the served generation
+    return stage
 
-    base_url = site["base_url"].rstrip("/")
-    og_image = site["og_image"]
-    youtube = site["youtube"]
-    bandcamp = site.get("bandcamp", "")
-    github_repo = site.get("github", "")
-    lang = site.get("default_lang", "en")
-    site_title = site.get("site_title", "OX500 // CORE INTERFACE")
 
-    # ===== NORMALIZE SLUGS =====
-    for l in logs:
-        l["slug"] = slugify(l.get("slug") or l.get("title", ""))
+def publish_generation(stage: Path, dist: Path = DIST, generations: Path = GENERATIONS_DIR) -> Path:
+    """Rename the staging dir to a generation and atomically point dist at it."""
+    gen = generations / datetime.now(timezone.utc).strftime("gen-%Y%m%dT%H%M%S%f")
+    os.replace(stage, gen)
 
-    # ===== FILTER OUT FUTURE-DATED LOGS (do not generate/publish yet) =====
-    today = datetime.now(timezone.utc).date()
-    filtered = []
-    for l in logs:
-        try:
-            d = datetime.fromisoformat((l.get("date") or "").strip()).date()
-        except Exception:
-            d = today
-        if d <= today:
-            filtered.append(l)
-    logs = filtered
+    if dist.exists() and not dist.is_symlink():
+        # first staged build over a plain dist/ directory: keep it as a generation
+        os.replace(dist, generations / f"{gen.name}-legacy")
 
-    # newest first
-    logs_sorted = sorted(logs, key=lambda x: int(x["id"]), reverse=True)
+    tmp_link = dist.with_name(dist.name + ".swap")
+    if tmp_link.is_symlink() or tmp_link.exists():
+        tmp_link.unlink()
+    try:
+        os.symlink(os.path.relpath(gen, dist.parent), tmp_link, target_is_directory=True)
+        os.replace(tmp_link, dist)
+    except OSError:
+        # no symlinks (e.g. Windows without privileges): short rename gap instead
+        if dist.is_symlink():
+            dist.unlink()
+        elif dist.exists():
+            os.replace(dist, generations / f"{gen.name}-prev")
+        os.replace(gen, dist)
+        gen = dist
 
-    t_log = read_text(ROOT / "template-log.html")
-    t_index = read_text(ROOT / "template-index.html")
+    # keep the live generation + the previous one (rollback, hardlink source for the next build)
+    live = dist.resolve()
+    gens = sorted(
+        (p for p in generations.glob("gen-*") if p.is_dir() and p.resolve() != live),
+        key=lambda p: p.stat().st_mtime,
+    )
+    for old in gens[: max(0, len(gens) - (KEEP_GENERATIONS - 1))]:
+        shutil.rmtree(old, ignore_errors=True)
+    return gen
 
-    # Optional template for disruption node pages
-    t_node_path = ROOT / "template-disruption.html"
-    t_node = read_text(t_node_path) if t_node_path.exists() else None
 
-    # Optional template-series fallback for disruption node pages
-    t_series_path = ROOT / "template-series.html"
-    if t_node is None and t_series_path.exists():
-        t_node = read_text(t_series_path)
+# ---------------------------
+# OUTPUTS + CONFIG (library API)
+# ---------------------------
+# build() writes only through its output: write() / stream() / alias() / read() / size(),
+# begin() before the first file and finish() after the last. The CLI uses DirectoryOutput;
+# tests and deploy jobs can build into a dict or straight into a tar / zip stream:
+#
+#   out = MemoryOutput()
+#   build(config=BuildConfig(archive={"site": {...}, "logs": [...]}, cache_dir=None), output=out)
+#   out.files["index.html"]
+class DirectoryOutput:
+    """dist/ as atomic generations (see GENERATIONS); the CLI output.
 
-    # ===== COPY CSS =====
-    css_src = ROOT / "style.css"
-    if css_src.exists():
-        # Main stylesheet lives under /assets/css/style.css
-        write_text(ASSETS_CSS_DIST, read_text(css_src))
+    begin() stages a new generation, unchanged files hardlinked from the live one, or with
+    in_place (serve / watch) writes into the live generation; finish() publishes the stage.
+    """
 
-        # Backward-compat shim: keep /style.css as a tiny forwarder so old links don't break
-        # (Safe for SEO and browsers; keeps existing external references alive.)
-        write_text(DIST / "style.css", """/* OX500 shim — moved to /assets/css/style.css */
-@import url("/assets/css/style.css");
-""")
+    __slots__ = ("dist", "generations", "in_place", "stage", "prev_dir")
+    process_safe = True  # page workers (--jobs) write their own files
+    readable = True
 
-    sitemap_entries = []
+    def __init__(self, dist: Path = DIST, generations: Path = None):
+        self.dist = Path(dist)
+        if generations is None:
+            generations = GENERATIONS_DIR if self.dist == DIST else self.dist.with_name(f".{self.dist.name}-gens")
+        self.generations = Path(generations)
+        self.in_place = False
+        self.stage = self.prev_dir = None
 
-    def make_rel_path(log):
-        y, m = ym_from_date(log.get("date", ""))
-        return Path("logs") / y / m / f'log-{log["id"]}-{log["slug"]}.html'
+    def begin(self, in_place: bool = False) -> None:
+        self.in_place = in_place
+        if in_place:
+            self.stage = self.prev_dir = self.dist.resolve()
+        else:
+            self.stage = new_staging_dir(self.generations)
+            # the generation dist/ points at now: a concurrent build may move the symlink later
+            self.prev_dir = self.dist.resolve() if self.dist.exists() else None
 
-    def make_url_path(rel_path: Path):
-        return "/" + rel_path.as_posix()
+    def write(self, rel: Path, data: bytes) -> tuple:
+        return write_output(rel, data, self.stage, self.prev_dir)
 
-    def make_disruption_rel_path(d_slug: str):
-        # ✅ zgodnie z Twoim wymaganiem: disruption/im-not-done.html (bez "series")
-        return Path("disruption") / f"{d_slug}.html"
+    def stream(self, rel: Path, gzipped: bool = False):
+        return StreamedOutput(rel, self.stage, self.prev_dir, gzipped=gzipped)
 
-    # ===== GROUP LOGS BY DISRUPTION =====
-    # key = disruption_slug, value = {name, logs[]}
-    disruptions = {}
+    def alias(self, rel_s: str, target_s: str) -> None:
+        # second name for an already staged file (same inode)
+        link_or_copy(self.stage / rel_s, self.stage / target_s)
 
-    for l in logs_sorted:
-        raw = (l.get("series") or l.get("disruption") or "").strip()
-        if not raw:
-            continue
-        d_name = disruption_display_name(raw)
-        d_slug = disruption_slug(raw)
-        disruptions.setdefault(d_slug, {"name": d_name, "logs": []})
-        disruptions[d_slug]["logs"].append(l)
+    def read(self, rel_s: str) -> bytes:
+        return (self.stage / rel_s).read_bytes()
 
-    # order disruptions by newest log id
-    disruption_order = sorted(
-        disruptions.keys(),
-        key=lambda k: int(disruptions[k]["logs"][0]["id"]),
-        reverse=True,
-    )
+    def size(self, rel_s: str) -> int:
+        return os.path.getsize(os.path.join(self.stage, rel_s))
 
-    # ===== LOG PAGES =====
-    SHOW_PREV_NEXT_TITLES_IN_TEXT = False
-
-    def nav_text(prefix: str, target_log: dict) -> str:
-        if not SHOW_PREV_NEXT_TITLES_IN_TEXT:
-            return prefix
-        return f'{prefix}: {target_log.get("title", "").strip()}'
-
-    for i, log in enumerate(logs_sorted):
-        rel_path = make_rel_path(log)
-        url_path = make_url_path(rel_path)
-        canonical = f"{base_url}{url_path}"
-
-        # PREV / NEXT
-        # logs_sorted is newest first, so:
-        # i-1 = newer log = NEXT
-        # i+1 = older log = PREV
-        next_log = logs_sorted[i - 1] if i - 1 >= 0 else None
-        prev_log = logs_sorted[i + 1] if i + 1 < len(logs_sorted) else None
-
-        # Build navigation parts
-        nav_parts = ['<a class="nav-home" href="/" rel="home">← CORE INTERFACE</a>']
-        
-        if prev_log:
-            nav_parts.append(
-                f'<span>·</span>\n                  '
-                f'<a class="nav-prev" href="{make_url_path(make_rel_path(prev_log))}" '
-                f'rel="prev" title="LOG {prev_log["id"]} // {html.escape(prev_log.get("title",""))}">'
-                f'{nav_text("PREV", prev_log)}</a>'
-            )
-        
-        if next_log:
-            nav_parts.append(
-                f'<span>·</span>\n                  '
-                f'<a class="nav-next" href="{make_url_path(make_rel_path(next_log))}" '
-                f'rel="next" title="LOG {next_log["id"]} // {html.escape(next_log.get("title",""))}">'
-                f'{nav_text("NEXT", next_log)}</a>'
-            )
-        
-        full_nav = '\n                  '.join(nav_parts)
-
-        # DISRUPTION LINK
-        raw_disruption = (log.get("series") or log.get("disruption") or "").strip()
-        node_meta = ""
-        d_name = None
-        d_url = None
-
-        if raw_disruption:
-            d_name = disruption_display_name(raw_disruption)
-            d_slug = disruption_slug(raw_disruption)
-            d_rel = make_disruption_rel_path(d_slug)
-            d_path = make_url_path(d_rel)
-            d_url = f"{base_url}{d_path}"
-            node_meta = f'NODE: <a href="{d_path}" rel="up">{html.escape(d_name)}</a> · '
-
-        page_title = f"LOG {log['id']} // {log['title']} — OX500"
-        description = f"{log.get('title', '')} — {log.get('excerpt', '')[:150]}"
-        og_desc = f"{log.get('excerpt', '')[:200]}"
-
-        page = render(
-            t_log,
-            {
-                "LANG": lang,
-                "PAGE_TITLE": html.escape(page_title),
-                "DESCRIPTION": html.escape(description),
-                "CANONICAL": canonical,
-                "OG_TITLE": html.escape(page_title),
-                "OG_DESC": html.escape(og_desc),
-                "OG_IMAGE": og_image,
-                "JSONLD": jsonld_article(
-                    base_url,
-                    url_path,
-                    f"LOG {log['id']} // {log['title']}",
-                    log.get("date", ""),
-                    og_image,
-                    github_repo,
-                    disruption_name=d_name,
-                    disruption_url=d_url,
-                ),
-                "LOG_ID": html.escape(log["id"]),
-                "LOG_TITLE": html.escape(log["title"]),
-                "LOG_DATE": html.escape(log.get("date", "")),
-                "LOG_TEXT": html.escape(log.get("text", "").rstrip()) + "\n",
-                "NODE_META": node_meta,
-                "FULL_NAV": full_nav,
-                "YOUTUBE": youtube,
-                "BANDCAMP": bandcamp,
-                "GITHUB": github_repo,
-                "BASE_URL": base_url,
-            },
-        )
+    def finish(self) -> Path:
+        """-> the generation dist/ now points at."""
+        if self.in_place:
+            return self.stage
+        return publish_generation(self.stage, self.dist, self.generations)
 
-        page = rewrite_css_links(page, base_url)
 
-        write_text(DIST / rel_path, page)
-        sitemap_entries.append((canonical, log.get("date", "")))
+class BufferedStream:
+    """StreamedOutput for outputs without files: the content is collected, then output.write()."""
 
-    # ===== DISRUPTION NODE PAGES =====
-    for d_slug in disruption_order:
-        d = disruptions[d_slug]
-        d_name = d["name"]
-        d_logs = d["logs"]  # newest first
-        count = len(d_logs)
-        newest_date = d_logs[0].get("date", datetime.now(timezone.utc).date().isoformat())
-
-        rel_path = make_disruption_rel_path(d_slug)
-        url_path = make_url_path(rel_path)
-        canonical = f"{base_url}{url_path}"
-
-        node_list = []
-        for l in d_logs:
-            lp = make_rel_path(l)
-            up = make_url_path(lp)
-            node_list.append(
-                f'<a class="log-line" href="{up}">'
-                f'<span class="log-id">LOG: {html.escape(l["id"])}</span>'
-                f'<span class="log-tag">{html.escape(l.get("title", ""))}</span>'
-                f"</a>"
-            )
+    __slots__ = ("rel", "output", "size", "result", "_buf", "_f")
 
-        # fallback node template if you don't have template-disruption.html
-        if not t_node:
-            t_node = """<!DOCTYPE html>
-<html lang="{{LANG}}">
-<head>
-  <meta charset="UTF-8" />
-  <title>{{PAGE_TITLE}}</title>
-  <meta name="viewport" content="width=device-width, initial-scale=1.0" />
-  <meta http-equiv="Content-Language" content="{{LANG}}" />
+    def __init__(self, output, rel: Path, gzipped: bool = False):
+        self.rel = rel
+        self.output = output
+        self.size = 0  # uncompressed bytes written so far
+        self.result = None
+        self._buf = io.BytesIO()
+        self._f = gzip.GzipFile(filename="", mode="wb", fileobj=self._buf, mtime=0) if gzipped else self._buf
 
-  <meta name="description" content="{{DESCRIPTION}}" />
-  <meta name="robots" content="index, follow, max-image-preview:large, max-snippet:-1, max-video-preview:-1" />
+    def write(self, s: str) -> None:
+        data = s.encode("utf-8")
+        self.size += len(data)
+        self._f.write(data)
 
-  <link rel="canonical" href="{{CANONICAL}}" />
-  <link rel="source" href="{{GITHUB}}">
+    def __enter__(self):
+        return self
 
-  <meta property="og:title" content="{{OG_TITLE}}" />
-  <meta property="og:description" content="{{OG_DESC}}" />
-  <meta property="og:type" content="website" />
-  <meta property="og:url" content="{{CANONICAL}}" />
-  <meta property="og:image" content="{{OG_IMAGE}}" />
-  <meta property="og:site_name" content="OX500" />
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            if self._f is not self._buf:
+                self._f.close()
+            self.result = self.output.write(self.rel, self._buf.getvalue())
+        return False
 
-  <link rel="stylesheet" href="/assets/css/style.css" />
 
-  <script type="application/ld+json">
-  {{JSONLD}}
-  </script>
-</head>
+class MemoryOutput:
+    """Build into a dict — files: rel posix path -> bytes. Nothing touches the disk.
 
-<body>
-  <a class="skip-link" href="#content">Skip to content</a>
-  <div id="ox500-bg" aria-hidden="true"></div>
-  <div class="ox-veins"></div>
+    Every build starts from an empty dict, so every file is "added".
+    """
 
-  <div class="ox500-shell">
-    <div class="ox500-bg-noise"></div>
-    <div class="ox500-bg-scanlines"></div>
+    __slots__ = ("files",)
+    stage = prev_dir = None
+    process_safe = False  # page workers hand their bytes back to the parent
+    readable = True
 
-    <div class="ox500-core-frame">
-      <div class="left-grid"></div>
+    def __init__(self):
+        self.files = {}
 
-      <main id="content" class="shell">
-        <div class="shell-inner">
+    def begin(self, in_place: bool = False) -> None:
+        self.files = {}
 
-          <header class="top-bar">
-            <div class="brand">
-              <div class="brand-main">OX500</div>
-              <div class="brand-sub">SYSTEM ARCHIVE</div>
-            </div>
-            <div class="signal">
-              <span class="signal-dot"></span>_disruption_feed
-            </div>
-          </header>
+    def write(self, rel: Path, data: bytes) -> tuple:
+        rel_s = rel.as_posix()
+        self.files[rel_s] = data
+        return rel_s, sha256_bytes(data), "added"
 
-          <section class="headline">
-            <h1 class="headline-core">
-              <span>DISRUPTION</span>
-              <span>NODE</span>
-            </h1>
-            <div class="headline-error ERROR" data-glitch="NODE">NODE</div>
-          </section>
+    def stream(self, rel: Path, gzipped: bool = False):
+        return BufferedStream(self, rel, gzipped)
 
-          <section class="content">
-            <article class="log-article">
-              <header class="log-article-header">
-                <h2>{{H1}}</h2>
-                <p class="log-meta">{{META}}</p>
+    def alias(self, rel_s: str, target_s: str) -> None:
+        self.files[target_s] = self.files[rel_s]
+
+    def read(self, rel_s: str) -> bytes:
+        return self.files[rel_s]
+
+    def size(self, rel_s: str) -> int:
+        return len(self.files[rel_s])
+
+    def finish(self) -> None:
+        pass
+
+
+class ArchiveOutput:
+    """Stream the build into a tar / tar.gz / tar.xz / zip archive (a path or a binary file object).
+
+    Entries are appended as they are produced, without temp files or seeking, so target can
+    be a pipe or an upload stream. Aliases (--fingerprint names) are tar hardlinks; zip has
+    no links, so an alias is a second entry with the same data, read back from the archive
+    (a path, or a readable + seekable file object) or, when the target is a pipe, kept in
+    memory from the original write. build() itself cannot read an archive back, which rules
+    out --compress.
+    """
+
+    __slots__ = ("target", "fmt", "mtime", "sizes", "_fh", "_tar", "_zip", "_kept", "_zip_readable")
+    stage = prev_dir = None
+    process_safe = False
+    readable = False
+
+    def __init__(self, target, fmt: str = None, mtime: int = None):
+        if fmt is None:
+            name = str(target if isinstance(target, (str, Path)) else getattr(target, "name", ""))
+            fmt = next((f for f in ARCHIVE_MODES if name.endswith("." + f)), "tar")
+        if fmt not in ARCHIVE_MODES:
+            raise ValueError(f"unknown archive format {fmt!r} (expected one of {', '.join(ARCHIVE_MODES)})")
+        self.target = target
+        self.fmt = fmt
+        self.mtime = int(time.time()) if mtime is None else mtime
+        self.sizes = {}
+        self._fh = self._tar = self._zip = None
+        self._kept = {}  # zip into a pipe: rel -> data, for aliases
+        self._zip_readable = False
+
+    def begin(self, in_place: bool = False) -> None:
+        # a path is opened here (and closed by finish()); a file object stays the caller's
+        self._fh = open(self.target, "w+b") if isinstance(self.target, (str, Path)) else self.target
+        if self.fmt == "zip":
+            try:
+                self._zip_readable = self._fh.readable() and self._fh.seekable()
+            except (AttributeError, OSError, ValueError):
+                self._zip_readable = False
+            self._zip = zipfile.ZipFile(self._fh, "w", zipfile.ZIP_DEFLATED)
+        else:
+            self._tar = tarfile.open(fileobj=self._fh, mode=ARCHIVE_MODES[self.fmt])
+
+    def _info(self, rel_s: str) -> tarfile.TarInfo:
+        info = tarfile.TarInfo(rel_s)
+        info.mtime = self.mtime
+        info.mode = 0o644
+        return info
+
+    def _add(self, rel_s: str, data: bytes) -> None:
+        if self._zip is not None:
+            # zip timestamps start in 1980
+            when = time.gmtime(max(self.mtime, 315532800))[:6]
+            self._zip.writestr(zipfile.ZipInfo(rel_s, when), data, zipfile.ZIP_DEFLATED)
+        else:
+            info = self._info(rel_s)
+            info.size = len(data)
+            self._tar.addfile(info, io.BytesIO(data))
+        self.sizes[rel_s] = len(data)
+
+    def write(self, rel: Path, data: bytes) -> tuple:
+        rel_s = rel.as_posix()
+        self._add(rel_s, data)
+        if self._zip is not None and not self._zip_readable:
+            self._kept[rel_s] = data
+        return rel_s, sha256_bytes(data), "added"
+
+    def stream(self, rel: Path, gzipped: bool = False):
+        return BufferedStream(self, rel, gzipped)
+
+    def alias(self, rel_s: str, target_s: str) -> None:
+        if self._zip is not None:
+            self._add(target_s, self._zip.read(rel_s) if self._zip_readable else self._kept[rel_s])
+            return
+        info = self._info(target_s)
+        info.type = tarfile.LNKTYPE
+        info.linkname = rel_s
+        self._tar.addfile(info)
+        self.sizes[target_s] = self.sizes[rel_s]
+
+    def read(self, rel_s: str) -> bytes:
+        raise ValueError(f"{rel_s}: an archive output cannot be read back")
+
+    def size(self, rel_s: str) -> int:
+        return self.sizes[rel_s]
+
+    def finish(self) -> None:
+        (self._zip or self._tar).close()
+        if self._fh is not self.target:
+            self._fh.close()
+
+
+class BuildConfig:
+    """What a build reads and where it caches; the CLI uses the defaults (ROOT, CACHE_DIR).
+
+    root:      source tree — logs.json, logs/*.json, template-*.html, style.css, assets/
+    archive:   in-memory {"site": {...}, "logs": [...]}, used instead of logs.json + logs/
+    sources:   file name -> text, overriding template-*.html / style.css under root
+    cache_dir: manifest, caches and reports; None = nothing is read or written outside the
+               output (no --incremental, every log re-hashed, images re-encoded)
+    """
+
+    __slots__ = ("root", "archive", "sources", "cache_dir")
+
+    def __init__(self, root: Path = ROOT, archive: dict = None, sources: dict = None, cache_dir: Path = CACHE_DIR):
+        self.root = Path(root)
+        self.archive = archive
+        self.sources = sources or {}
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+
+    def cache_path(self, default: Path):
+        """A CACHE_DIR path (manifest, reports, ...) under this config's cache_dir, or None."""
+        return self.cache_dir / default.relative_to(CACHE_DIR) if self.cache_dir is not None else None
+
+    def source(self, name: str) -> tuple:
+        """-> (text, hash) of a root-level source file, in-memory first; (None, "") if missing."""
+        if name in self.sources:
+            return self.sources[name], text_hash(self.sources[name])
+        path = self.root / name
+        if not path.is_file():
+            return None, ""
+        return read_text(path), file_hash(path)
+
+    def input_key(self, options: dict) -> str:
+        """Hash of everything a build reads — sources, templates, style.css, assets, build.py — plus options."""
+        parts = [file_hash(Path(__file__)), record_hash(options)]
+        if self.archive is not None:
+            parts.append(record_hash(self.archive))
+        else:
+            parts.append(f"logs.json:{self.source('logs.json')[1]}")
+            logs_dir = self.root / LOGS_DIR.relative_to(ROOT)
+            if logs_dir.is_dir():
+                parts += [f"logs/{p.name}:{file_hash(p)}" for p in sorted(logs_dir.glob("*.json")) if p.is_file()]
+        names = {p.name for p in self.root.glob("template-*.html")} | set(self.sources) | {"style.css"}
+        parts += [f"{name}:{self.source(name)[1]}" for name in sorted(names)]
+        assets_src = self.root / ASSETS_SRC.relative_to(ROOT)
+        if assets_src.is_dir():
+            for p in sorted(assets_src.rglob("*")):
+                if p.is_file():
+                    parts.append(f"assets/{p.relative_to(assets_src).as_posix()}:{file_hash(p)}")
+        return dep_key(*parts)
+
+
+# ---------------------------
+# SCHEDULED RELEASES (--if-needed)
+# ---------------------------
+# Output depends on the date only through the future-dated filter (and fingerprint
+# retention), so a build is a no-op while its inputs are unchanged and the next release
+# day has not come. Cron can run --if-needed often, or sleep until next_release.
+def load_release_stamp(path: Path = RELEASE_STAMP) -> dict:
+    try:
+        return json.loads(read_text(path))
+    except (OSError, ValueError):
+        return {}
+
+
+def build_needed(stamp: dict, input_key: str, today_s: str) -> bool:
+    """True unless stamp is the last build of the same inputs and nothing is due since (today_s: UTC)."""
+    if stamp.get("input_key") != input_key or not stamp.get("built_on"):
+        return True
+    # a clock moving backwards would hide logs again
+    return not (stamp["built_on"] <= today_s < (stamp.get("rebuild_on") or "9999-12-31"))
+
+
+def print_next_release(stamp: dict) -> None:
+    if stamp.get("next_release"):
+        print(f"NEXT RELEASE — {stamp['next_release']} (00:00 UTC), {stamp['scheduled']} scheduled log(s)")
+    else:
+        print("NEXT RELEASE — none scheduled")
+
+
+# ---------------------------
+# TEMPLATES
+# ---------------------------
+PLACEHOLDER_RE = re.compile(r"\{\{([A-Z0-9_]+)\}\}")
+
+# Placeholders each page type supplies; templates may use any subset of these.
+COMMON_TEMPLATE_KEYS = {"LANG", "OG_IMAGE", "YOUTUBE", "BANDCAMP", "GITHUB", "BASE_URL", "CANONICAL"}
+PAGE_TEMPLATE_KEYS = COMMON_TEMPLATE_KEYS | {"PAGE_TITLE", "DESCRIPTION", "OG_TITLE", "OG_DESC", "JSONLD"}
+LOG_TEMPLATE_KEYS = PAGE_TEMPLATE_KEYS | {
+    "LOG_ID", "LOG_TITLE", "LOG_DATE", "LOG_TEXT", "NODE_META", "FULL_NAV",
+}
+NODE_TEMPLATE_KEYS = PAGE_TEMPLATE_KEYS | {"H1", "META", "NODE_LOG_LIST", "PAGE_LINKS"}
+INDEX_TEMPLATE_KEYS = COMMON_TEMPLATE_KEYS | {
+    "SITEMAP_URL", "SITE_TITLE", "DISRUPTION_BLOCKS", "DISRUPTION_SERIES_JSONLD",
+}
+
+
+class TemplateError(ValueError):
+    pass
+
+
+class Template:
+    """Template parsed once into literal segments and placeholder keys.
+
+    literals[0] key[0] literals[1] key[1] ... literals[-1]
+    """
+
+    __slots__ = ("name", "literals", "keys")
+
+    def __init__(self, source: str, name: str = "<template>"):
+        parts = PLACEHOLDER_RE.split(source)
+        self.name = name
+        self.literals = parts[0::2]
+        self.keys = parts[1::2]
+
+
+def compile_template(source: str, name: str, allowed: set, required: set = frozenset()) -> Template:
+    """Parse a template and check its placeholders against what the page supplies."""
+    tpl = Template(source, name)
+    used = set(tpl.keys)
+    unknown = sorted(used - allowed)
+    missing = sorted(set(required) - used)
+    problems = []
+    if unknown:
+        problems.append("unknown placeholders " + ", ".join("{{%s}}" % k for k in unknown))
+    if missing:
+        problems.append("missing required " + ", ".join("{{%s}}" % k for k in missing))
+    if problems:
+        raise TemplateError(f"{name}: " + "; ".join(problems))
+    return tpl
+
+
+def render(template, mapping: dict) -> str:
+    if isinstance(template, str):
+        template = Template(template)
+    out = [template.literals[0]]
+    try:
+        for key, lit in zip(template.keys, template.literals[1:]):
+            out.append(mapping[key])
+            out.append(lit)
+    except KeyError as e:
+        raise TemplateError(f"{template.name}: no value for {{{{{e.args[0]}}}}}") from None
+    return "".join(out)
+
+
+def rewrite_css_links(html_str: str, base_url: str) -> str:
+    """Rewrite any hardcoded /style.css references to /assets/css/style.css.
+
+    This lets you migrate CSS location without immediately editing every template,
+    and keeps fallback templates working.
+    """
+    if not html_str:
+        return html_str
+
+    # Common absolute + relative patterns
+    html_str = html_str.replace('href="/style.css"', 'href="/assets/css/style.css"')
+    html_str = html_str.replace("href='/style.css'", "href='/assets/css/style.css'")
+
+    # Replace absolute base_url/style.css (if present)
+    if base_url:
+        html_str = html_str.replace(f'href="{base_url}/style.css"', f'href="{base_url}/assets/css/style.css"')
+        html_str = html_str.replace(f"href='{base_url}/style.css'", f"href='{base_url}/assets/css/style.css'")
+
+    # Historical hardcode
+    html_str = html_str.replace('href="https://ox500.com/style.css"', 'href="https://ox500.com/assets/css/style.css"')
+    html_str = html_str.replace("href='https://ox500.com/style.css'", "href='https://ox500.com/assets/css/style.css'")
+
+    return html_str
+
+
+# ---------------------------
+# ASSET FINGERPRINTS
+# ---------------------------
+ASSET_URL_RE = re.compile(
+    r"""(?P<q>["'(])(?P<base>https?://[^/"'()\s]+|\{\{BASE_URL\}\})?(?P<path>/assets/[^"'()\s?#]+)"""
+)
+
+
+def fingerprint_name(rel: str, sha: str) -> str:
+    """assets-relative path -> same path with the content hash before the extension."""
+    p = Path(rel)
+    return p.with_name(f"{p.stem}.{sha[:ASSET_HASH_LEN]}{p.suffix}").as_posix()
+
+
+def rewrite_asset_urls(text: str, asset_map: dict, base_url: str = "") -> str:
+    """Point quoted / url(...) /assets/... references at their published (fingerprinted / compact) names."""
+    if not asset_map:
+        return text
+
+    def sub(m):
+        base = m.group("base")
+        hashed = asset_map.get(m.group("path"))
+        if hashed is None or (base and base not in (base_url, "{{BASE_URL}}")):
+            return m.group(0)
+        return m.group("q") + (base or "") + hashed
+
+    return ASSET_URL_RE.sub(sub, text)
+
+
+def asset_url(url: str, asset_map: dict, base_url: str) -> str:
+    """Fingerprinted form of a bare (absolute or root-relative) asset URL, e.g. site.og_image."""
+    path = url[len(base_url):] if base_url and url.startswith(base_url + "/") else url
+    hashed = asset_map.get(path)
+    if hashed is None:
+        return url
+    return (base_url if path != url else "") + hashed
+
+
+# ---------------------------
+# SERVICE WORKER (--service-worker)
+# ---------------------------
+# Local non-page URLs in templates / style.css: stylesheet, background, favicon, scripts
+SW_SHELL_URL_RE = re.compile(
+    r"""(?P<q>["'(])(?P<base>https?://[^/"'()\s]+|\{\{BASE_URL\}\})?(?P<path>/[^"'()\s?#{}]+\.[A-Za-z0-9]+)(?=["')?#])"""
+)
+
+# Injected before </body> of every template: registers /sw.js and hands it the page's
+# rel="prev" / rel="next" links to prefetch (skipped with Save-Data).
+SW_REGISTER_SCRIPT = (
+    '<script>if("serviceWorker"in navigator)navigator.serviceWorker.register("/sw.js")'
+    ".then(function(){return navigator.serviceWorker.ready}).then(function(r){"
+    "if(!r.active||(navigator.connection&&navigator.connection.saveData))return;"
+    "var u=[].map.call(document.querySelectorAll('a[rel~=\"prev\"],a[rel~=\"next\"]'),function(a){return a.href});"
+    "if(u.length)r.active.postMessage({prefetch:u})})</script>"
+)
+
+SERVICE_WORKER_JS = """
+// Shell files are cached once per (URL, content hash): a new build only downloads the
+// entries whose hash changed, the rest stay in SHELL_CACHE. Pages are stale-while-revalidate:
+// a repeat visit is served from PAGE_CACHE and refreshed in the background.
+function revKey(path, rev) {
+  return new URL(path + "?__rev=" + rev, self.location.origin).href;
+}
+
+function fetchPage(cache, key, request) {
+  return fetch(request).then(function (res) {
+    // redirected responses cannot answer a navigation
+    if (!res.ok || res.redirected) return res;
+    return cache.put(key, res.clone()).then(function () { return res; });
+  });
+}
+
+function trimPages(cache) {
+  // keys() is in insertion order and put() re-inserts, so the oldest writes go first
+  return cache.keys().then(function (reqs) {
+    return Promise.all(reqs.slice(0, Math.max(0, reqs.length - PAGE_CACHE_LIMIT)).map(function (r) {
+      return cache.delete(r);
+    }));
+  });
+}
+
+self.addEventListener("install", function (event) {
+  event.waitUntil(caches.open(SHELL_CACHE).then(function (cache) {
+    return Promise.all(Object.keys(PRECACHE).map(function (path) {
+      var key = revKey(path, PRECACHE[path]);
+      return cache.match(key).then(function (hit) {
+        if (hit) return;
+        return fetch(path, { cache: "no-cache" }).then(function (res) {
+          if (!res.ok) throw new Error(path + ": HTTP " + res.status);
+          return cache.put(key, res);
+        });
+      });
+    }));
+  }).then(function () { return self.skipWaiting(); }));
+});
+
+self.addEventListener("activate", function (event) {
+  var keep = new Set(Object.keys(PRECACHE).map(function (path) { return revKey(path, PRECACHE[path]); }));
+  event.waitUntil(caches.keys().then(function (names) {
+    return Promise.all(names.map(function (name) {
+      if (name.indexOf("ox500-") === 0 && name !== SHELL_CACHE && name !== PAGE_CACHE) return caches.delete(name);
+    }));
+  }).then(function () {
+    return caches.open(SHELL_CACHE);
+  }).then(function (cache) {
+    return cache.keys().then(function (reqs) {
+      return Promise.all(reqs.map(function (req) {
+        if (!keep.has(req.url)) return cache.delete(req);
+      }));
+    });
+  }).then(function () { return self.clients.claim(); }));
+});
+
+self.addEventListener("fetch", function (event) {
+  var req = event.request;
+  if (req.method !== "GET") return;
+  var url = new URL(req.url);
+  if (url.origin !== self.location.origin) return;
+  var rev = PRECACHE[url.pathname];
+  if (rev && !url.search) {
+    event.respondWith(caches.match(revKey(url.pathname, rev), { cacheName: SHELL_CACHE }).then(function (hit) {
+      return hit || fetch(req);
+    }));
+    return;
+  }
+  if (req.mode !== "navigate") return;
+  url.hash = "";
+  event.respondWith(caches.open(PAGE_CACHE).then(function (cache) {
+    return cache.match(url.href).then(function (hit) {
+      var fresh = fetchPage(cache, url.href, req);
+      event.waitUntil(fresh.then(function () { return trimPages(cache); }).catch(function () {}));
+      return hit || fresh;
+    });
+  }));
+});
+
+self.addEventListener("message", function (event) {
+  var urls = (event.data && event.data.prefetch) || [];
+  event.waitUntil(caches.open(PAGE_CACHE).then(function (cache) {
+    return Promise.all(urls.map(function (u) {
+      var url = new URL(u, self.location.origin);
+      if (url.origin !== self.location.origin) return;
+      url.hash = "";
+      return cache.match(url.href).then(function (hit) {
+        return hit || fetchPage(cache, url.href, url.href).catch(function () {});
+      });
+    })).then(function () { return trimPages(cache); });
+  }));
+});
+"""
+
+
+def with_sw_register(markup: str) -> str:
+    head, sep, tail = markup.rpartition("</body>")
+    return head + SW_REGISTER_SCRIPT + "\n" + sep + tail if sep else markup + SW_REGISTER_SCRIPT
+
+
+def shell_precache(sources: list, files: dict, base_url: str) -> dict:
+    """Published non-page files the templates / stylesheet load -> {url path: content hash}."""
+    precache = {}
+    for text in sources:
+        for m in SW_SHELL_URL_RE.finditer(text):
+            base = m.group("base")
+            if base and base not in (base_url, "{{BASE_URL}}"):
+                continue
+            rel_s = m.group("path")[1:]
+            if rel_s in files and not rel_s.endswith(".html") and rel_s != SW_REL_PATH.as_posix():
+                precache["/" + rel_s] = files[rel_s][:SW_HASH_LEN]
+    return dict(sorted(precache.items()))
+
+
+def render_service_worker(precache: dict) -> str:
+    return (
+        "/* OX500 service worker — generated by build.py --service-worker */\n"
+        '"use strict";\n'
+        f"const PRECACHE = {json.dumps(precache, indent=1, sort_keys=True)};\n"
+        f'const SHELL_CACHE = "ox500-shell-v{SW_CACHE_VERSION}";\n'
+        f'const PAGE_CACHE = "ox500-pages-v{SW_CACHE_VERSION}";\n'
+        f"const PAGE_CACHE_LIMIT = {SW_PAGE_CACHE_LIMIT};\n"
+        + SERVICE_WORKER_JS
+    )
+
+
+# ---------------------------
+# CSS (minify + critical CSS)
+# ---------------------------
+CSS_STRING_RE = re.compile(r""""(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'""")
+CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+STYLESHEET_LINK_RE = re.compile(r"""<link\s+rel=["']stylesheet["']\s+href=["']([^"']+)["']\s*/?>""")
+HTML_CLASS_RE = re.compile(r"""\bclass=["']([^"']*)["']""")
+HTML_ID_RE = re.compile(r"""\bid=["']([^"']*)["']""")
+HTML_TAG_RE = re.compile(r"<([a-zA-Z][a-zA-Z0-9]*)")
+CSS_INTERACTIVE_RE = re.compile(r":(hover|active|focus|focus-visible|focus-within)\b")
+CSS_PSEUDO_RE = re.compile(r"::?[a-zA-Z-]+(\([^)]*\))?|\[[^\]]*\]")
+CSS_OUT_OF_FLOW_RE = re.compile(r"(?:^|;)position:(?:absolute|fixed)(?:;|$)")
+CSS_NO_POINTER_RE = re.compile(r"(?:^|;)pointer-events:none(?:;|$)")
+# inlined bytes per template; rules past the budget are left to the (preloaded) stylesheet
+CRITICAL_CSS_MAX_BYTES = 8 * 1024
+
+# Markup build.py itself generates into each template kind (nav, node lists, home blocks)
+LIST_MARKUP_CLASSES = {"log-line", "log-id", "log-tag", "nav-prev", "nav-next"}
+GENERATED_MARKUP_CLASSES = {
+    "log": {"nav-home", "nav-prev", "nav-next"},
+    "node": LIST_MARKUP_CLASSES,
+    "archive": LIST_MARKUP_CLASSES,
+    "index": {"log-entry", "log-entry-header", "log-entry-body", "logs", "log-line", "log-id", "log-tag"},
+}
+GENERATED_MARKUP_TAGS = {
+    "log": {"a", "span"},
+    "node": {"a", "span", "nav"},
+    "archive": {"a", "span", "nav"},
+    "index": {"a", "span", "div", "p", "details", "summary"},
+}
+
+
+def minify_css(css: str) -> str:
+    """Conservative minifier: comments, whitespace, last semicolons. Strings are left alone."""
+    out = []
+    pos = 0
+    css = CSS_COMMENT_RE.sub("", css)
+    for m in CSS_STRING_RE.finditer(css):
+        out.append(_minify_css_chunk(css[pos:m.start()]))
+        out.append(m.group(0))
+        pos = m.end()
+    out.append(_minify_css_chunk(css[pos:]))
+    return "".join(out).strip()
+
+
+def _minify_css_chunk(s: str) -> str:
+    s = re.sub(r"\s+", " ", s)
+    s = re.sub(r"\s*([{};,>])\s*", r"\1", s)
+    # "a:b" in declarations; a leading space before ":" is kept (descendant pseudo selectors)
+    s = re.sub(r":\s+", ":", s)
+    return s.replace(";}", "}")
+
+
+def parse_css_blocks(css: str) -> list:
+    """Minified CSS -> [(prelude, body)], body of @media / @supports parsed recursively."""
+    blocks = []
+    i = 0
+    n = len(css)
+    while i < n:
+        start = i
+        while i < n and css[i] not in "{;":
+            m = CSS_STRING_RE.match(css, i)
+            i = m.end() if m else i + 1
+        if i >= n:
+            break
+        prelude = css[start:i].strip()
+        if css[i] == ";":  # @import / @charset
+            blocks.append((prelude, None))
+            i += 1
+            continue
+        depth = 0
+        body_start = i + 1
+        while i < n:
+            m = CSS_STRING_RE.match(css, i)
+            if m:
+                i = m.end()
+                continue
+            if css[i] == "{":
+                depth += 1
+            elif css[i] == "}":
+                depth -= 1
+                if depth == 0:
+                    break
+            i += 1
+        body = css[body_start:i]
+        i += 1
+        if prelude.startswith(("@media", "@supports")):
+            body = parse_css_blocks(body)
+        blocks.append((prelude, body))
+    return blocks
+
+
+def markup_tokens(markup: str, kind: str = None) -> tuple:
+    """(classes, ids, tags) used by a template shell plus what build.py generates into it.
+
+    Without a kind the markup generated into every template is assumed.
+    """
+    kinds = [kind] if kind else list(GENERATED_MARKUP_CLASSES)
+    classes = set().union(*(GENERATED_MARKUP_CLASSES[k] for k in kinds))
+    for m in HTML_CLASS_RE.finditer(markup):
+        classes.update(m.group(1).split())
+    ids = {m.group(1) for m in HTML_ID_RE.finditer(markup)}
+    tags = {t.lower() for t in HTML_TAG_RE.findall(markup)} | {"html", "body"}
+    tags |= set().union(*(GENERATED_MARKUP_TAGS[k] for k in kinds))
+    return classes, ids, tags
+
+
+def _selector_matches(selector: str, classes: set, ids: set, tags: set) -> bool:
+    if CSS_INTERACTIVE_RE.search(selector):
+        return False  # hover / focus states are not needed for the first paint
+    for compound in re.split(r"[\s>+~]+", CSS_PSEUDO_RE.sub("", selector)):
+        for tok in re.findall(r"[.#]?[-\w]+|\*", compound):
+            if tok == "*":
+                continue
+            if tok[0] == ".":
+                ok = tok[1:] in classes
+            elif tok[0] == "#":
+                ok = tok[1:] in ids
+            else:
+                ok = tok.lower() in tags
+            if not ok:
+                return False
+    return True
+
+
+def split_css_declarations(body: str) -> list:
+    """"a:b;c:url(x;y)" -> ["a:b", "c:url(x;y)"] — ";" inside strings / parens does not split."""
+    decls = []
+    depth = 0
+    start = i = 0
+    while i < len(body):
+        m = CSS_STRING_RE.match(body, i)
+        if m:
+            i = m.end()
+            continue
+        c = body[i]
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == ";" and depth == 0:
+            decls.append(body[start:i])
+            start = i + 1
+        i += 1
+    decls.append(body[start:])
+    return [d for d in decls if d.strip()]
+
+
+def decorative_selectors(blocks: list) -> set:
+    """Selectors of out-of-flow, pointer-events:none overlays (noise, scanlines, glows)."""
+    found = set()
+    for prelude, body in blocks:
+        if isinstance(body, list):
+            found |= decorative_selectors(body)
+        elif body is not None and CSS_OUT_OF_FLOW_RE.search(body) and CSS_NO_POINTER_RE.search(body):
+            found.update(prelude.split(","))
+    return found
+
+
+def _is_decorative(selector: str, decorative: set) -> bool:
+    # the overlay itself, or its pseudo-elements / states / descendants
+    return any(
+        selector == d or (selector.startswith(d) and selector[len(d)] in ": >+~") for d in decorative
+    )
+
+
+def _critical_rules(blocks: list, classes: set, ids: set, tags: set, decorative: set) -> list:
+    out = []
+    for prelude, body in blocks:
+        if body is None:
+            continue
+        if isinstance(body, list):
+            inner = "".join(_critical_rules(body, classes, ids, tags, decorative))
+            if inner:
+                out.append(f"{prelude}{{{inner}}}")
+        elif not prelude.startswith("@"):
+            selectors = [sel for sel in prelude.split(",") if not _is_decorative(sel, decorative)]
+            if not any(_selector_matches(sel, classes, ids, tags) for sel in selectors):
+                continue
+            # noise textures and animations are decoration: they arrive with the full stylesheet
+            decls = [d for d in split_css_declarations(body) if "url(data:" not in d and 'url("data:' not in d]
+            if decls:
+                out.append(f"{','.join(selectors)}{{{';'.join(decls)}}}")
+    return out
+
+
+def critical_css(blocks: list, classes: set, ids: set, tags: set, max_bytes: int = None) -> tuple:
+    """(css, bytes left out) — rules the markup can match, minus decoration and @keyframes.
+
+    Overlays that paint nothing but decoration (out of flow, pointer-events:none) and their
+    pseudo-elements are left to the full stylesheet, as are rules past max_bytes (source
+    order is kept).
+    """
+    rules = _critical_rules(blocks, classes, ids, tags, decorative_selectors(blocks))
+    if max_bytes is None:
+        return "".join(rules), 0
+    kept = []
+    size = 0
+    for rule in rules:
+        size += len(rule.encode("utf-8"))
+        if size > max_bytes:
+            break
+        kept.append(rule)
+    css = "".join(kept)
+    return css, len("".join(rules).encode("utf-8")) - len(css.encode("utf-8"))
+
+
+def inline_critical_css(
+    markup: str, css_blocks: list, kind: str = None, max_bytes: int = CRITICAL_CSS_MAX_BYTES
+) -> tuple:
+    """(markup, bytes over budget): critical CSS inlined in <head>, full stylesheet loaded without blocking."""
+    classes, ids, tags = markup_tokens(markup, kind)
+    critical, over = critical_css(css_blocks, classes, ids, tags, max_bytes)
+
+    def sub(m):
+        href = m.group(1)
+        return (
+            f"<style>{critical}</style>\n"
+            f'  <link rel="preload" href="{href}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+            f'  <noscript><link rel="stylesheet" href="{href}"></noscript>'
+        )
+
+    return STYLESHEET_LINK_RE.sub(sub, markup, count=1), over
+
+
+# ---------------------------
+# IMAGES (--optimize-images)
+# ---------------------------
+def encode_image(src: Path, box: tuple, fit: str, fmt: str) -> bytes:
+    """Resize src into box ("cover" crops to exactly box, "contain" only shrinks) and re-encode."""
+    with Image.open(src) as img:
+        img = ImageOps.exif_transpose(img)
+        if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        if fit == "cover":
+            img = ImageOps.fit(img, box, Image.Resampling.LANCZOS)
+        else:
+            img.thumbnail(box, Image.Resampling.LANCZOS)
+        opts = {"optimize": True}
+        if fmt in IMAGE_QUALITY:
+            opts["quality"] = IMAGE_QUALITY[fmt]
+        if fmt == "JPEG":
+            opts["progressive"] = True
+        elif fmt == "WEBP":
+            opts["method"] = 6
+        buf = io.BytesIO()
+        img.save(buf, fmt, **opts)
+    return buf.getvalue()
+
+
+def cached_image(
+    src: Path, src_hash: str, box: tuple, fit: str, fmt: str, stats: dict, cache_dir: Path = IMAGE_CACHE_DIR
+) -> bytes:
+    """encode_image() result, cached in .build-cache/images/ by source hash + encoder settings."""
+    if cache_dir is None:
+        stats["encoded"] += 1
+        return encode_image(src, box, fit, fmt)
+    key = dep_key(src_hash, IMAGE_PIPELINE_VERSION, f"{box[0]}x{box[1]}", fit, fmt, str(IMAGE_QUALITY.get(fmt)))
+    path = cache_dir / (key + IMAGE_FORMAT_SUFFIX[fmt])
+    if path.exists():
+        stats["cached"] += 1
+        return path.read_bytes()
+    data = encode_image(src, box, fit, fmt)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    stats["encoded"] += 1
+    return data
+
+
+def is_optimizable_image(rel: Path) -> bool:
+    """assets-relative path of a raster the image stage recompresses (img/, bg/; icons stay exact)."""
+    return rel.parts[0] in IMAGE_DIRS and rel.suffix.lower() in IMAGE_SUFFIXES
+
+
+def image_variant_rel(rel: Path, variant: str) -> Path:
+    fmt = IMAGE_VARIANTS[variant][2] if variant in IMAGE_VARIANTS else IMAGE_COMPACT_FORMAT
+    return rel.with_name(f"{rel.stem}.{variant}{IMAGE_FORMAT_SUFFIX[fmt]}")
+
+
+# ---------------------------
+# DATES
+# ---------------------------
+def parse_log_date(date_str: str) -> datetime:
+    """Log date; missing / invalid dates count as now (UTC)."""
+    try:
+        return datetime.fromisoformat((date_str or "").strip())
+    except Exception:
+        return datetime.now(timezone.utc)
+
+
+def normalize_date(date_str: str) -> str:
+    return parse_log_date(date_str).date().isoformat()
+
+
+def ym_from_date(date_str: str):
+    d = parse_log_date(date_str)
+    return f"{d.year:04d}", f"{d.month:02d}"
+
+
+# ---------------------------
+# DISRUPTION / SERIES CLEANUP
+# ---------------------------
+def disruption_display_name(raw: str) -> str:
+    """
+    Zamienia np:
+      'DISRUPTION_SERIES // I'M NOT DONE' -> 'I'M NOT DONE'
+      'DISRUPTION // WRITE AI TO CONTINUE' -> 'WRITE AI TO CONTINUE'
+      'I'M NOT DONE' -> 'I'M NOT DONE'
+    """
+    s = (raw or "").strip()
+    if not s:
+        return ""
+
+    # jeśli jest " // " bierz prawą stronę
+    if "//" in s:
+        s = s.split("//", 1)[1].strip()
+
+    # usuń typowe prefixy jeśli ktoś wpisał bez "//"
+    s = re.sub(r"^disruption_series[\s:_-]*", "", s, flags=re.I).strip()
+    s = re.sub(r"^disruption[\s:_-]*", "", s, flags=re.I).strip()
+    s = re.sub(r"^series[\s:_-]*", "", s, flags=re.I).strip()
+
+    return s.strip() or raw.strip()
+
+
+def disruption_slug(raw: str) -> str:
+    """
+    Slug robimy z SAMEGO tytułu disruption (bez 'disruption-series' itp.)
+    """
+    name = disruption_display_name(raw)
+    return slugify(name)
+
+
+# Fallback node template if you don't have template-disruption.html / template-series.html
+FALLBACK_NODE_TEMPLATE = """<!DOCTYPE html>
+<html lang="{{LANG}}">
+<head>
+  <meta charset="UTF-8" />
+  <title>{{PAGE_TITLE}}</title>
+  <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+  <meta http-equiv="Content-Language" content="{{LANG}}" />
+
+  <meta name="description" content="{{DESCRIPTION}}" />
+  <meta name="robots" content="index, follow, max-image-preview:large, max-snippet:-1, max-video-preview:-1" />
+
+  <link rel="canonical" href="{{CANONICAL}}" />{{PAGE_LINKS}}
+  <link rel="source" href="{{GITHUB}}">
+
+  <meta property="og:title" content="{{OG_TITLE}}" />
+  <meta property="og:description" content="{{OG_DESC}}" />
+  <meta property="og:type" content="website" />
+  <meta property="og:url" content="{{CANONICAL}}" />
+  <meta property="og:image" content="{{OG_IMAGE}}" />
+  <meta property="og:site_name" content="OX500" />
+
+  <link rel="stylesheet" href="/assets/css/style.css" />
+
+  <script type="application/ld+json">
+  {{JSONLD}}
+  </script>
+</head>
+
+<body>
+  <a class="skip-link" href="#content">Skip to content</a>
+  <div id="ox500-bg" aria-hidden="true"></div>
+  <div class="ox-veins"></div>
+
+  <div class="ox500-shell">
+    <div class="ox500-bg-noise"></div>
+    <div class="ox500-bg-scanlines"></div>
+
+    <div class="ox500-core-frame">
+      <div class="left-grid"></div>
+
+      <main id="content" class="shell">
+        <div class="shell-inner">
+
+          <header class="top-bar">
+            <div class="brand">
+              <div class="brand-main">OX500</div>
+              <div class="brand-sub">SYSTEM ARCHIVE</div>
+            </div>
+            <div class="signal">
+              <span class="signal-dot"></span>_disruption_feed
+            </div>
+          </header>
+
+          <section class="headline">
+            <h1 class="headline-core">
+              <span>DISRUPTION</span>
+              <span>NODE</span>
+            </h1>
+            <div class="headline-error ERROR" data-glitch="NODE">NODE</div>
+          </section>
+
+          <section class="content">
+            <article class="log-article">
+              <header class="log-article-header">
+                <h2>{{H1}}</h2>
+                <p class="log-meta">{{META}}</p>
                 <p class="log-nav">
                   <a class="nav-home" href="/" rel="home">← CORE INTERFACE</a>
                 </p>
               </header>
 
-              <div class="logs">
-                {{NODE_LOG_LIST}}
-              </div>
-            </article>
-          </section>
+              <div class="logs">
+                {{NODE_LOG_LIST}}
+              </div>
+            </article>
+          </section>
+
+          <footer class="footer">
+            <span>OX500 // ARCHIVE_NODE</span>
+            <span>DISRUPTION_NODE</span>
+            <span class="footer-output">
+              OUTPUT_PORT // <a href="{{YOUTUBE}}" target="_blank" rel="noopener me">YouTube</a>
+              <span class="sep"> // </span>
+              RELEASE_PORT // <a href="{{BANDCAMP}}" target="_blank" rel="noopener me">Bandcamp</a>
+              <span class="sep"> // </span>
+              SOURCE_CODE // <a href="{{GITHUB}}" target="_blank" rel="noopener noreferrer">GitHub</a>
+            </span>
+          </footer>
+
+        </div>
+      </main>
+    </div>
+  </div>
+</body>
+</html>"""
+
+
+# ---------------------------
+# JSON-LD
+# ---------------------------
+def jsonld_article(
+    base_url, url_path, title, date, og_image, github_repo, disruption_name=None, disruption_url=None, logo=None
+):
+    date = normalize_date(date)
+
+    is_part_of = {
+        "@type": "CreativeWork",
+        "name": "OX500 // system archive",
+        "url": f"{base_url}/",
+        "codeRepository": github_repo,
+    }
+
+    if disruption_name and disruption_url:
+        # log jako część disruption node
+        is_part_of = [
+            {
+                "@type": "CreativeWorkSeries",
+                "name": f"DISRUPTION // {disruption_name}",
+                "url": disruption_url,
+            },
+            is_part_of,
+        ]
+
+    data = {
+        "@context": "https://schema.org",
+        "@type": "Article",
+        "headline": title,
+        "author": {
+            "@type": "Organization",
+            "name": "OX500",
+            "url": base_url,
+            "sameAs": [github_repo] if github_repo else [],
+        },
+        "publisher": {
+            "@type": "Organization",
+            "name": "OX500",
+            "logo": {"@type": "ImageObject", "url": logo or og_image},
+        },
+        "datePublished": date,
+        "dateModified": date,
+        "mainEntityOfPage": {"@type": "WebPage", "@id": f"{base_url}{url_path}"},
+        "inLanguage": "en",
+        "isPartOf": is_part_of,
+    }
+
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def jsonld_collection_page(base_url, url_path, name, description, date, og_image, github_repo, logo=None):
+    date = normalize_date(date)
+    data = {
+        "@context": "https://schema.org",
+        "@type": "CollectionPage",
+        "name": name,
+        "description": description,
+        "url": f"{base_url}{url_path}",
+        "dateModified": date,
+        "isPartOf": {
+            "@type": "WebSite",
+            "name": "OX500",
+            "url": f"{base_url}/",
+            "codeRepository": github_repo,
+        },
+        "publisher": {
+            "@type": "Organization",
+            "name": "OX500",
+            "logo": {"@type": "ImageObject", "url": logo or og_image},
+        },
+    }
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def jsonld_disruption_node(base_url, url_path, disruption_name, date, og_image, github_repo, logo=None):
+    return jsonld_collection_page(
+        base_url,
+        url_path,
+        f"DISRUPTION // {disruption_name}",
+        f"OX500 disruption node: {disruption_name}",
+        date,
+        og_image,
+        github_repo,
+        logo=logo,
+    )
+
+
+# ---------------------------
+# ARCHIVE SOURCE (logs.json)
+# ---------------------------
+JSON_WS_RE = re.compile(r"[ \t\r\n]*")
+
+
+def scan_archive(path: Path, chunk_size: int = 1 << 20):
+    """Stream the top level of logs.json without loading the whole file.
+
+    Yields ("logs", record, offset, length) for every element of the "logs" array
+    (offset/length = byte span of the record in the file) and (key, value) for any
+    other top-level entry, e.g. ("site", {...}).
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+
+    with path.open("rb") as f:
+        buf = ""
+        i = 0  # read position in buf
+        pos = 0  # byte offset of buf[i] in the file
+        eof = False
+
+        def fill():
+            nonlocal buf, i, eof
+            data = f.read(chunk_size)
+            eof = not data
+            buf = buf[i:] + utf8.decode(data, final=eof)
+            i = 0
+
+        def skip_ws():
+            nonlocal i, pos
+            while True:
+                end = JSON_WS_RE.match(buf, i).end()
+                pos += end - i
+                i = end
+                if i < len(buf) or eof:
+                    return
+                fill()
+
+        def expect(ch: str):
+            nonlocal i, pos
+            skip_ws()
+            if buf[i:i + 1] != ch:
+                raise ValueError(f"{path.name}: expected {ch!r} at byte {pos}")
+            i += 1
+            pos += 1
+
+        def peek() -> str:
+            skip_ws()
+            return buf[i:i + 1]
+
+        def value():
+            # -> (value, byte length); reads more of the file until the value is complete
+            nonlocal i, pos
+            skip_ws()
+            while True:
+                try:
+                    v, end = decoder.raw_decode(buf, i)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    fill()
+                    continue
+                if end == len(buf) and not eof:
+                    # a number / literal may continue in the next chunk
+                    fill()
+                    continue
+                length = len(buf[i:end].encode("utf-8"))
+                i = end
+                pos += length
+                return v, length
+
+        expect("{")
+        if peek() == "}":
+            return
+        while True:
+            key, _ = value()
+            expect(":")
+            if key == "logs" and peek() == "[":
+                expect("[")
+                if peek() == "]":
+                    expect("]")
+                else:
+                    while True:
+                        skip_ws()
+                        start = pos
+                        record, length = value()
+                        yield "logs", record, start, length
+                        if peek() != ",":
+                            break
+                        expect(",")
+                    expect("]")
+            else:
+                v, _ = value()
+                yield key, v
+            if peek() != ",":
+                break
+            expect(",")
+        expect("}")
+
+
+class LogStore:
+    """Full log records, indexed like SiteGraph.logs (newest first).
+
+    Default build keeps the records in memory. With --stream / sharded sources only the
+    byte span of each record (source file, offset, length) is kept and the record is
+    re-read when its page is rendered.
+    """
+
+    __slots__ = ("records", "paths", "files", "offsets", "lengths", "_fhs")
+
+    def __init__(self, records=None, paths=(), spans=()):
+        self.records = records
+        self.paths = list(paths)
+        self.files = array("i", (s[0] for s in spans))
+        self.offsets = array("q", (s[1] for s in spans))
+        self.lengths = array("q", (s[2] for s in spans))
+        self._fhs = {}
+
+    def get(self, i: int) -> dict:
+        if self.records is not None:
+            return self.records[i]
+        n = self.files[i]
+        fh = self._fhs.get(n)
+        if fh is None:
+            fh = self._fhs[n] = self.paths[n].open("rb")
+        fh.seek(self.offsets[i])
+        return json.loads(fh.read(self.lengths[i]).decode("utf-8"))
+
+    def __getstate__(self):
+        # open file handles don't cross process boundaries (--jobs); workers reopen lazily
+        return (self.records, self.paths, self.files, self.offsets, self.lengths)
+
+    def __setstate__(self, state):
+        self.records, self.paths, self.files, self.offsets, self.lengths = state
+        self._fhs = {}
+
+
+def light_record(log: dict) -> dict:
+    # Everything ordering, PREV/NEXT, node lists and grouping need — no excerpt / text
+    return {
+        "id": log["id"],
+        "date": log.get("date", ""),
+        "slug": log["slug"],
+        "series": log.get("series") or log.get("disruption") or "",
+        "title": log.get("title", ""),
+    }
+
+
+def validate_log(log, where: str) -> None:
+    if not isinstance(log, dict):
+        raise ValueError(f"{where}: log entry must be an object")
+    log_id = log.get("id")
+    if not isinstance(log_id, str) or not log_id.isdigit():
+        raise ValueError(f"{where}: log id must be a numeric string, got {log_id!r}")
+    if not isinstance(log.get("title"), str):
+        raise ValueError(f"{where}: log {log_id} has no title")
+
+
+def prepare_log(log, where: str) -> dict:
+    validate_log(log, where)
+    log["slug"] = slugify(log.get("slug") or log.get("title", ""))
+    return log
+
+
+def index_source(path: Path) -> dict:
+    """Pass 1 for one source file (logs.json or a shard).
+
+    -> {"site": site block or None, "entries": [[light_record, record_hash, offset, length], ...]}
+    """
+    site = None
+    entries = []
+    for item in scan_archive(path):
+        if item[0] == "site":
+            site = item[1]
+        elif item[0] == "logs":
+            _, l, offset, length = item
+            prepare_log(l, f"{path.name} @ byte {offset}")
+            entries.append([light_record(l), record_hash(l), offset, length])
+    return {"site": site, "entries": entries}
+
+
+def _source_cache_path(path: Path, cache_dir: Path = SOURCE_CACHE_DIR) -> Path:
+    return cache_dir / f"{text_hash(str(path.resolve()))[:24]}.json"
+
+
+def load_source_indexes(paths: list, jobs: int = 1, cache_dir: Path = SOURCE_CACHE_DIR) -> list:
+    """index_source() for every path, reusing cached indexes of files that did not change.
+
+    A file is skipped when its size/mtime match the cache, or — if those moved — when its
+    content hash still does. Changed files are parsed + validated concurrently (--jobs).
+    cache_dir None: every file is parsed, nothing is cached.
+    """
+    indexes = [None] * len(paths)
+    stale = []
+    for n, path in enumerate(paths):
+        st = path.stat()
+        stat_key = [st.st_size, st.st_mtime_ns]
+        if cache_dir is None:
+            stale.append((n, stat_key, None))
+            continue
+        try:
+            cached = json.loads(read_text(_source_cache_path(path, cache_dir)))
+        except (OSError, ValueError):
+            cached = None
+        if cached and cached.get("stat") == stat_key:
+            indexes[n] = cached
+            continue
+        h = file_hash(path)
+        if cached and cached.get("hash") == h:
+            cached["stat"] = stat_key
+            write_text(_source_cache_path(path, cache_dir), json.dumps(cached, ensure_ascii=False))
+            indexes[n] = cached
+            continue
+        stale.append((n, stat_key, h))
+
+    if jobs > 1 and len(stale) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(index_source, [paths[n] for n, _, _ in stale]))
+    else:
+        results = [index_source(paths[n]) for n, _, _ in stale]
+
+    for (n, stat_key, h), idx in zip(stale, results):
+        indexes[n] = idx
+        if cache_dir is not None:
+            idx["stat"] = stat_key
+            idx["hash"] = h
+            write_text(_source_cache_path(paths[n], cache_dir), json.dumps(idx, ensure_ascii=False))
+
+    return indexes
+
+
+def load_archive(
+    paths: list,
+    stream: bool = False,
+    jobs: int = 1,
+    previous: dict = None,
+    data: dict = None,
+    cache_dir: Path = SOURCE_CACHE_DIR,
+):
+    """First pass over the archive sources -> (site, [(log, record_hash, span), ...]).
+
+    paths = [logs.json] and/or shard files from logs/. Slugs are normalized and records
+    validated here. A single source without stream loads full records (span None).
+    Otherwise log is a light_record() and span = (source index, byte offset, byte length).
+    previous = {id: (log, record_hash)} of an earlier load (serve / watch): full records
+    equal to their previous version keep its hash instead of being serialized again.
+    data = an in-memory archive (library API) instead of paths: full records, copied so
+    the caller's logs are not normalized in place.
+    """
+    site = None
+    entries = []
+
+    if data is not None or (len(paths) == 1 and not stream):
+        cfg = data if data is not None else json.loads(read_text(paths[0]))
+        where = "archive" if data is not None else paths[0].name
+        site = cfg.get("site")
+        for n, l in enumerate(cfg.get("logs", [])):
+            if data is not None and isinstance(l, dict):
+                l = dict(l)
+            prepare_log(l, f"{where} logs[{n}]")
+            old = previous.get(l["id"]) if previous else None
+            entries.append((l, old[1] if old is not None and old[0] == l else record_hash(l), None))
+    else:
+        for n, idx in enumerate(load_source_indexes(paths, jobs, cache_dir)):
+            # site block: logs.json wins, else the first shard that carries one
+            if site is None:
+                site = idx["site"]
+            for light, h, offset, length in idx["entries"]:
+                entries.append((light, h, (n, offset, length)))
+
+    if site is None:
+        where = "archive" if data is not None else ", ".join(p.name for p in paths)
+        raise ValueError(f"{where}: missing \"site\" block")
+
+    seen = set()
+    for e in entries:
+        if e[0]["id"] in seen:
+            raise ValueError(f"duplicate log id {e[0]['id']}")
+        seen.add(e[0]["id"])
+    return site, entries
+
+
+# ---------------------------
+# URL PATHS
+# ---------------------------
+def make_rel_path(log, ym: tuple = None):
+    y, m = ym or ym_from_date(log.get("date", ""))
+    # one Path() parse instead of three joins: called once per log per build (SiteGraph)
+    return Path(f'logs/{y}/{m}/log-{log["id"]}-{log["slug"]}.html')
+
+
+def make_url_path(rel_path: Path):
+    return "/" + rel_path.as_posix()
+
+
+def make_disruption_rel_path(d_slug: str):
+    # ✅ zgodnie z Twoim wymaganiem: disruption/im-not-done.html (bez "series")
+    return Path("disruption") / f"{d_slug}.html"
+
+
+ARCHIVE_REL_PATH = Path("archive.html")
+
+
+def make_list_page_rel_path(first_page: Path, page: int) -> Path:
+    # page 1 keeps the plain URL: disruption/x.html -> disruption/x/page/2.html, archive/page/2.html
+    if page == 1:
+        return first_page
+    return first_page.with_suffix("") / "page" / f"{page}.html"
+
+
+def list_page_count(total: int, page_size: int) -> int:
+    return max(1, -(-total // page_size)) if page_size else 1
+
+
+# ---------------------------
+# SITE GRAPH
+# ---------------------------
+# One indexing pass over the published logs (newest first). Pages, feeds, the API, the
+# sitemap and JSON-LD read ids, dates, URLs, neighbours and disruption membership from
+# here instead of re-deriving them per page. Records are __slots__ objects: small, and
+# picklable, so --jobs workers get the whole graph once with ctx.
+class LogNode:
+    """One log: everything but excerpt / text (those stay in LogStore)."""
+
+    __slots__ = (
+        "index", "prev", "next", "id", "num", "title", "date", "day", "ym",
+        "slug", "rel_path", "url_path", "link", "disruption", "series",
+    )
+
+    def __init__(self, log: dict, disruption: str = None, series: str = None):
+        d = parse_log_date(log.get("date", ""))
+        self.index = self.prev = self.next = None  # set by SiteGraph
+        self.id = log["id"]
+        self.num = int(log["id"])
+        self.title = log.get("title", "")
+        self.date = log.get("date", "")  # as written in logs.json
+        self.day = d.date().isoformat()  # normalized (sitemap lastmod, JSON-LD, feeds)
+        self.ym = (f"{d.year:04d}", f"{d.month:02d}")
+        self.slug = log["slug"]
+        self.rel_path = make_rel_path(log, self.ym)
+        self.url_path = make_url_path(self.rel_path)
+        # what other pages show of this log (PREV/NEXT, node lists): their freshness keys use it
+        self.link = record_hash([self.id, self.title, self.date, self.slug])
+        self.disruption = disruption  # node slug or None
+        self.series = series  # display name as written on this log
+
+
+class DisruptionNode:
+    __slots__ = ("slug", "name", "logs", "rel_path", "url_path")
+
+    def __init__(self, slug: str, name: str):
+        self.slug = slug
+        self.name = name
+        self.logs = []  # LogNode, newest first
+        self.rel_path = make_disruption_rel_path(slug)
+        self.url_path = make_url_path(self.rel_path)
+
+
+class SiteGraph:
+    """logs: LogNode newest first (index i = logs[i]); disruptions: slug -> DisruptionNode;
+    order: disruption slugs, newest log first.
+
+    known = {log hash: LogNode} of an earlier graph (serve / watch): logs with the same
+    hash reuse their node, only index / neighbours are reassigned.
+    """
+
+    __slots__ = ("logs", "disruptions", "order")
+
+    def __init__(self, logs: list, hashes: list = None, known: dict = None):
+        self.logs = []
+        self.disruptions = {}
+        names = {}  # raw series value -> (name, slug): a handful of values across all logs
+        for i, log in enumerate(logs):
+            node = known.get(hashes[i]) if known else None
+            if node is None:
+                raw = (log.get("series") or log.get("disruption") or "").strip()
+                if raw and raw not in names:
+                    names[raw] = (disruption_display_name(raw), disruption_slug(raw))
+                series, d_slug = names[raw] if raw else (None, None)
+                node = LogNode(log, d_slug, series)
+            node.index = i
+            node.next = i - 1 if i > 0 else None  # newer
+            node.prev = i + 1 if i + 1 < len(logs) else None  # older
+            self.logs.append(node)
+            if node.disruption:
+                d = self.disruptions.get(node.disruption)
+                if d is None:
+                    d = self.disruptions[node.disruption] = DisruptionNode(node.disruption, node.series)
+                d.logs.append(node)
+        self.order = sorted(self.disruptions, key=lambda k: self.disruptions[k].logs[0].num, reverse=True)
+
+    def newer(self, node: LogNode):
+        return self.logs[node.next] if node.next is not None else None
+
+    def older(self, node: LogNode):
+        return self.logs[node.prev] if node.prev is not None else None
+
+
+# ---------------------------
+# SEARCH INDEX (--search)
+# ---------------------------
+# dist/search/meta.json          format + shard list
+# dist/search/t/<prefix>.json    {term: [log_id, weight, log_id, weight, ...]} best first
+# dist/search/d/<block>.json     {log_id: [title, url, date]} for ids block*N .. block*N+N-1
+# Postings reference log ids (not positions), so a new log only touches its own shards.
+SEARCH_TERM_RE = re.compile(r"[^\W_]+(?:['’][^\W_]+)*")
+SEARCH_SHARD_SAFE_RE = re.compile(r"[a-z0-9]+")
+SEARCH_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "was", "with",
+}
+
+# Injected after the top bar of every template (search.js wires up form[data-ox500-search])
+SEARCH_BOX = (
+    '<form class="site-search" role="search" action="#" data-ox500-search>'
+    '<input type="search" name="q" placeholder="SEARCH LOGS" aria-label="Search logs" autocomplete="off">'
+    '<ol class="site-search-results" aria-live="polite"></ol></form>'
+    f'<script src="/{SEARCH_SCRIPT_REL.as_posix()}" defer></script>'
+)
+
+
+def with_search_box(markup: str) -> str:
+    head, sep, tail = markup.partition("</header>")
+    if sep:
+        return head + sep + "\n" + SEARCH_BOX + tail
+    head, sep, tail = markup.rpartition("</body>")
+    return head + SEARCH_BOX + "\n" + sep + tail if sep else markup + SEARCH_BOX
+
+
+def search_tokens(text: str) -> list:
+    """Lowercased words without apostrophes (i’m -> im); search.js tokenizes the same way."""
+    out = []
+    for w in SEARCH_TERM_RE.findall((text or "").lower()):
+        w = w.replace("'", "").replace("’", "")
+        if len(w) >= 2 and w not in SEARCH_STOPWORDS:
+            out.append(w)
+    return out
+
+
+def search_terms(log: dict) -> dict:
+    """term -> weight for one log (title counts most, then excerpt, then text)."""
+    terms = {}
+    for field, weight in SEARCH_FIELDS:
+        for w in search_tokens(log.get(field, "")):
+            terms[w] = terms.get(w, 0) + weight
+    return terms
+
+
+def search_shard_name(term: str) -> str:
+    prefix = term[:SEARCH_PREFIX_LEN]
+    if SEARCH_SHARD_SAFE_RE.fullmatch(prefix):
+        return prefix
+    return "u" + "-".join(f"{ord(c):x}" for c in prefix)
+
+
+def search_shards(postings: dict) -> dict:
+    """{log_id: {term: weight}} -> {shard: {term: [id, weight, ...]}}."""
+    by_term = {}
+    for log_id, terms in postings.items():
+        n = int(log_id)
+        for term, weight in terms.items():
+            by_term.setdefault(term, []).append((weight, n))
+    shards = {}
+    for term in sorted(by_term):
+        flat = []
+        for weight, n in sorted(by_term[term], reverse=True):
+            flat += (n, weight)
+        shards.setdefault(search_shard_name(term), {})[term] = flat
+    return shards
+
+
+def load_search_cache(path: Path = SEARCH_CACHE) -> dict:
+    if path is None:
+        return {}
+    try:
+        data = json.loads(read_text(path))
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != SEARCH_INDEX_VERSION:
+        return {}
+    return data.get("logs", {})
+
+
+# ---------------------------
+# PAGES (log + disruption node)
+# ---------------------------
+# ctx = everything a page needs besides its own log / node:
+#   graph (SiteGraph), store (full records, indexed like graph.logs),
+#   t_log, t_node, lang, base_url, og_image, logo, youtube, bandcamp, github_repo,
+#   out_dir (staging generation), prev_dir (live dist/ to reuse unchanged files from)
+# Pages depend only on ctx, so they can be rendered in any order / any process (--jobs).
+SHOW_PREV_NEXT_TITLES_IN_TEXT = False
+
+
+def nav_text(prefix: str, target: LogNode) -> str:
+    if not SHOW_PREV_NEXT_TITLES_IN_TEXT:
+        return prefix
+    return f"{prefix}: {target.title.strip()}"
+
+
+def render_log_page(ctx: dict, i: int) -> str:
+    graph = ctx["graph"]
+    base_url = ctx["base_url"]
+    og_image = ctx["og_image"]
+    node = graph.logs[i]
+    log = ctx["store"].get(i)
+
+    url_path = node.url_path
+    canonical = f"{base_url}{url_path}"
+
+    # PREV / NEXT
+    # graph.logs is newest first, so:
+    # newer log = NEXT, older log = PREV
+    next_log = graph.newer(node)
+    prev_log = graph.older(node)
+
+    # Build navigation parts
+    nav_parts = ['<a class="nav-home" href="/" rel="home">← CORE INTERFACE</a>']
+
+    if prev_log:
+        nav_parts.append(
+            f'<span>·</span>\n                  '
+            f'<a class="nav-prev" href="{prev_log.url_path}" '
+            f'rel="prev" title="LOG {prev_log.id} // {html.escape(prev_log.title)}">'
+            f'{nav_text("PREV", prev_log)}</a>'
+        )
+
+    if next_log:
+        nav_parts.append(
+            f'<span>·</span>\n                  '
+            f'<a class="nav-next" href="{next_log.url_path}" '
+            f'rel="next" title="LOG {next_log.id} // {html.escape(next_log.title)}">'
+            f'{nav_text("NEXT", next_log)}</a>'
+        )
+
+    full_nav = '\n                  '.join(nav_parts)
+
+    # DISRUPTION LINK
+    node_meta = ""
+    d_name = None
+    d_url = None
+
+    if node.disruption:
+        d_name = node.series
+        d_path = graph.disruptions[node.disruption].url_path
+        d_url = f"{base_url}{d_path}"
+        node_meta = f'NODE: <a href="{d_path}" rel="up">{html.escape(d_name)}</a> · '
+
+    page_title = f"LOG {log['id']} // {log['title']} — OX500"
+    description = f"{log.get('title', '')} — {log.get('excerpt', '')[:150]}"
+    og_desc = f"{log.get('excerpt', '')[:200]}"
+
+    return render(
+        ctx["t_log"],
+        {
+            "LANG": ctx["lang"],
+            "PAGE_TITLE": html.escape(page_title),
+            "DESCRIPTION": html.escape(description),
+            "CANONICAL": canonical,
+            "OG_TITLE": html.escape(page_title),
+            "OG_DESC": html.escape(og_desc),
+            "OG_IMAGE": og_image,
+            "JSONLD": jsonld_article(
+                base_url,
+                url_path,
+                f"LOG {log['id']} // {log['title']}",
+                node.day,
+                og_image,
+                ctx["github_repo"],
+                disruption_name=d_name,
+                disruption_url=d_url,
+                logo=ctx["logo"],
+            ),
+            "LOG_ID": html.escape(log["id"]),
+            "LOG_TITLE": html.escape(log["title"]),
+            "LOG_DATE": html.escape(log.get("date", "")),
+            "LOG_TEXT": html.escape(log.get("text", "").rstrip()) + "\n",
+            "NODE_META": node_meta,
+            "FULL_NAV": full_nav,
+            "YOUTUBE": ctx["youtube"],
+            "BANDCAMP": ctx["bandcamp"],
+            "GITHUB": ctx["github_repo"],
+            "BASE_URL": base_url,
+        },
+    )
+
+
+def log_line_html(node: LogNode) -> str:
+    return (
+        f'<a class="log-line" href="{node.url_path}">'
+        f'<span class="log-id">LOG: {html.escape(node.id)}</span>'
+        f'<span class="log-tag">{html.escape(node.title)}</span>'
+        f"</a>"
+    )
+
+
+def list_page(ctx: dict, first_page: Path, logs: list, page: int) -> dict:
+    """One page of a newest-first listing: only this page's slice of logs is rendered."""
+    size = ctx["page_size"]
+    pages = list_page_count(len(logs), size)
+    page_logs = logs[(page - 1) * size : page * size] if size else logs
+    base_url = ctx["base_url"]
+
+    head_links = []
+    pager = []
+    if page > 1:
+        prev_url = make_url_path(make_list_page_rel_path(first_page, page - 1))
+        head_links.append(f'\n  <link rel="prev" href="{base_url}{prev_url}" />')
+        pager.append(f'<a class="nav-prev" href="{prev_url}" rel="prev">← PAGE {page - 1}</a>')
+    if pages > 1:
+        pager.append(f'<span class="log-id">PAGE {page} / {pages}</span>')
+    if page < pages:
+        next_url = make_url_path(make_list_page_rel_path(first_page, page + 1))
+        head_links.append(f'\n  <link rel="next" href="{base_url}{next_url}" />')
+        pager.append(f'<a class="nav-next" href="{next_url}" rel="next">PAGE {page + 1} →</a>')
+
+    lines = [log_line_html(l) for l in page_logs]
+    if pager:
+        lines.append(f'<nav aria-label="Pages" class="log-nav">{" ".join(pager)}</nav>')
+    return {
+        "url_path": make_url_path(make_list_page_rel_path(first_page, page)),
+        "pages": pages,
+        "newest_date": page_logs[0].day if page_logs else "",
+        "suffix": f" · PAGE {page}" if page > 1 else "",
+        "meta_suffix": f" · PAGE {page}/{pages}" if pages > 1 else "",
+        "PAGE_LINKS": "".join(head_links),
+        "NODE_LOG_LIST": "\n".join(lines),
+    }
+
+
+def render_node_page(ctx: dict, key: tuple) -> str:
+    d_slug, page = key
+    base_url = ctx["base_url"]
+    og_image = ctx["og_image"]
+    d = ctx["graph"].disruptions[d_slug]
+    d_name = d.name
+    d_logs = d.logs  # newest first
+    count = len(d_logs)
+
+    lp = list_page(ctx, d.rel_path, d_logs, page)
+    url_path = lp["url_path"]
+    canonical = f"{base_url}{url_path}"
+    newest_date = lp["newest_date"] or ctx["today"]
+
+    page_title = f"DISRUPTION // {d_name}{lp['suffix']} — OX500"
+    description = f"OX500 disruption node: {d_name}. Contains {count} log pages."
+    og_desc = f"DISRUPTION // {d_name} [{count}]"
+
+    return render(
+        ctx["t_node"],
+        {
+            "LANG": ctx["lang"],
+            "PAGE_TITLE": html.escape(page_title),
+            "DESCRIPTION": html.escape(description),
+            "CANONICAL": canonical,
+            "PAGE_LINKS": lp["PAGE_LINKS"],
+            "OG_TITLE": html.escape(page_title),
+            "OG_DESC": html.escape(og_desc),
+            "OG_IMAGE": og_image,
+            "JSONLD": jsonld_disruption_node(
+                base_url,
+                url_path,
+                d_name,
+                newest_date,
+                og_image,
+                ctx["github_repo"],
+                logo=ctx["logo"],
+            ),
+            "H1": html.escape(f"DISRUPTION // {d_name} [{count}]"),
+            "META": html.escape(f"OX500 // DISRUPTION_FEED · NODE · LOGS: {count}{lp['meta_suffix']}"),
+            "NODE_LOG_LIST": lp["NODE_LOG_LIST"],
+            "YOUTUBE": ctx["youtube"],
+            "BANDCAMP": ctx["bandcamp"],
+            "GITHUB": ctx["github_repo"],
+            "BASE_URL": base_url,
+        },
+    )
+
+
+def render_archive_page(ctx: dict, page: int) -> str:
+    base_url = ctx["base_url"]
+    og_image = ctx["og_image"]
+    logs = ctx["graph"].logs  # newest first
+    count = len(logs)
+
+    lp = list_page(ctx, ARCHIVE_REL_PATH, logs, page)
+    url_path = lp["url_path"]
+    newest_date = lp["newest_date"] or ctx["today"]
+
+    page_title = f"ARCHIVE // ALL LOGS{lp['suffix']} — OX500"
+    description = f"OX500 system archive: all {count} logs, newest first."
+
+    return render(
+        ctx["t_archive"],
+        {
+            "LANG": ctx["lang"],
+            "PAGE_TITLE": html.escape(page_title),
+            "DESCRIPTION": html.escape(description),
+            "CANONICAL": f"{base_url}{url_path}",
+            "PAGE_LINKS": lp["PAGE_LINKS"],
+            "OG_TITLE": html.escape(page_title),
+            "OG_DESC": html.escape(f"ARCHIVE // ALL LOGS [{count}]"),
+            "OG_IMAGE": og_image,
+            "JSONLD": jsonld_collection_page(
+                base_url,
+                url_path,
+                "ARCHIVE // ALL LOGS",
+                description,
+                newest_date,
+                og_image,
+                ctx["github_repo"],
+                logo=ctx["logo"],
+            ),
+            "H1": html.escape(f"ARCHIVE // ALL LOGS [{count}]"),
+            "META": html.escape(f"OX500 // ARCHIVE · LOGS: {count}{lp['meta_suffix']}"),
+            "NODE_LOG_LIST": lp["NODE_LOG_LIST"],
+            "YOUTUBE": ctx["youtube"],
+            "BANDCAMP": ctx["bandcamp"],
+            "GITHUB": ctx["github_repo"],
+            "BASE_URL": base_url,
+        },
+    )
+
+
+# ---------------------------
+# JSON API + FEEDS (--api)
+# ---------------------------
+# /api/index.json, /api/logs/page-N.json (newest first), /api/logs/<id>.json,
+# /api/disruptions/<slug>.json, /feed.json (JSON Feed 1.1), /atom.xml.
+# Same freshness keys / write-avoidance as the HTML pages: unchanged files keep their mtime.
+def api_dumps(data) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def api_log_rel_path(log_id: str) -> Path:
+    return API_DIR / "logs" / f"{log_id}.json"
+
+
+def api_page_rel_path(page: int) -> Path:
+    return API_DIR / "logs" / f"page-{page}.json"
+
+
+def api_disruption_rel_path(d_slug: str) -> Path:
+    return API_DIR / "disruptions" / f"{d_slug}.json"
+
+
+def api_log_summary(ctx: dict, node: LogNode) -> dict:
+    return {
+        "id": node.id,
+        "title": node.title,
+        "date": node.date,
+        "slug": node.slug,
+        "disruption": node.disruption,
+        "url": f"{ctx['base_url']}{node.url_path}",
+        "api": make_url_path(api_log_rel_path(node.id)),
+    }
+
+
+def render_api_log(ctx: dict, i: int) -> str:
+    graph = ctx["graph"]
+    node = graph.logs[i]
+    log = ctx["store"].get(i)
+    next_log = graph.newer(node)
+    prev_log = graph.older(node)
+    data = api_log_summary(ctx, node)
+    data.update(
+        {
+            "tag": log.get("tag", ""),
+            "series": node.series,
+            "excerpt": log.get("excerpt", ""),
+            "text": log.get("text", ""),
+            "prev": prev_log.id if prev_log else None,
+            "next": next_log.id if next_log else None,
+        }
+    )
+    return api_dumps(data)
+
+
+def render_api_page(ctx: dict, page: int) -> str:
+    logs = ctx["graph"].logs
+    pages = list_page_count(len(logs), API_PAGE_SIZE)
+    page_logs = logs[(page - 1) * API_PAGE_SIZE : page * API_PAGE_SIZE]
+    return api_dumps(
+        {
+            "page": page,
+            "pages": pages,
+            "page_size": API_PAGE_SIZE,
+            "total": len(logs),
+            "prev": make_url_path(api_page_rel_path(page - 1)) if page > 1 else None,
+            "next": make_url_path(api_page_rel_path(page + 1)) if page < pages else None,
+            "logs": [api_log_summary(ctx, l) for l in page_logs],
+        }
+    )
+
+
+def render_api_disruption(ctx: dict, d_slug: str) -> str:
+    d = ctx["graph"].disruptions[d_slug]
+    return api_dumps(
+        {
+            "slug": d_slug,
+            "name": d.name,
+            "url": f"{ctx['base_url']}{d.url_path}",
+            "count": len(d.logs),
+            "logs": [api_log_summary(ctx, l) for l in d.logs],
+        }
+    )
+
+
+def feed_timestamp(date: str) -> str:
+    return f"{normalize_date(date)}T00:00:00Z"
+
+
+def render_json_feed(ctx: dict, site_title: str, items: list) -> str:
+    """items = [(LogNode, full log), ...] newest first"""
+    base_url = ctx["base_url"]
+    feed = {
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": site_title,
+        "home_page_url": f"{base_url}/",
+        "feed_url": f"{base_url}{make_url_path(JSON_FEED_REL_PATH)}",
+        "icon": ctx["og_image"],
+        "language": ctx["lang"],
+        "items": [],
+    }
+    for node, log in items:
+        url = f"{base_url}{node.url_path}"
+        item = {
+            "id": url,
+            "url": url,
+            "title": f"LOG {node.id} // {node.title}",
+            "summary": log.get("excerpt", ""),
+            "content_text": log.get("text", ""),
+            "date_published": feed_timestamp(node.day),
+        }
+        if node.series:
+            item["tags"] = [node.series]
+        feed["items"].append(item)
+    return json.dumps(feed, ensure_ascii=False, indent=1)
+
+
+def render_atom_feed(ctx: dict, site_title: str, items: list) -> str:
+    """items = [(LogNode, full log), ...] newest first"""
+    base_url = ctx["base_url"]
+    esc = html.escape
+    updated = max((feed_timestamp(node.day) for node, _ in items), default=feed_timestamp(normalize_date("")))
+    parts = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        f'<feed xmlns="http://www.w3.org/2005/Atom" xml:lang="{esc(ctx["lang"])}">',
+        f"  <title>{esc(site_title)}</title>",
+        f"  <id>{esc(base_url)}/</id>",
+        f'  <link href="{esc(base_url)}/" />',
+        f'  <link rel="self" href="{esc(base_url)}{make_url_path(ATOM_FEED_REL_PATH)}" />',
+        f"  <updated>{updated}</updated>",
+        "  <author><name>OX500</name></author>",
+    ]
+    for node, log in items:
+        url = esc(f"{base_url}{node.url_path}")
+        title = f"LOG {node.id} // {node.title}"
+        published = feed_timestamp(node.day)
+        parts += [
+            "  <entry>",
+            f"    <title>{esc(title)}</title>",
+            f"    <id>{url}</id>",
+            f'    <link href="{url}" />',
+            f"    <published>{published}</published>",
+            f"    <updated>{published}</updated>",
+            f"    <summary>{esc(log.get('excerpt', ''))}</summary>",
+            f'    <content type="text">{esc(log.get("text", ""))}</content>',
+            "  </entry>",
+        ]
+    parts.append("</feed>")
+    return "\n".join(parts) + "\n"
+
+
+PAGE_RENDERERS = {
+    "log": render_log_page,
+    "node": render_node_page,
+    "archive": render_archive_page,
+    "api_log": render_api_log,
+    "api_page": render_api_page,
+    "api_disruption": render_api_disruption,
+}
+
+
+def write_page(ctx: dict, task: tuple) -> tuple:
+    """-> (write_output() result, render seconds, write seconds)
+
+    Without ctx["output"] (page workers of a memory / archive build) the result is
+    (rel_path, data) and the parent process writes it.
+    """
+    kind, key, rel_path = task
+    t0 = time.perf_counter()
+    data = PAGE_RENDERERS[kind](ctx, key).encode("utf-8")
+    t1 = time.perf_counter()
+    if ctx["output"] is None:
+        return (rel_path, data), t1 - t0, 0.0
+    result = ctx["output"].write(rel_path, data)
+    return result, t1 - t0, time.perf_counter() - t1
+
+
+# ===== WORKER POOL (--jobs) =====
+_WORKER_CTX = None
+
+
+def _init_page_worker(ctx: dict) -> None:
+    global _WORKER_CTX
+    _WORKER_CTX = ctx
+
+
+def _pool_write_page(task: tuple) -> tuple:
+    return write_page(_WORKER_CTX, task)
+
+
+def write_pages(ctx: dict, tasks: list, jobs: int = 1):
+    """Render + write page tasks [(kind, key, rel_path), ...], optionally across a process pool.
+
+    Each task writes its own file, so the output does not depend on scheduling order.
+    Yields write_page() results in task order.
+    """
+    if jobs <= 1 or len(tasks) < 2:
+        for task in tasks:
+            yield write_page(ctx, task)
+        return
+
+    # ctx is shipped once per worker (initializer), not once per page
+    chunksize = max(1, len(tasks) // (jobs * 8))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_page_worker, initargs=(ctx,)) as pool:
+        yield from pool.map(_pool_write_page, tasks, chunksize=chunksize)
+
+
+# ---------------------------
+# PAGE WEIGHT AUDIT (--audit)
+# ---------------------------
+# What a page makes the browser load: src= / href= attributes and url(...) values
+# (literal alternatives without \b: several times faster to scan, data-src= counts too)
+AUDIT_REF_RE = re.compile(
+    r"""(?:src=|href=|url\()["']?(?P<base>https?://[^/"'()\s]+)?(?P<path>/[^"'()\s?#]+\.[A-Za-z0-9]+)"""
+)
+
+
+class BudgetError(ValueError):
+    pass
+
+
+def page_kind(rel_s: str):
+    """Page type of an HTML output for budgets: log / node / archive / index (None = not a page)."""
+    if not rel_s.endswith(".html"):
+        return None
+    if rel_s == "index.html":
+        return "index"
+    if rel_s == ARCHIVE_REL_PATH.as_posix() or rel_s.startswith("archive/"):
+        return "archive"
+    if rel_s.startswith("disruption/"):
+        return "node"
+    if rel_s.startswith("logs/"):
+        return "log"
+    return None
+
+
+def local_refs(text: str, base_url: str) -> list:
+    """Root-relative paths (no leading /) of this site's assets that text loads."""
+    refs = set()
+    for m in AUDIT_REF_RE.finditer(text):
+        base = m.group("base")
+        path = m.group("path")
+        if (base is None or base == base_url) and os.path.splitext(path)[1].lower() in AUDIT_ASSET_SUFFIXES:
+            refs.add(path[1:])
+    return sorted(refs)
+
+
+def audit_page(data: bytes, base_url: str) -> list:
+    """-> [html bytes, gzip bytes, local refs]"""
+    packed = gzip.compress(data, compresslevel=AUDIT_GZIP_LEVEL, mtime=0)
+    return [len(data), len(packed), local_refs(data.decode("utf-8"), base_url)]
+
+
+def audit_pages(files: dict, output, base_url: str, budgets: dict, cache_path: Path = None, jobs: int = 1) -> dict:
+    """Measure every page in files (rel -> sha256) and check it against budgets -> report.
+
+    Assets count once per page: what its HTML references plus what referenced stylesheets
+    pull in through url(...). Measurements are cached by page hash, so an incremental
+    build only re-reads the pages it changed.
+    """
+    cached = {}
+    if cache_path is not None:
+        try:
+            cached = json.loads(read_text(cache_path))
+        except (OSError, ValueError):
+            cached = {}
+    pages = [(rel_s, page_kind(rel_s)) for rel_s in sorted(files)]
+    pages = [(rel_s, kind) for rel_s, kind in pages if kind is not None]
+    todo = [rel_s for rel_s, _ in pages if files[rel_s] not in cached]
+
+    def measure(rel_s: str) -> list:
+        return audit_page(output.read(rel_s), base_url)
+
+    if jobs > 1 and len(todo) > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            measured = dict(zip(todo, pool.map(measure, todo)))
+    else:
+        measured = {rel_s: measure(rel_s) for rel_s in todo}
+
+    css_refs = {}
+    asset_sizes = {}
+    types = {}
+    largest = []
+    over = []
+    used = {}
+    for rel_s, kind in pages:
+        sha = files[rel_s]
+        entry = used[sha] = measured[rel_s] if rel_s in measured else cached[sha]
+        html_bytes, gzip_bytes, refs = entry
+        assets = set()
+        for ref in refs:
+            if ref not in files:
+                continue
+            assets.add(ref)
+            if ref.endswith(".css"):
+                if ref not in css_refs:
+                    css_refs[ref] = [r for r in local_refs(output.read(ref).decode("utf-8"), base_url) if r in files]
+                assets.update(css_refs[ref])
+        for ref in assets:
+            if ref not in asset_sizes:
+                asset_sizes[ref] = output.size(ref)
+        values = {
+            "html_bytes": html_bytes,
+            "gzip_bytes": gzip_bytes,
+            "asset_count": len(assets),
+            "asset_bytes": sum(asset_sizes[r] for r in assets),
+        }
+
+        t = types.setdefault(kind, {"pages": 0, **{m: {"max": 0, "total": 0} for m in AUDIT_METRICS}})
+        t["pages"] += 1
+        for metric, value in values.items():
+            t[metric]["max"] = max(t[metric]["max"], value)
+            t[metric]["total"] += value
+            limit = budgets.get(kind, {}).get(metric)
+            if limit and value > limit:
+                over.append({"path": rel_s, "kind": kind, "metric": metric, "value": value, "budget": limit})
+        item = (gzip_bytes, rel_s, kind, values)
+        if len(largest) < AUDIT_TOP_PAGES:
+            heapq.heappush(largest, item)
+        elif item > largest[0]:
+            heapq.heapreplace(largest, item)
+
+    if cache_path is not None:
+        write_text(cache_path, json.dumps(used, separators=(",", ":")))
+
+    for t in types.values():
+        for metric in AUDIT_METRICS:
+            t[metric]["avg"] = round(t[metric]["total"] / t["pages"])
+    over.sort(key=lambda o: (o["kind"], o["metric"], -o["value"], o["path"]))
+    return {
+        "budgets": budgets,
+        "gzip_level": AUDIT_GZIP_LEVEL,
+        "types": types,
+        "assets": {"count": len(asset_sizes), "bytes": sum(asset_sizes.values()), "files": dict(sorted(asset_sizes.items()))},
+        "largest": [{"path": rel_s, "kind": kind, **values} for _, rel_s, kind, values in sorted(largest, reverse=True)],
+        "over_budget_count": len(over),
+        "over_budget": over[:AUDIT_MAX_LISTED],
+    }
+
+
+def print_audit(report: dict) -> None:
+    for kind, t in sorted(report["types"].items()):
+        print(
+            f"AUDIT {kind:<7} — {t['pages']} pages, html max {t['html_bytes']['max']:,} "
+            f"({t['gzip_bytes']['max']:,} gz), assets max {t['asset_count']['max']} / {t['asset_bytes']['max']:,} bytes"
+        )
+    for o in report["over_budget"][:10]:
+        print(f"  OVER BUDGET {o['path']} — {o['metric']} {o['value']:,} > {o['budget']:,}")
+    if report["over_budget_count"] > 10:
+        print(f"  ... {report['over_budget_count'] - 10} more")
+
+
+# ---------------------------
+# LINK CHECK (--check-links)
+# ---------------------------
+# Every internal reference of the generated HTML / XML / CSS / robots.txt, resolved against
+# the set of produced paths: href= / src= (relative, root-relative or on base_url),
+# url(...) in stylesheets and inline styles, and base_url URLs anywhere else (canonical,
+# og:image, JSON-LD, sitemap <loc>, Atom links).
+# (one pattern per literal prefix: an href|src alternation scans twice as slowly)
+LINK_HREF_RE = re.compile(r"""href=["']([^"'#?]*)""")
+LINK_SRC_RE = re.compile(r"""src=["']([^"'#?]*)""")
+LINK_CSS_URL_RE = re.compile(r"""url\(\s*["']?([^"')#?]*)""")
+LINK_SCANNED_SUFFIXES = (".html", ".xml", ".xml.gz", ".css", ".txt")
+
+
+class LinkError(ValueError):
+    pass
+
+
+def resolve_link(page_rel_s: str, url: str):
+    """href / src value on a page -> root-relative output path ("" = home), None if not this site's."""
+    if "%" in url:
+        url = unquote(url).partition("#")[0]  # %23 inside data: URIs (url(%23noise) in an SVG)
+    colon = url.find(":")
+    if not url or url.startswith("//") or (colon >= 0 and "/" not in url[:colon]):
+        return None  # fragment / query only, other host, mailto: / data: / https: ...
+    if url[0] == "/" and "/." not in url and "//" not in url:
+        return url[1:]  # the common case: already a clean root-relative path
+    if url[0] == "/":
+        target = posixpath.normpath(url)[1:]
+    else:
+        target = posixpath.normpath(posixpath.join(posixpath.dirname(page_rel_s), url))
+    if url.endswith("/") and target not in ("", "."):
+        target += "/"
+    return "" if target == "." else target
+
+
+def link_exists(target: str, produced) -> bool:
+    """Same lookup a static server does: the file itself, or the directory's index.html."""
+    if target == "" or target.endswith("/"):
+        return target + "index.html" in produced
+    return target in produced or target + "/index.html" in produced
+
+
+def page_links(rel_s: str, text: str, base_url: str) -> set:
+    """Internal link targets of one generated file (see resolve_link())."""
+    urls = set(LINK_CSS_URL_RE.findall(text)) if rel_s.endswith((".html", ".css")) else set()
+    if rel_s.endswith(".html"):
+        urls.update(LINK_HREF_RE.findall(text))
+        urls.update(LINK_SRC_RE.findall(text))
+    if base_url:
+        urls.update(path or "/" for path in base_url_re(base_url).findall(text))
+    targets = {resolve_link(rel_s, url) for url in urls}
+    targets.discard(None)
+    return targets
+
+
+@lru_cache(maxsize=None)
+def base_url_re(base_url: str):
+    """Absolute URLs on this site -> their path ("https://ox500.com.evil" is not one)."""
+    return re.compile(re.escape(base_url) + r"""(?![^/"'<>()\s?#\\])([^"'<>()\s?#\\]*)""")
+
+
+_LINK_CTX = None
+
+
+def _init_link_worker(ctx: tuple) -> None:
+    global _LINK_CTX
+    _LINK_CTX = ctx
+
+
+def _check_link_chunk(rel_paths: list) -> tuple:
+    """-> (broken [(page, target)], every referenced target, targets referenced from other HTML pages, link count)"""
+    output, produced, base_url = _LINK_CTX
+    broken = []
+    referenced = set()
+    from_pages = set()
+    count = 0
+    for rel_s in rel_paths:
+        data = output.read(rel_s)
+        if rel_s.endswith(".gz"):
+            data = gzip.decompress(data)
+        targets = page_links(rel_s.removesuffix(".gz"), data.decode("utf-8", "replace"), base_url)
+        count += len(targets)
+        for target in targets:
+            if not link_exists(target, produced):
+                broken.append((rel_s, target))
+                continue
+            if target == "" or target.endswith("/"):
+                target += "index.html"
+            elif target not in produced:
+                target += "/index.html"
+            referenced.add(target)
+            if rel_s.endswith(".html") and target != rel_s:
+                from_pages.add(target)
+    return broken, referenced, from_pages, count
+
+
+def link_check(files: dict, output, base_url: str, assets: list, aliases: dict = None, jobs: int = 1) -> dict:
+    """Resolve every internal link of the outputs in files (rel -> sha256) -> report.
+
+    Broken links point at paths that were not produced. Orphans are pages no other page
+    links to (the sitemap does not count; index.html is the entry point). Unused assets
+    are copied assets nothing references; aliases (hashed name -> plain name) count a
+    reference to a fingerprinted copy for its plain name.
+    """
+    produced = frozenset(files)
+    scanned = [
+        rel_s
+        for rel_s in sorted(files)
+        if rel_s.endswith(LINK_SCANNED_SUFFIXES) and not (rel_s.endswith(".gz") and rel_s[:-3] in produced)
+    ]
+    ctx = (output, produced, base_url)
+    if jobs > 1 and len(scanned) > 1 and output.process_safe:
+        # produced paths are shipped once per worker; each worker returns only its chunk's sets
+        n = jobs * 4
+        chunks = [scanned[i::n] for i in range(n)]
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_link_worker, initargs=(ctx,)) as pool:
+            results = list(pool.map(_check_link_chunk, chunks))
+    else:
+        _init_link_worker(ctx)
+        results = [_check_link_chunk(scanned)]
+
+    broken = []
+    referenced = set()
+    from_pages = set()
+    links = 0
+    for b, r, f, c in results:
+        broken.extend(b)
+        referenced |= r
+        from_pages |= f
+        links += c
+    for hashed, plain in (aliases or {}).items():
+        if hashed in referenced:
+            referenced.add(plain)
+    broken.sort()
+    orphans = sorted(rel_s for rel_s in files if rel_s.endswith(".html") and rel_s != "index.html" and rel_s not in from_pages)
+    unused = sorted(rel_s for rel_s in assets if rel_s not in referenced)
+    return {
+        "files": len(files),
+        "scanned": len(scanned),
+        "links": links,
+        "broken_count": len(broken),
+        "broken": [{"page": page, "target": "/" + target} for page, target in broken[:LINK_MAX_LISTED]],
+        "orphan_count": len(orphans),
+        "orphans": orphans[:LINK_MAX_LISTED],
+        "unused_asset_count": len(unused),
+        "unused_assets": unused[:LINK_MAX_LISTED],
+    }
+
+
+def print_links(report: dict) -> None:
+    print(
+        f"LINKS — {report['scanned']} files, {report['links']:,} links, {report['broken_count']} broken, "
+        f"{report['orphan_count']} orphan pages, {report['unused_asset_count']} unused assets"
+    )
+    for b in report["broken"][:10]:
+        print(f"  BROKEN {b['page']} -> {b['target']}")
+    if report["broken_count"] > 10:
+        print(f"  ... {report['broken_count'] - 10} more")
+
+
+# ---------------------------
+# PROFILE (--profile)
+# ---------------------------
+class BuildProfile:
+    """Per-phase wall / CPU time, files and bytes, slowest pages. Disabled: every call is a no-op.
+
+    Phases are sequential marks (phase("x") ends the previous one), so build() needs no
+    extra nesting. With jobs > 1 CPU time of page workers is not in the parent's process_time.
+    """
+
+    __slots__ = (
+        "enabled", "phases", "pages", "top_n", "memory", "profiler",
+        "_name", "_wall", "_cpu", "_counts", "_start",
+    )
+
+    def __init__(self, enabled: bool = False, top_n: int = PROFILE_TOP_PAGES, memory: bool = False, cprofile: bool = False):
+        self.enabled = enabled
+        self.phases = []
+        self.pages = []  # heap of (seconds, rel, render_s, write_s), at most top_n
+        self.top_n = top_n
+        self.memory = enabled and memory
+        self.profiler = cProfile.Profile() if enabled and cprofile else None
+        self._name = None
+        self._counts = None
+        self._start = time.perf_counter()
+        if self.memory:
+            tracemalloc.start()
+        if self.profiler is not None:
+            self.profiler.enable()
+
+    def phase(self, name: str) -> None:
+        if not self.enabled:
+            return
+        self._end_phase()
+        self._name = name
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self._counts = {"files": 0, "written": 0, "bytes_written": 0, "linked": 0, "pages": 0, "render_s": 0.0, "write_s": 0.0}
+        if self.memory:
+            tracemalloc.reset_peak()
+
+    def _end_phase(self) -> None:
+        if self._name is None:
+            return
+        entry = {
+            "phase": self._name,
+            "wall_s": round(time.perf_counter() - self._wall, 4),
+            "cpu_s": round(time.process_time() - self._cpu, 4),
+            **self._counts,
+        }
+        entry["render_s"] = round(entry["render_s"], 4)
+        entry["write_s"] = round(entry["write_s"], 4)
+        if self.memory:
+            entry["peak_mem_bytes"] = tracemalloc.get_traced_memory()[1]
+        self.phases.append(entry)
+        self._name = None
+
+    def file(self, output, rel_s: str, status: str) -> None:
+        if not self.enabled or self._counts is None:
+            return
+        # "unchanged" (reused from the live generation) and "linked" (an extra name for a staged
+        # file) add no bytes to the output
+        self._counts["files"] += 1
+        if status in ("unchanged", "linked"):
+            self._counts["linked"] += 1
+        else:
+            self._counts["written"] += 1
+            self._counts["bytes_written"] += output.size(rel_s)
+
+    def page(self, rel: str, render_s: float, write_s: float) -> None:
+        if not self.enabled or self._counts is None:
+            return
+        self._counts["pages"] += 1
+        self._counts["render_s"] += render_s
+        self._counts["write_s"] += write_s
+        item = (render_s + write_s, rel, render_s, write_s)
+        if len(self.pages) < self.top_n:
+            heapq.heappush(self.pages, item)
+        elif item > self.pages[0]:
+            heapq.heapreplace(self.pages, item)
+
+    def finish(self, pstats_path: Path = None) -> dict:
+        """-> report; with cProfile on, the stats are also dumped to pstats_path (if given)."""
+        self._end_phase()
+        report = {
+            "total_wall_s": round(time.perf_counter() - self._start, 4),
+            "phases": self.phases,
+            "slowest_pages": [
+                {"path": rel, "seconds": round(s, 6), "render_s": round(r, 6), "write_s": round(w, 6)}
+                for s, rel, r, w in sorted(self.pages, reverse=True)
+            ],
+        }
+        if self.memory:
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            report["top_allocations"] = [
+                {"where": str(stat.traceback[0]), "bytes": stat.size, "count": stat.count}
+                for stat in snapshot.statistics("lineno")[:PROFILE_TOP_PAGES]
+            ]
+        if self.profiler is not None:
+            self.profiler.disable()
+            if pstats_path is not None:
+                pstats_path.parent.mkdir(parents=True, exist_ok=True)
+                self.profiler.dump_stats(pstats_path)
+                report["cprofile"] = str(pstats_path)
+            buf = io.StringIO()
+            pstats.Stats(self.profiler, stream=buf).sort_stats("cumulative").print_stats(PROFILE_TOP_PAGES)
+            report["cprofile_top"] = buf.getvalue()
+        return report
+
+
+def print_profile(report: dict) -> None:
+    print(f"PROFILE — total {report['total_wall_s']:.3f}s wall")
+    print(f"  {'phase':<16}{'wall s':>9}{'cpu s':>9}{'files':>8}{'written':>9}{'bytes':>14}{'pages':>8}")
+    for p in report["phases"]:
+        print(
+            f"  {p['phase']:<16}{p['wall_s']:>9.3f}{p['cpu_s']:>9.3f}{p['files']:>8}"
+            f"{p['written']:>9}{p['bytes_written']:>14,}{p['pages']:>8}"
+        )
+    if report["slowest_pages"]:
+        print("  slowest pages:")
+        for p in report["slowest_pages"]:
+            print(f"    {p['seconds'] * 1000:8.2f} ms  {p['path']}")
+    if "cprofile" in report:
+        print(f"  cProfile stats: {report['cprofile']}")
+
+
+def build(
+    incremental: bool = False,
+    jobs: int = 1,
+    stream: bool = False,
+    changes_path: Path = None,
+    compress: bool = False,
+    fingerprint: bool = False,
+    optimize_css: bool = False,
+    optimize_images: bool = False,
+    page_size: int = LIST_PAGE_SIZE,
+    sitemap_gzip: bool = False,
+    search: bool = False,
+    api: bool = False,
+    service_worker: bool = False,
+    audit: Path = None,
+    budgets: dict = None,
+    check_links: Path = None,
+    if_needed: bool = False,
+    profile: Path = None,
+    profile_memory: bool = False,
+    profile_cprofile: bool = False,
+    in_place: bool = False,
+    memo: dict = None,
+    config: BuildConfig = None,
+    output=None,
+) -> dict:
+    """Build the site from config's sources (default: this repo) into output (default: dist/).
+
+    -> changes {"added": {rel: sha256}, "changed": {...}, "deleted": {...}, "unchanged": n}
+    """
+    config = config if config is not None else BuildConfig()
+    output = output if output is not None else DirectoryOutput()
+    # manifest + changes.json describe a dist/ directory; memory / archive builds are always full
+    on_disk = isinstance(output, DirectoryOutput)
+    if page_size < 0:
+        raise ValueError(f"page_size must be 0 (no pagination) or more, got {page_size}")
+    if (compress or audit is not None or check_links is not None) and not output.readable:
+        raise ValueError("--compress / --audit / --check-links need an output that can be read back (directory / memory)")
+
+    # ===== IF NEEDED (--if-needed) =====
+    # One date for the whole build: the future-dated filter, asset retirement, sitemaps
+    # and the release stamp agree.
+    today = datetime.now(timezone.utc).date()
+    today_s = today.isoformat()
+    stamp_path = config.cache_path(RELEASE_STAMP) if on_disk else None
+    input_key = None
+    if if_needed and stamp_path is not None:
+        options = {
+            "compress": compress,
+            "fingerprint": fingerprint,
+            "optimize_css": optimize_css,
+            "optimize_images": optimize_images and Image is not None,
+            "page_size": page_size,
+            "sitemap_gzip": sitemap_gzip,
+            "search": search,
+            "api": api,
+            "service_worker": service_worker,
+        }
+        input_key = config.input_key(options)
+        stamp = load_release_stamp(stamp_path)
+        if output.dist.exists() and not build_needed(stamp, input_key, today_s):
+            print("UP TO DATE — inputs unchanged and no scheduled log due, nothing rebuilt")
+            print_next_release(stamp)
+            changes = {"added": {}, "changed": {}, "deleted": {}, "unchanged": stamp.get("files", 0)}
+            write_text(changes_path or config.cache_path(CHANGES_PATH), json.dumps(changes, indent=1, sort_keys=True))
+            return changes
+
+    # ===== PROFILE (--profile) =====
+    prof = BuildProfile(profile is not None, memory=profile_memory, cprofile=profile_cprofile)
+    prof.phase("manifest")
+
+    # ===== BUILD MANIFEST =====
+    # outputs: rel path in dist -> dependency key of everything that page was rendered from.
+    # files:   rel path in dist -> sha256 of its content.
+    # --incremental re-renders a page only when its key changes (or the file is missing).
+    manifest_path = config.cache_path(BUILD_MANIFEST) if on_disk else None
+    manifest = load_manifest(manifest_path) if manifest_path is not None else {}
+    old_files = manifest.get("files", {})
+    incremental = bool(incremental and manifest and output.dist.exists())
+    old_outputs = manifest.get("outputs", {}) if incremental else {}
+    new_outputs = {}
+    files = {}
+    changes = {"added": {}, "changed": {}, "deleted": {}}
+    stats = {"rendered": 0, "skipped": 0}
+
+    # ===== STAGING =====
+    # Output goes to a new generation; unchanged files are hardlinked from the live dist/.
+    # in_place (serve / watch): incremental rebuild straight into the live generation —
+    # no relinking of every unchanged file, no atomic swap.
+    # Memory / archive outputs have neither (stage = prev_dir = None).
+    in_place = bool(in_place and incremental)
+    output.begin(in_place)
+    stage, prev_dir = output.stage, output.prev_dir
+    # The manifest names the generation it describes. If another build published after this
+    # manifest was written, prev_dir holds other files: nothing in it can be trusted as fresh.
+    if prev_dir is not None and manifest.get("generation") != prev_dir.name:
+        manifest, old_files, old_outputs = {}, {}, {}
+        incremental = False
+
+    def is_fresh(rel: Path, key: str) -> bool:
+        rel_s = rel.as_posix()
+        new_outputs[rel_s] = key
+        # in-place builds wrote prev_dir themselves, so the manifest is enough; otherwise a
+        # string stat (Path joins add up over tens of thousands of skipped pages)
+        if (
+            old_outputs.get(rel_s) == key
+            and rel_s in old_files
+            and (in_place or os.path.exists(os.path.join(prev_dir, rel_s)))
+        ):
+            if not in_place:
+                link_or_copy(prev_dir / rel, stage / rel)
+            files[rel_s] = old_files[rel_s]
+            stats["skipped"] += 1
+            if prof.enabled:
+                prof.file(output, rel_s, "unchanged")
+            return True
+        stats["rendered"] += 1
+        return False
+
+    def record(result: tuple, linked: bool = False) -> None:
+        rel_s, sha, status = result
+        files[rel_s] = sha
+        prof.file(output, rel_s, "linked" if linked else status)
+        if status != "unchanged":
+            changes[status][rel_s] = sha
+
+    def out(rel: Path, content) -> None:
+        # all dist/ writes go through here: identical content is never rewritten
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        record(output.write(rel, data))
+
+    def alias(rel: Path, target: Path) -> None:
+        output.alias(rel.as_posix(), target.as_posix())
+        sha = files[rel.as_posix()]
+        status = "unchanged" if old_files.get(target.as_posix()) == sha else "added"
+        record((target.as_posix(), sha, status), linked=True)
+
+    build_key = file_hash(Path(__file__))
+    assets_src = config.root / ASSETS_SRC.relative_to(ROOT)
+    icons_src = config.root / ICONS_SRC.relative_to(ROOT)
+    css_text, css_hash = config.source("style.css")
+
+    prof.phase("assets")
+
+    # ===== COPY STATIC ASSETS (assets/* -> dist/assets/*) =====
+    # Copy everything under /assets into /dist/assets (bg/css/img/icons etc.)
+    # dist/assets/css/style.css is owned by the CSS step below when /style.css exists.
+    asset_hashes = {}
+    # assets-relative path -> sha of what is published (differs from the source for optimized images)
+    asset_outputs = {}
+    image_variants = {}
+    # /assets/<large>.png -> /assets/<large>.compact.webp, for references in templates / style.css
+    image_swaps = {}
+    image_stats = {"images": 0, "encoded": 0, "cached": 0, "source_bytes": 0, "bytes": 0, "variant_bytes": 0}
+    unreduced = []
+    if optimize_images and Image is None:
+        print("IMAGES — Pillow is not installed, images are copied unchanged")
+        optimize_images = False
+    image_cache = config.cache_path(IMAGE_CACHE_DIR)
+    if assets_src.exists():
+        for p in sorted(assets_src.rglob("*")):
+            if not p.is_file():
+                continue
+            rel = p.relative_to(assets_src)
+            h = file_hash(p)
+            asset_hashes[rel.as_posix()] = h
+            if css_text is not None and Path("assets") / rel == ASSETS_CSS_REL:
+                continue
+            if not search and Path("assets") / rel == SEARCH_SCRIPT_REL:
+                continue
+            if not (optimize_images and is_optimizable_image(rel)):
+                if not is_fresh(Path("assets") / rel, h):
+                    out(Path("assets") / rel, p.read_bytes())
+                asset_outputs[rel.as_posix()] = files[(Path("assets") / rel).as_posix()]
+                continue
+
+            # ===== IMAGES (--optimize-images) =====
+            # Same name, recompressed (and capped at IMAGE_MAX_SIZE) when that is smaller,
+            # plus right-sized OG / logo variants. Encodes are cached by source hash.
+            image_stats["images"] += 1
+            image_stats["source_bytes"] += p.stat().st_size
+            targets = [(rel, None)]
+            if rel.parts[0] == "img":
+                for variant in IMAGE_VARIANTS:
+                    targets.append((image_variant_rel(rel, variant), variant))
+                    image_variants.setdefault(f"/assets/{rel.as_posix()}", {})[variant] = (
+                        f"/assets/{image_variant_rel(rel, variant).as_posix()}"
+                    )
+            for o_rel, variant in targets:
+                o_rel_s = (Path("assets") / o_rel).as_posix()
+                if not is_fresh(Path("assets") / o_rel, dep_key(h, build_key, o_rel.as_posix())):
+                    if variant is None:
+                        with Image.open(p) as img:
+                            fmt = img.format
+                        data = cached_image(p, h, IMAGE_MAX_SIZE, "contain", fmt, image_stats, image_cache)
+                        if len(data) >= p.stat().st_size:
+                            data = p.read_bytes()
+                    else:
+                        box, fit, v_fmt = IMAGE_VARIANTS[variant]
+                        data = cached_image(p, h, box, fit, v_fmt, image_stats, image_cache)
+                    out(Path("assets") / o_rel, data)
+                size = output.size(o_rel_s)
+                image_stats["variant_bytes" if variant else "bytes"] += size
+                asset_outputs[o_rel.as_posix()] = files[o_rel_s]
+
+            # a PNG that recompression could not bring under IMAGE_COMPACT_MIN_BYTES (photos saved
+            # as PNG): the same pixels as WebP, used by our own pages instead
+            size = output.size((Path("assets") / rel).as_posix())
+            if rel.suffix.lower() == ".png" and size > IMAGE_COMPACT_MIN_BYTES:
+                c_rel = image_variant_rel(rel, "compact")
+                c_rel_s = (Path("assets") / c_rel).as_posix()
+                if not is_fresh(Path("assets") / c_rel, dep_key(h, build_key, c_rel.as_posix())):
+                    data = cached_image(
+                        p, h, IMAGE_MAX_SIZE, "contain", IMAGE_COMPACT_FORMAT, image_stats, image_cache
+                    )
+                    if len(data) < size:
+                        out(Path("assets") / c_rel, data)
+                    else:
+                        del new_outputs[c_rel_s]
+                if c_rel_s in files:
+                    image_swaps[f"/assets/{rel.as_posix()}"] = f"/assets/{c_rel.as_posix()}"
+                    image_stats["variant_bytes"] += output.size(c_rel_s)
+                    asset_outputs[c_rel.as_posix()] = files[c_rel_s]
+                else:
+                    unreduced.append((rel, size))
+    if optimize_images:
+        print(
+            f"IMAGES — {image_stats['images']} images {image_stats['source_bytes']:,} → "
+            f"{image_stats['bytes']:,} bytes, {len(image_variants) * len(IMAGE_VARIANTS)} variants "
+            f"{image_stats['variant_bytes']:,} bytes ({image_stats['encoded']} encoded, {image_stats['cached']} cached)"
+        )
+        for src_url, compact_url in sorted(image_swaps.items()):
+            print(f"IMAGES — {src_url[1:]} kept as PNG for outside links, pages use {compact_url[1:]}")
+        for rel, size in unreduced:
+            print(f"IMAGES — assets/{rel.as_posix()} could not be reduced ({size:,} bytes as PNG and WebP)")
+
+    # ===== COPY FAVICONS TO DIST ROOT (assets/icons/* -> dist/*) =====
+    # Browsers and crawlers commonly expect these at the site root:
+    # /favicon.ico, /apple-touch-icon.png, /site.webmanifest, etc.
+    if icons_src.exists():
+        for p in icons_src.iterdir():
+            if p.is_file():
+                h = asset_hashes[p.relative_to(assets_src).as_posix()]
+                if not is_fresh(Path(p.name), h):
+                    out(Path(p.name), p.read_bytes())
+
+    # ===== FINGERPRINTS (--fingerprint) =====
+    # /assets/<path> -> /assets/<stem>.<content hash>.<ext>, served with immutable cache headers
+    asset_map = {}
+    if fingerprint:
+        for rel_s, h in asset_outputs.items():
+            asset_map[f"/assets/{rel_s}"] = f"/assets/{fingerprint_name(rel_s, h)}"
+    # what templates / style.css / og:image are rewritten with: asset_map plus compact image copies
+    asset_urls = dict(asset_map)
+    for src_url, compact_url in image_swaps.items():
+        asset_urls[src_url] = asset_map.get(compact_url, compact_url)
+    asset_map_key = record_hash(asset_urls)
+
+    prof.phase("css")
+
+    # ===== COPY CSS =====
+    css_blocks = []
+    css_raw_bytes = css_bytes = 0
+    if css_text is not None:
+        # Main stylesheet lives under /assets/css/style.css
+        # (url(...) references point at fingerprinted assets when --fingerprint is on)
+        css_key = dep_key(css_hash, asset_map_key)
+        css_text = rewrite_asset_urls(css_text, asset_urls)
+        css_raw_bytes = len(css_text.encode("utf-8"))
+        if optimize_css:
+            css_text = minify_css(css_text)
+            css_blocks = parse_css_blocks(css_text)
+            css_key = dep_key(css_key, build_key, "min")
+        css_bytes = len(css_text.encode("utf-8"))
+        if fingerprint:
+            css_rel = ASSETS_CSS_REL.as_posix()
+            asset_map["/" + css_rel] = asset_urls["/" + css_rel] = "/" + fingerprint_name(css_rel, text_hash(css_text))
+        if not is_fresh(ASSETS_CSS_REL, css_key):
+            out(ASSETS_CSS_REL, css_text)
+
+        # Backward-compat shim: keep /style.css as a tiny forwarder so old links don't break
+        # (Safe for SEO and browsers; keeps existing external references alive.)
+        if not is_fresh(Path("style.css"), dep_key(build_key, "style-shim")):
+            out(Path("style.css"), """/* OX500 shim — moved to /assets/css/style.css */
+@import url("/assets/css/style.css");
+""")
 
-          <footer class="footer">
-            <span>OX500 // ARCHIVE_NODE</span>
-            <span>DISRUPTION_NODE</span>
-            <span class="footer-output">
-              OUTPUT_PORT // <a href="{{YOUTUBE}}" target="_blank" rel="noopener me">YouTube</a>
-              <span class="sep"> // </span>
-              RELEASE_PORT // <a href="{{BANDCAMP}}" target="_blank" rel="noopener me">Bandcamp</a>
-              <span class="sep"> // </span>
-              SOURCE_CODE // <a href="{{GITHUB}}" target="_blank" rel="noopener noreferrer">GitHub</a>
-            </span>
-          </footer>
+    if fingerprint:
+        prof.phase("fingerprint")
 
-        </div>
-      </main>
-    </div>
-  </div>
-</body>
-</html>"""
+        # hashed names are extra links to the staged files, not extra copies
+        current = set(asset_map.values())
+        for url, hashed_url in sorted(asset_map.items()):
+            alias(Path(url.lstrip("/")), Path(hashed_url.lstrip("/")))
 
-        page_title = f"DISRUPTION // {d_name} — OX500"
-        description = f"OX500 disruption node: {d_name}. Contains {count} log pages."
-        og_desc = f"DISRUPTION // {d_name} [{count}]"
+        # superseded hashed assets stay for ASSET_RETENTION_DAYS so cached old pages keep working
+        retired = {}
+        prev_map_path = prev_dir / ASSET_MAP_REL if prev_dir else None
+        if prev_map_path is not None and prev_map_path.exists():
+            prev_map = json.loads(read_text(prev_map_path))
+            for hashed_url in prev_map.get("assets", {}).values():
+                retired.setdefault(hashed_url, today_s)
+            retired.update(prev_map.get("retired", {}))
+            for hashed_url, since in sorted(retired.items()):
+                age = today - datetime.fromisoformat(since).date()
+                rel = Path(hashed_url.lstrip("/"))
+                if (
+                    hashed_url in current
+                    or rel.as_posix() in files
+                    or age.days >= ASSET_RETENTION_DAYS
+                    or not (prev_dir / rel).exists()
+                ):
+                    del retired[hashed_url]
+                    continue
+                link_or_copy(prev_dir / rel, stage / rel)
+                sha = old_files.get(rel.as_posix()) or file_hash(prev_dir / rel)
+                record((rel.as_posix(), sha, "unchanged"), linked=True)
 
-        node_page = render(
-            t_node,
-            {
-                "LANG": lang,
-                "PAGE_TITLE": html.escape(page_title),
-                "DESCRIPTION": html.escape(description),
-                "CANONICAL": canonical,
-                "OG_TITLE": html.escape(page_title),
-                "OG_DESC": html.escape(og_desc),
-                "OG_IMAGE": og_image,
-                "JSONLD": jsonld_disruption_node(
-                    base_url,
-                    url_path,
-                    d_name,
-                    newest_date,
-                    og_image,
-                    github_repo,
-                ),
-                "H1": html.escape(f"DISRUPTION // {d_name} [{count}]"),
-                "META": html.escape(f"OX500 // DISRUPTION_FEED · NODE · LOGS: {count}"),
-                "NODE_LOG_LIST": "\n".join(node_list),
-                "YOUTUBE": youtube,
-                "BANDCAMP": bandcamp,
-                "GITHUB": github_repo,
-                "BASE_URL": base_url,
-            },
+        out(
+            ASSET_MAP_REL,
+            json.dumps({"assets": asset_map, "retired": retired}, ensure_ascii=False, indent=1, sort_keys=True),
         )
 
-        node_page = rewrite_css_links(node_page, base_url)
+    prof.phase("load_archive")
 
-        write_text(DIST / rel_path, node_page)
-        sitemap_entries.append((canonical, newest_date))
+    # ===== PASS 1: LOG INDEX =====
+    # --stream / sharded sources keep only id/date/slug/series/title per log;
+    # full records are re-read per page.
+    archive = config.root / "logs.json"
+    logs_dir = config.root / LOGS_DIR.relative_to(ROOT)
+    sources = []
+    if config.archive is None:
+        sources = [archive] if archive.exists() else []
+        if logs_dir.is_dir():
+            sources += sorted(p for p in logs_dir.glob("*.json") if p.is_file())
+    source_cache = config.cache_path(SOURCE_CACHE_DIR)
+    if memo is None or config.archive is not None:
+        site, entries = load_archive(sources, stream=stream, jobs=jobs, data=config.archive, cache_dir=source_cache)
+    else:
+        # serve / watch: the parsed archive stays in memory until a source file changes
+        sig = (stream, tuple((str(p), p.stat().st_mtime_ns, p.stat().st_size) for p in sources))
+        if memo.get("archive_sig") != sig:
+            previous = {e[0]["id"]: (e[0], e[1]) for e in memo.get("archive", (None, []))[1] if e[2] is None}
+            memo["archive"] = load_archive(
+                sources, stream=stream, jobs=jobs, previous=previous, cache_dir=source_cache
+            )
+            memo["archive_sig"] = sig
+            del previous
+        site, entries = memo["archive"]
 
-    # ===== HOME: ONLY LAST DISRUPTIONS =====
-    blocks = []
+    base_url = site["base_url"].rstrip("/")
+    # --optimize-images: og:image -> its 1200x630 variant, JSON-LD logo -> its logo variant
+    og_image = logo = site["og_image"]
+    og_path = og_image[len(base_url):] if og_image.startswith(base_url + "/") else og_image
+    if og_path in image_variants:
+        og_base = og_image[: len(og_image) - len(og_path)]
+        og_image = og_base + image_variants[og_path]["og"]
+        logo = og_base + image_variants[og_path]["logo"]
+    og_image = asset_url(og_image, asset_urls, base_url)
+    logo = asset_url(logo, asset_urls, base_url)
+    youtube = site["youtube"]
+    bandcamp = site.get("bandcamp", "")
+    github_repo = site.get("github", "")
+    lang = site.get("default_lang", "en")
+    site_title = site.get("site_title", "OX500 // CORE INTERFACE")
+
+    # ===== FILTER OUT FUTURE-DATED LOGS (do not generate/publish yet) =====
+    filtered = []
+    next_release = None
+    scheduled = 0
+    for e in entries:
+        day = parse_log_date(e[0].get("date")).date()
+        if day <= today:
+            filtered.append(e)
+            continue
+        scheduled += 1
+        if next_release is None or day < next_release:
+            next_release = day
+    entries = filtered
+
+    # newest first
+    entries.sort(key=lambda e: int(e[0]["id"]), reverse=True)
+    logs_sorted = [e[0] for e in entries]
+    log_hashes = {e[0]["id"]: e[1] for e in entries}
+    if entries and entries[0][2] is not None:
+        log_store = LogStore(paths=sources, spans=[e[2] for e in entries])
+    else:
+        log_store = LogStore(records=logs_sorted)
+    del entries, filtered
+
+    prof.phase("templates")
+
+    def required_template(name: str) -> str:
+        text = config.source(name)[0]
+        if text is None:
+            raise FileNotFoundError(f"{config.root / name}: template not found")
+        return text
+
+    t_log_src = required_template("template-log.html")
+    t_index_src = required_template("template-index.html")
+
+    # Optional template for disruption node pages
+    t_node_path = Path("template-disruption.html")
+    t_node_src = config.source(t_node_path.name)[0]
+
+    # Optional template-series fallback for disruption node pages
+    if t_node_src is None:
+        t_node_path = Path("template-series.html")
+        t_node_src = config.source(t_node_path.name)[0]
+    if t_node_src is None:
+        t_node_path = Path("<fallback node template>")
+        t_node_src = FALLBACK_NODE_TEMPLATE
+
+    # Optional template for the archive listing (same placeholders as node pages)
+    t_archive_path = Path("template-archive.html")
+    t_archive_src = config.source(t_archive_path.name)[0]
+    if t_archive_src is None:
+        t_archive_path, t_archive_src = t_node_path, t_node_src
+
+    # ===== SEARCH BOX (--search) =====
+    # before link rewriting, so the script URL is fingerprinted like any other asset
+    if search:
+        t_log_src = with_search_box(t_log_src)
+        t_node_src = with_search_box(t_node_src)
+        t_archive_src = with_search_box(t_archive_src)
+        t_index_src = with_search_box(t_index_src)
+
+    # ===== COMPILE TEMPLATES =====
+    # /style.css and /assets/... links live in the template markup, so they are rewritten
+    # once here, not per page.
+    # Unknown / missing placeholders fail the build instead of leaking "{{KEY}}" into dist/.
+    t_log_src = rewrite_asset_urls(rewrite_css_links(t_log_src, base_url), asset_urls, base_url)
+    t_node_src = rewrite_asset_urls(rewrite_css_links(t_node_src, base_url), asset_urls, base_url)
+    t_archive_src = rewrite_asset_urls(rewrite_css_links(t_archive_src, base_url), asset_urls, base_url)
+    t_index_src = rewrite_asset_urls(rewrite_css_links(t_index_src, base_url), asset_urls, base_url)
+
+    # ===== CRITICAL CSS (--optimize-css) =====
+    # Rules the template shell can match go inline into <head>; the full stylesheet is preloaded.
+    # Baked into the template source, so template_hashes below cover it for --incremental.
+    css_report = {}
+    if optimize_css and css_blocks:
+
+        def with_critical_css(kind: str, source: str) -> str:
+            inlined, over = inline_critical_css(source, css_blocks, kind)
+            before, after = len(source.encode("utf-8")), len(inlined.encode("utf-8"))
+            css_report[kind] = {
+                "template_bytes": [before, after],
+                "critical_css_bytes": after - before,
+                "over_budget_bytes": over,
+                # render-blocking stylesheet bytes per first view: before / after
+                "blocking_css_bytes": [css_raw_bytes, 0 if inlined != source else css_bytes],
+            }
+            return inlined
+
+        t_log_src = with_critical_css("log", t_log_src)
+        t_node_src = with_critical_css("node", t_node_src)
+        t_archive_src = with_critical_css("archive", t_archive_src)
+        t_index_src = with_critical_css("index", t_index_src)
+
+    # ===== SERVICE WORKER REGISTRATION (--service-worker) =====
+    # also baked into the template source (covered by template_hashes)
+    if service_worker:
+        t_log_src = with_sw_register(t_log_src)
+        t_node_src = with_sw_register(t_node_src)
+        t_archive_src = with_sw_register(t_archive_src)
+        t_index_src = with_sw_register(t_index_src)
 
-    for idx, d_slug in enumerate(disruption_order[:HOME_DISRUPTION_LIMIT]):
+    t_log = compile_template(t_log_src, "template-log.html", LOG_TEMPLATE_KEYS, {"LOG_TEXT"})
+    t_node = compile_template(t_node_src, t_node_path.name, NODE_TEMPLATE_KEYS, {"NODE_LOG_LIST"})
+    t_archive = compile_template(t_archive_src, t_archive_path.name, NODE_TEMPLATE_KEYS, {"NODE_LOG_LIST"})
+    # IMPORTANT: template-index musi mieć {{DISRUPTION_BLOCKS}} i {{DISRUPTION_SERIES_JSONLD}}
+    t_index = compile_template(
+        t_index_src,
+        "template-index.html",
+        INDEX_TEMPLATE_KEYS,
+        {"DISRUPTION_BLOCKS", "DISRUPTION_SERIES_JSONLD"},
+    )
+
+    # ===== INPUT HASHES =====
+    # template hashes are taken after link rewriting, og_image may be fingerprinted
+    site_key = record_hash([site, og_image, logo])
+
+    template_hashes = {
+        "template-log.html": text_hash(t_log_src),
+        "template-index.html": text_hash(t_index_src),
+        "template-node": text_hash(t_node_src),
+        "template-archive": text_hash(t_archive_src),
+    }
+
+    # ===== SERVICE WORKER (--service-worker) =====
+    # /sw.js lists the shell files the templates load with their content hashes. It only
+    # changes when one of them does, and the new worker then downloads just those.
+    if service_worker:
+        precache = shell_precache([t_log_src, t_node_src, t_archive_src, t_index_src, css_text or ""], files, base_url)
+        if not is_fresh(SW_REL_PATH, dep_key(build_key, record_hash(precache))):
+            out(SW_REL_PATH, render_service_worker(precache))
+
+    prof.phase("plan")
+
+    # ===== SITE GRAPH (URLs, dates, neighbours, disruption membership — derived once) =====
+    # serve / watch keep the nodes between rebuilds, keyed by log hash
+    hashes = [log_hashes[log["id"]] for log in logs_sorted]
+    graph = SiteGraph(logs_sorted, hashes, known=memo.get("graph") if memo is not None else None)
+    if memo is not None:
+        memo["graph"] = dict(zip(hashes, graph.logs))
+    del hashes
+    disruptions = graph.disruptions
+    disruption_order = graph.order
+
+    def link_hash(node) -> str:
+        return node.link if node is not None else "-"
+
+    page_ctx = {
+        "graph": graph,
+        "store": log_store,
+        "t_log": t_log,
+        "t_node": t_node,
+        "t_archive": t_archive,
+        "page_size": page_size,
+        "today": today_s,
+        "lang": lang,
+        "base_url": base_url,
+        "og_image": og_image,
+        "logo": logo,
+        "youtube": youtube,
+        "bandcamp": bandcamp,
+        "github_repo": github_repo,
+        # memory / archive outputs live in this process: workers return bytes instead
+        "output": output if jobs <= 1 or output.process_safe else None,
+    }
+    page_tasks = []
+
+    # ===== LOG PAGES =====
+    log_page_base = dep_key(build_key, site_key, template_hashes["template-log.html"])
+
+    for node in graph.logs:
+        page_key = dep_key(
+            log_page_base, log_hashes[node.id], link_hash(graph.older(node)), link_hash(graph.newer(node))
+        )
+        if not is_fresh(node.rel_path, page_key):
+            page_tasks.append(("log", node.index, node.rel_path))
+
+    # ===== DISRUPTION NODE PAGES (paginated: disruption/<slug>/page/N.html) =====
+    # A page depends on its own slice of logs plus the totals shown in its header / pager.
+    list_pages = {"node": 0, "archive": 0}
+    list_base = [build_key, site_key, str(page_size)]
+
+    def list_page_keys(first_page: Path, logs: list, *deps: str):
+        pages = list_page_count(len(logs), page_size)
+        for page in range(1, pages + 1):
+            page_logs = logs[(page - 1) * page_size : page * page_size] if page_size else logs
+            rel_path = make_list_page_rel_path(first_page, page)
+            key = dep_key(*list_base, *deps, str(page), str(pages), str(len(logs)), *(link_hash(l) for l in page_logs))
+            yield page, rel_path, key
+
+    for d_slug in disruption_order:
         d = disruptions[d_slug]
-        d_name = d["name"]
-        d_logs = d["logs"]
-        count = len(d_logs)
-
-        node_url = make_url_path(make_disruption_rel_path(d_slug))
-        open_attr = " open" if idx == 0 else ""
-
-        preview = []
-        for l in d_logs[:HOME_DISRUPTION_PREVIEW_LOGS]:
-            lp = make_rel_path(l)
-            up = make_url_path(lp)
-            preview.append(
-                f'<a class="log-line" href="{up}">'
-                f'<span class="log-id">LOG: {html.escape(l["id"])}</span>'
-                f'<span class="log-tag">{html.escape(l.get("title", ""))}</span>'
-                f"</a>"
+        for page, rel_path, node_key in list_page_keys(
+            d.rel_path, d.logs, template_hashes["template-node"], d_slug, d.name
+        ):
+            list_pages["node"] += 1
+            if not is_fresh(rel_path, node_key):
+                page_tasks.append(("node", (d_slug, page), rel_path))
+
+    # ===== ARCHIVE (archive.html, archive/page/N.html — every log, newest first) =====
+    for page, rel_path, archive_key in list_page_keys(ARCHIVE_REL_PATH, graph.logs, template_hashes["template-archive"]):
+        list_pages["archive"] += 1
+        if not is_fresh(rel_path, archive_key):
+            page_tasks.append(("archive", page, rel_path))
+
+    # ===== JSON API (--api) =====
+    # Rendered next to the pages (same workers, same is_fresh keys, same write avoidance).
+    if api:
+        api_base = dep_key(build_key, site_key, "api")
+        for node in graph.logs:
+            rel_path = api_log_rel_path(node.id)
+            key = dep_key(api_base, log_hashes[node.id], link_hash(graph.older(node)), link_hash(graph.newer(node)))
+            if not is_fresh(rel_path, key):
+                page_tasks.append(("api_log", node.index, rel_path))
+
+        api_pages = list_page_count(len(graph.logs), API_PAGE_SIZE)
+        for page in range(1, api_pages + 1):
+            page_logs = graph.logs[(page - 1) * API_PAGE_SIZE : page * API_PAGE_SIZE]
+            # keyed on the summaries themselves: a log moving to another disruption changes its entry
+            summaries = (record_hash(api_log_summary(page_ctx, l)) for l in page_logs)
+            key = dep_key(api_base, str(page), str(api_pages), str(len(graph.logs)), *summaries)
+            if not is_fresh(api_page_rel_path(page), key):
+                page_tasks.append(("api_page", page, api_page_rel_path(page)))
+
+        for d_slug in disruption_order:
+            d = disruptions[d_slug]
+            key = dep_key(api_base, d_slug, d.name, *(record_hash(api_log_summary(page_ctx, l)) for l in d.logs))
+            if not is_fresh(api_disruption_rel_path(d_slug), key):
+                page_tasks.append(("api_disruption", d_slug, api_disruption_rel_path(d_slug)))
+
+    prof.phase("render")
+
+    for result, render_s, write_s in write_pages(page_ctx, page_tasks, jobs):
+        if page_ctx["output"] is None:
+            t0 = time.perf_counter()
+            result = output.write(*result)
+            write_s = time.perf_counter() - t0
+        record(result)
+        prof.page(result[0], render_s, write_s)
+
+    if api:
+        prof.phase("feeds")
+        out(
+            API_DIR / "index.json",
+            api_dumps(
+                {
+                    "total": len(logs_sorted),
+                    "page_size": API_PAGE_SIZE,
+                    "pages": api_pages,
+                    "first_page": make_url_path(api_page_rel_path(1)),
+                    "disruptions": [
+                        {
+                            "slug": d_slug,
+                            "name": disruptions[d_slug].name,
+                            "count": len(disruptions[d_slug].logs),
+                            "api": make_url_path(api_disruption_rel_path(d_slug)),
+                        }
+                        for d_slug in disruption_order
+                    ],
+                    "feeds": {
+                        "json": make_url_path(JSON_FEED_REL_PATH),
+                        "atom": make_url_path(ATOM_FEED_REL_PATH),
+                    },
+                }
+            ),
+        )
+
+        # ===== FEEDS (latest FEED_SIZE logs) =====
+        latest = graph.logs[:FEED_SIZE]
+        feed_key = dep_key(api_base, site_title, *(log_hashes[node.id] for node in latest))
+        json_fresh = is_fresh(JSON_FEED_REL_PATH, feed_key)
+        atom_fresh = is_fresh(ATOM_FEED_REL_PATH, feed_key)
+        if not (json_fresh and atom_fresh):
+            items = [(node, log_store.get(node.index)) for node in latest]
+            if not json_fresh:
+                out(JSON_FEED_REL_PATH, render_json_feed(page_ctx, site_title, items))
+            if not atom_fresh:
+                out(ATOM_FEED_REL_PATH, render_atom_feed(page_ctx, site_title, items))
+
+    # ===== SEARCH INDEX (--search) =====
+    # Terms are cached per log hash: only new / edited logs are re-read and tokenized.
+    # Shards are rebuilt from the cached terms; unchanged shards are not rewritten.
+    if search:
+        prof.phase("search")
+        search_cache = config.cache_path(SEARCH_CACHE)
+        cached = load_search_cache(search_cache)
+        by_hash = {}
+        postings = {}
+        tokenized = 0
+        for i, log in enumerate(logs_sorted):
+            h = log_hashes[log["id"]]
+            terms = cached.get(h)
+            if terms is None:
+                terms = search_terms(log_store.get(i))
+                tokenized += 1
+            by_hash[h] = postings[log["id"]] = terms
+        # nothing tokenized and no log dropped: the cache on disk is already this one
+        cache_stale = tokenized or len(by_hash) != len(cached)
+        del cached
+        if search_cache is not None and cache_stale:
+            write_text(
+                search_cache,
+                json.dumps({"version": SEARCH_INDEX_VERSION, "logs": by_hash}, ensure_ascii=False, separators=(",", ":")),
+            )
+        shards = search_shards(postings)
+        del postings, by_hash
+        for name, terms in shards.items():
+            out(SEARCH_DIR / "t" / f"{name}.json", json.dumps(terms, ensure_ascii=False, separators=(",", ":")))
+
+        docs = {}
+        for node in graph.logs:
+            docs.setdefault(node.num // SEARCH_DOCS_BLOCK, {})[str(node.num)] = [node.title, node.url_path, node.day]
+        for block, entries in docs.items():
+            out(
+                SEARCH_DIR / "d" / f"{block}.json",
+                json.dumps(entries, ensure_ascii=False, separators=(",", ":"), sort_keys=True),
             )
+        meta = {
+            "version": SEARCH_INDEX_VERSION,
+            "prefix_len": SEARCH_PREFIX_LEN,
+            "docs_block": SEARCH_DOCS_BLOCK,
+            "docs": len(logs_sorted),
+            "shards": sorted(shards),
+        }
+        out(SEARCH_DIR / "meta.json", json.dumps(meta, separators=(",", ":"), sort_keys=True))
+        print(
+            f"SEARCH — {len(logs_sorted)} logs ({tokenized} tokenized), "
+            f"{sum(len(t) for t in shards.values())} terms in {len(shards)} shards"
+        )
+        del shards, docs
 
-        blocks.append(
-            f'''<details class="log-entry"{open_attr}>
+    prof.phase("home")
+
+    # ===== HOME: ONLY LAST DISRUPTIONS =====
+    # Home depends only on the top HOME_DISRUPTION_LIMIT nodes and their previews
+    home_deps = [build_key, site_key, template_hashes["template-index.html"]]
+    for d_slug in disruption_order[:HOME_DISRUPTION_LIMIT]:
+        d = disruptions[d_slug]
+        home_deps += [d_slug, d.name, str(len(d.logs))]
+        home_deps += [link_hash(l) for l in d.logs[:HOME_DISRUPTION_PREVIEW_LOGS]]
+    home_fresh = is_fresh(Path("index.html"), dep_key(*home_deps))
+    if not home_fresh:
+        blocks = []
+
+        for idx, d_slug in enumerate(disruption_order[:HOME_DISRUPTION_LIMIT]):
+            d = disruptions[d_slug]
+            d_name = d.name
+            count = len(d.logs)
+
+            node_url = d.url_path
+            open_attr = " open" if idx == 0 else ""
+
+            preview = [log_line_html(l) for l in d.logs[:HOME_DISRUPTION_PREVIEW_LOGS]]
+
+            blocks.append(
+                f'''<details class="log-entry"{open_attr}>
   <summary>
     <div class="log-entry-header">
       <span>{html.escape(f"DISRUPTION // {d_name} [{count}]")}</span>
@@ -600,96 +3755,914 @@ def build():
     </div>
   </div>
 </details>'''
-        )
+            )
 
-    # ===== GENERATE DISRUPTION SERIES JSON-LD FOR HOMEPAGE =====
-    disruption_series_parts = []
-    for d_slug in disruption_order[:HOME_DISRUPTION_LIMIT]:
-        d = disruptions[d_slug]
-        d_name = d["name"]
-        d_logs = d["logs"]
-        newest_date = d_logs[0].get("date", datetime.now(timezone.utc).date().isoformat())
-        node_url = make_url_path(make_disruption_rel_path(d_slug))
-        
-        disruption_series_parts.append({
-            "@type": "CreativeWork",
-            "name": f"DISRUPTION // {d_name}",
-            "url": f"{base_url}{node_url}",
-            "datePublished": normalize_date(newest_date)
-        })
-
-    disruption_series_jsonld = {
-        "@context": "https://schema.org",
-        "@type": "CreativeWorkSeries",
-        "@id": f"{base_url}/#disruption-feed",
-        "name": "OX500 Disruption Feed",
-        "description": "Experimental poetry logs exploring AI compliance, decay, and system failure — linked to audio transmissions and album releases.",
-        "inLanguage": lang,
-        "url": f"{base_url}/",
-        "publisher": {
-            "@type": "Organization",
-            "name": "OX500",
-            "url": f"{base_url}/"
-        },
-        "hasPart": disruption_series_parts
-    }
+        # ===== GENERATE DISRUPTION SERIES JSON-LD FOR HOMEPAGE =====
+        disruption_series_parts = []
+        for d_slug in disruption_order[:HOME_DISRUPTION_LIMIT]:
+            d = disruptions[d_slug]
 
-    # IMPORTANT: template-index musi mieć {{DISRUPTION_BLOCKS}} i {{DISRUPTION_SERIES_JSONLD}}
-    index_html = render(
-        t_index,
-        {
-            "LANG": lang,
-            "BASE_URL": base_url,
-            "CANONICAL": f"{base_url}/",
-            "SITEMAP_URL": f"{base_url}/sitemap.xml",
-            "SITE_TITLE": html.escape(site_title),
-            "OG_IMAGE": og_image,
-            "YOUTUBE": youtube,
-            "BANDCAMP": bandcamp,
-            "GITHUB": github_repo,
-            "DISRUPTION_BLOCKS": "\n\n".join(blocks),
-            "DISRUPTION_SERIES_JSONLD": json.dumps(disruption_series_jsonld, ensure_ascii=False, indent=2),
-        },
-    )
-    index_html = rewrite_css_links(index_html, base_url)
+            disruption_series_parts.append({
+                "@type": "CreativeWork",
+                "name": f"DISRUPTION // {d.name}",
+                "url": f"{base_url}{d.url_path}",
+                "datePublished": d.logs[0].day
+            })
+
+        disruption_series_jsonld = {
+            "@context": "https://schema.org",
+            "@type": "CreativeWorkSeries",
+            "@id": f"{base_url}/#disruption-feed",
+            "name": "OX500 Disruption Feed",
+            "description": "Experimental poetry logs exploring AI compliance, decay, and system failure — linked to audio transmissions and album releases.",
+            "inLanguage": lang,
+            "url": f"{base_url}/",
+            "publisher": {
+                "@type": "Organization",
+                "name": "OX500",
+                "url": f"{base_url}/"
+            },
+            "hasPart": disruption_series_parts
+        }
+
+        index_html = render(
+            t_index,
+            {
+                "LANG": lang,
+                "BASE_URL": base_url,
+                "CANONICAL": f"{base_url}/",
+                "SITEMAP_URL": f"{base_url}/sitemap.xml",
+                "SITE_TITLE": html.escape(site_title),
+                "OG_IMAGE": og_image,
+                "YOUTUBE": youtube,
+                "BANDCAMP": bandcamp,
+                "GITHUB": github_repo,
+                "DISRUPTION_BLOCKS": "\n\n".join(blocks),
+                "DISRUPTION_SERIES_JSONLD": json.dumps(disruption_series_jsonld, ensure_ascii=False, indent=2),
+            },
+        )
 
+        out(Path("index.html"), index_html)
 
-    write_text(DIST / "index.html", index_html)
+    prof.phase("sitemap")
 
     # ===== ROBOTS =====
-    write_text(
-        DIST / "robots.txt",
-        f"User-agent: *\nAllow: /\n\nSitemap: {base_url}/sitemap.xml\n",
-    )
+    if not is_fresh(Path("robots.txt"), dep_key(build_key, base_url)):
+        out(
+            Path("robots.txt"),
+            f"User-agent: *\nAllow: /\n\nSitemap: {base_url}/sitemap.xml\n",
+        )
 
-    # ===== SITEMAP.XML =====
-    parts = [
-        '<?xml version="1.0" encoding="UTF-8"?>',
-        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
-        "  <url>",
-        f"    <loc>{base_url}/</loc>",
-        f"    <lastmod>{datetime.now(timezone.utc).date().isoformat()}</lastmod>",
-        "    <priority>1.0</priority>",
-        "  </url>",
+    # ===== SITEMAPS (sitemap.xml = index of sitemaps/pages.xml + sitemaps/logs-YYYY-MM.xml) =====
+    # Streamed straight to disk; only log indices are grouped by month, not URLs.
+    # lastmod comes from content (newest log date), so unchanged children stay byte-identical.
+    # Nothing to rewrite while no URL / lastmod can have moved: same log links, same
+    # disruption membership, same settings (the usual case for a text-only edit).
+    # today_s is only the lastmod of an empty site, so it is not part of the key.
+    sitemap_key = dep_key(
+        build_key,
+        base_url,
+        str(page_size),
+        str(sitemap_gzip),
+        *(link_hash(l) for l in graph.logs),
+        *(f"{d_slug}:{link_hash(l)}" for d_slug in disruption_order for l in disruptions[d_slug].logs),
+    )
+    sitemap_rels = [
+        rel_s
+        for rel_s, key in old_outputs.items()
+        if key == sitemap_key and (rel_s == "sitemap.xml" or rel_s.startswith(f"{SITEMAP_DIR.as_posix()}/"))
     ]
+    sitemap_fresh = "sitemap.xml" in sitemap_rels and all([is_fresh(Path(r), sitemap_key) for r in sitemap_rels])
 
-    for loc, lastmod in sitemap_entries:
-        lm = normalize_date(lastmod)
-        parts.extend(
-            [
-                "  <url>",
-                f"    <loc>{loc}</loc>",
-                f"    <lastmod>{lm}</lastmod>",
-                "    <priority>0.8</priority>",
-                "  </url>",
-            ]
+    if not sitemap_fresh:
+        newest_log_date = max((l.day for l in graph.logs), default=today_s)
+
+        def iter_page_entries():
+            yield f"{base_url}/", newest_log_date, "1.0"
+            listings = [(disruptions[d_slug].rel_path, disruptions[d_slug].logs) for d_slug in disruption_order]
+            listings.append((ARCHIVE_REL_PATH, graph.logs))
+            for first_page, logs in listings:
+                for page in range(1, list_page_count(len(logs), page_size) + 1):
+                    newest = logs[(page - 1) * page_size if page_size else 0].day if logs else today_s
+                    loc = f"{base_url}{make_url_path(make_list_page_rel_path(first_page, page))}"
+                    yield loc, newest, "0.8"
+
+        logs_by_month = {}
+        for l in graph.logs:
+            logs_by_month.setdefault(l.ym, array("i")).append(l.index)
+
+        def iter_log_entries(indices):
+            for i in indices:
+                yield f"{base_url}{graph.logs[i].url_path}", graph.logs[i].day, "0.8"
+
+        children = [("pages", iter_page_entries())]
+        for (y, m), indices in sorted(logs_by_month.items(), reverse=True):
+            children.append((f"logs-{y}-{m}", iter_log_entries(indices)))
+        del logs_by_month
+
+        with output.stream(Path("sitemap.xml")) as index_f:
+            index_f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NS}">')
+            for name, entries in children:
+                for result, rel, lastmod in write_sitemap_children(name, entries, output, sitemap_gzip):
+                    record(result)
+                    new_outputs[result[0]] = sitemap_key
+                    index_f.write(
+                        "\n  <sitemap>"
+                        f"\n    <loc>{base_url}/{rel.as_posix()}</loc>"
+                        f"\n    <lastmod>{lastmod}</lastmod>"
+                        "\n  </sitemap>"
+                    )
+            index_f.write("\n</sitemapindex>")
+        record(index_f.result)
+        new_outputs["sitemap.xml"] = sitemap_key
+
+    # ===== CSS REPORT (--optimize-css) =====
+    if css_report:
+        page_counts = {"log": len(logs_sorted), "index": 1, **list_pages}
+        for kind, r in css_report.items():
+            r["pages"] = page_counts[kind]
+            html_before, html_after = r["template_bytes"]
+            blocking_before, blocking_after = r["blocking_css_bytes"]
+            print(
+                f"CSS {kind:<5} — {r['pages']} pages, html +{html_after - html_before:,} bytes/page, "
+                f"blocking css {blocking_before:,} → {blocking_after:,} bytes"
+            )
+            if r["over_budget_bytes"]:
+                print(
+                    f"CSS {kind:<5} — critical css over the {CRITICAL_CSS_MAX_BYTES:,}-byte budget, "
+                    f"{r['over_budget_bytes']:,} bytes of rules left to the stylesheet"
+                )
+        css_report["stylesheet"] = {"bytes": [css_raw_bytes, css_bytes]}
+        print(f"CSS minify — style.css {css_raw_bytes:,} → {css_bytes:,} bytes")
+        if config.cache_dir is not None:
+            write_text(config.cache_path(CSS_REPORT), json.dumps(css_report, indent=1, sort_keys=True))
+
+    # ===== PRECOMPRESS (.gz + .br / .zst when available) =====
+    if compress:
+        prof.phase("compress")
+        report = {}
+        for result, ext, raw, packed, reused in compress_outputs(files, old_files, output, jobs):
+            record(result)
+            r = report.setdefault(ext, {"files": 0, "compressed": 0, "reused": 0, "raw_bytes": 0, "bytes": 0})
+            r["files"] += 1
+            r["reused" if reused else "compressed"] += 1
+            if raw is None:
+                raw = output.size(result[0][: -len(ext) - 1])
+            r["raw_bytes"] += raw
+            r["bytes"] += packed
+        for ext, r in sorted(report.items()):
+            r["ratio"] = round(r["bytes"] / r["raw_bytes"], 4) if r["raw_bytes"] else None
+            print(
+                f"COMPRESS .{ext} — {r['files']} files, {r['raw_bytes']:,} → {r['bytes']:,} bytes "
+                f"({r['ratio']:.1%}), {r['compressed']} compressed, {r['reused']} reused"
+            )
+        if config.cache_dir is not None:
+            write_text(config.cache_path(COMPRESSION_REPORT), json.dumps(report, indent=1, sort_keys=True))
+
+    # ===== PAGE WEIGHT AUDIT (--audit) =====
+    # Before publishing: a page over budget fails the build and dist/ keeps the last good generation.
+    # budgets = {"log.gzip_bytes": 20000, "*.asset_count": 8, ...} on top of PAGE_BUDGETS
+    if audit is not None:
+        prof.phase("audit")
+        limits = {kind: dict(b) for kind, b in PAGE_BUDGETS.items()}
+        for key, limit in (budgets or {}).items():
+            kind, _, metric = key.partition(".")
+            for k in limits if kind == "*" else [kind]:
+                limits.setdefault(k, {})[metric] = limit
+        report = audit_pages(files, output, base_url, limits, config.cache_path(AUDIT_CACHE), jobs)
+        write_text(audit, json.dumps(report, ensure_ascii=False, indent=1, sort_keys=True))
+        print_audit(report)
+        if report["over_budget_count"]:
+            raise BudgetError(f"{report['over_budget_count']} page budget(s) exceeded, see {audit}")
+
+    # ===== LINK CHECK (--check-links) =====
+    # Before publishing too: a broken internal link fails the build. Orphan pages and unused
+    # assets are only reported (assets/icons/ is requested by browsers / the web manifest).
+    if check_links is not None:
+        prof.phase("check_links")
+        report = link_check(
+            files,
+            output,
+            base_url,
+            [f"assets/{rel_s}" for rel_s in asset_outputs if not rel_s.startswith("icons/")],
+            {hashed[1:]: url[1:] for url, hashed in asset_map.items()},
+            jobs,
+        )
+        write_text(check_links, json.dumps(report, ensure_ascii=False, indent=1, sort_keys=True))
+        print_links(report)
+        if report["broken_count"]:
+            raise LinkError(f"{report['broken_count']} broken internal link(s), see {check_links}")
+
+    prof.phase("publish")
+
+    # ===== DELETED OUTPUTS (renamed / removed logs, nodes, assets) =====
+    # The staging dir only holds this build's files; anything else in the live dist/ is gone.
+    if prev_dir is not None:
+        previous = set(old_files)
+        if not incremental:
+            # full build: also catch files the manifest never knew about
+            previous.update(p.relative_to(prev_dir).as_posix() for p in prev_dir.rglob("*") if p.is_file())
+        for rel_s in sorted(previous - set(files)):
+            changes["deleted"][rel_s] = old_files.get(rel_s)
+            if in_place:
+                (stage / rel_s).unlink(missing_ok=True)
+
+    # ===== PUBLISH (atomic swap of dist/ / end of the archive) =====
+    published = output.finish()
+
+    if manifest_path is not None:
+        save_manifest(
+            {
+                "version": BUILD_MANIFEST_VERSION,
+                "generation": published.name,
+                "inputs": {
+                    "build.py": build_key,
+                    "site": site_key,
+                    "style.css": css_hash,
+                    "templates": template_hashes,
+                    "assets": asset_hashes,
+                    "logs": log_hashes,
+                },
+                "outputs": new_outputs,
+                "files": files,
+            },
+            manifest_path,
         )
 
-    parts.append("</urlset>")
-    write_text(DIST / "sitemap.xml", "\n".join(parts))
+    # ===== CHANGED FILES (deploy delta) =====
+    # paths are relative to dist/, values are sha256 of the content (previous content for deleted)
+    changes["unchanged"] = len(files) - len(changes["added"]) - len(changes["changed"])
+    if changes_path is None and on_disk:
+        changes_path = config.cache_path(CHANGES_PATH)
+    if changes_path is not None:
+        write_text(changes_path, json.dumps(changes, ensure_ascii=False, indent=1, sort_keys=True))
 
     print("BUILD OK — index, logs, disruption nodes, sitemap, robots generated")
+    if incremental:
+        print(f"INCREMENTAL — {stats['rendered']} rendered, {stats['skipped']} skipped")
+    print(
+        f"CHANGES — {len(changes['added'])} added, {len(changes['changed'])} changed, "
+        f"{len(changes['deleted'])} deleted, {changes['unchanged']} unchanged"
+    )
+
+    # ===== RELEASE STAMP (--if-needed / next scheduled log) =====
+    # Without input_key (a build without --if-needed) the next --if-needed run rebuilds once.
+    if stamp_path is not None:
+        due = [next_release] if next_release else []
+        if fingerprint:
+            retention = timedelta(days=ASSET_RETENTION_DAYS)
+            due += [datetime.fromisoformat(since).date() + retention for since in retired.values()]
+        if not logs_sorted:
+            due.append(today + timedelta(days=1))  # empty pages fall back to today's date
+        stamp = {
+            "input_key": input_key,
+            "built_on": today_s,
+            "next_release": next_release.isoformat() if next_release else None,
+            "scheduled": scheduled,
+            "rebuild_on": min(due).isoformat() if due else None,
+            "files": len(files),
+        }
+        write_text(stamp_path, json.dumps(stamp, indent=1, sort_keys=True))
+        if if_needed or scheduled:
+            print_next_release(stamp)
+
+    if prof.enabled:
+        # cache_dir=None: the top functions stay in the report, no .pstats file is written
+        report = prof.finish(config.cache_path(PROFILE_PSTATS))
+        report["build"] = {
+            "finished": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "build_py": build_key,
+            "logs": len(logs_sorted),
+            "files": len(files),
+            "jobs": jobs,
+            "incremental": incremental,
+            "rendered": stats["rendered"],
+            "skipped": stats["skipped"],
+        }
+        write_text(profile, json.dumps(report, ensure_ascii=False, indent=1))
+        print_profile(report)
+    return changes
+
+
+# ---------------------------
+# SERVE / WATCH (local preview)
+# ---------------------------
+# One long-lived process: the parsed archive stays in memory between rebuilds, each
+# rebuild is incremental and written straight into the live generation (in_place),
+# and open pages reload themselves once the new build is there (a long-poll on
+# LIVE_RELOAD_PATH answers as soon as the build version moves past ?v=).
+LIVE_RELOAD_SCRIPT = (
+    '<script>(function(){var v="";function poll(){'
+    f"fetch('{LIVE_RELOAD_PATH}?v='+v,{{cache:'no-store'}}).then(function(r){{return r.text()}})"
+    ".then(function(t){if(v&&t!==v)location.reload();else{v=t;poll()}})"
+    ".catch(function(){setTimeout(poll,1000)})}poll()})();</script>"
+)
+
+
+def watched_sources() -> dict:
+    """Stat signature of every build input: path -> (mtime_ns, size)."""
+    paths = [ROOT / "logs.json", ROOT / "style.css", *ROOT.glob("template-*.html")]
+    if LOGS_DIR.is_dir():
+        paths += LOGS_DIR.glob("*.json")
+    if ASSETS_SRC.is_dir():
+        paths += ASSETS_SRC.rglob("*")
+    sig = {}
+    for p in paths:
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            continue
+        if not p.is_dir():
+            sig[p.relative_to(ROOT).as_posix()] = (st.st_mtime_ns, st.st_size)
+    return sig
+
+
+class PreviewHandler(SimpleHTTPRequestHandler):
+    """dist/ file server: HTML gets the live reload script, nothing is cached."""
+
+    state = None  # {"version": n, "cond": Condition}, bumped after every successful rebuild
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        if path == LIVE_RELOAD_PATH:
+            seen = query.partition("v=")[2]
+            with self.state["cond"]:
+                self.state["cond"].wait_for(lambda: str(self.state["version"]) != seen, timeout=LIVE_RELOAD_WAIT)
+                version = str(self.state["version"])
+            return self._send(version.encode(), "text/plain")
+        path = Path(self.translate_path(self.path))
+        if path.is_dir():
+            path = path / "index.html"
+        elif not path.exists() and path.with_suffix(".html").is_file():
+            path = path.with_suffix(".html")
+        if path.suffix == ".html" and path.is_file():
+            page = path.read_text(encoding="utf-8")
+            head, sep, tail = page.rpartition("</body>")
+            page = head + LIVE_RELOAD_SCRIPT + sep + tail if sep else page + LIVE_RELOAD_SCRIPT
+            return self._send(page.encode("utf-8"), "text/html; charset=utf-8")
+        return super().do_GET()
+
+    def _send(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def end_headers(self):
+        self.send_header("Cache-Control", "no-store")
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def watch(build_args: dict, host: str = None, port: int = None) -> None:
+    """Rebuild on every source change; with host / port also serve dist/ with live reload."""
+    memo = {}  # parsed archive + per-log paths, kept between rebuilds
+    state = {"version": 0, "cond": threading.Condition()}
+    build(incremental=True, memo=memo, **build_args)
+
+    server = None
+    if port is not None:
+        handler = type("Handler", (PreviewHandler,), {"state": state})
+        # dist/ is a symlink: resolved per request, so it follows generation swaps
+        server = ThreadingHTTPServer((host, port), partial(handler, directory=str(DIST)))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"SERVE — http://{host}:{port}/ (live reload)")
+    print("WATCH — logs.json, logs/, template-*.html, style.css, assets/ (Ctrl+C to stop)")
+
+    seen = watched_sources()
+    try:
+        while True:
+            time.sleep(WATCH_INTERVAL)
+            current = watched_sources()
+            if current == seen:
+                continue
+            time.sleep(WATCH_SETTLE)  # let the editor finish writing
+            current = watched_sources()
+            touched = sorted(k for k in seen.keys() | current.keys() if seen.get(k) != current.get(k))
+            seen = current
+            started = time.perf_counter()
+            try:
+                build(incremental=True, in_place=True, memo=memo, **build_args)
+            except Exception as e:  # keep watching: the next save retries
+                print(f"BUILD FAILED — {type(e).__name__}: {e}")
+                continue
+            with state["cond"]:
+                state["version"] += 1
+                state["cond"].notify_all()
+            more = f" (+{len(touched) - 3})" if len(touched) > 3 else ""
+            print(f"REBUILT in {time.perf_counter() - started:.2f}s — {', '.join(touched[:3])}{more}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+# ---------------------------
+# DEPLOY (S3-compatible upload)
+# ---------------------------
+# build.py deploy uploads dist/ to a bucket (AWS S3, MinIO, R2, ...) over the plain S3 API:
+# path-style URLs, SigV4 signatures, one keep-alive connection per upload thread. The
+# bucket keeps DEPLOY_MANIFEST_KEY (path -> [sha256, headers]); only objects whose hash or
+# headers differ are sent. Order keeps the live site consistent: assets, then pages, then
+# sitemaps / feeds / robots.txt / sw.js; deletions after all uploads, in reverse; the
+# manifest last, so an interrupted deploy is simply redone by the next one.
+EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+
+
+class DeployError(RuntimeError):
+    pass
+
+
+def sigv4_headers(
+    method: str,
+    host: str,
+    path: str,
+    query: str,
+    headers: dict,
+    payload_sha: str,
+    access_key: str,
+    secret_key: str,
+    region: str,
+    amz_date: str,
+    token: str = None,
+) -> dict:
+    """headers + host / x-amz-* / Authorization for an S3 request (AWS Signature Version 4, all headers signed).
+
+    path is unencoded ("/bucket/key"); it must be sent as quote(path, safe="/~").
+    """
+    signed = {k.lower(): str(v).strip() for k, v in headers.items()}
+    signed.update({"host": host, "x-amz-content-sha256": payload_sha, "x-amz-date": amz_date})
+    if token:
+        signed["x-amz-security-token"] = token
+    names = sorted(signed)
+    canonical = "\n".join(
+        [
+            method,
+            quote(path, safe="/~"),
+            query,
+            "".join(f"{k}:{signed[k]}\n" for k in names),
+            ";".join(names),
+            payload_sha,
+        ]
+    )
+    scope = f"{amz_date[:8]}/{region}/s3/aws4_request"
+    to_sign = f"AWS4-HMAC-SHA256\n{amz_date}\n{scope}\n{text_hash(canonical)}"
+    key = ("AWS4" + secret_key).encode("utf-8")
+    for part in (amz_date[:8], region, "s3", "aws4_request"):
+        key = hmac.new(key, part.encode("utf-8"), hashlib.sha256).digest()
+    signature = hmac.new(key, to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+    signed["authorization"] = (
+        f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, SignedHeaders={';'.join(names)}, Signature={signature}"
+    )
+    return signed
+
+
+class S3Client:
+    """Minimal S3 API client: GET / PUT / DELETE of single objects, retried on transient errors.
+
+    Credentials default to AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY / AWS_SESSION_TOKEN.
+    Thread-safe: every thread keeps its own connection.
+    """
+
+    __slots__ = ("scheme", "host", "base_path", "bucket", "region", "access_key", "secret_key", "token", "_local")
+
+    def __init__(
+        self,
+        endpoint: str,
+        bucket: str,
+        region: str = "us-east-1",
+        access_key: str = None,
+        secret_key: str = None,
+        token: str = None,
+    ):
+        url = urlsplit(endpoint)
+        if url.scheme not in ("http", "https") or not url.netloc:
+            raise ValueError(f"deploy endpoint must be an http(s) URL, got {endpoint!r}")
+        self.scheme = url.scheme
+        self.host = url.netloc
+        self.base_path = url.path.rstrip("/")
+        self.bucket = bucket
+        self.region = region
+        self.access_key = access_key or os.environ.get("AWS_ACCESS_KEY_ID")
+        self.secret_key = secret_key or os.environ.get("AWS_SECRET_ACCESS_KEY")
+        self.token = token or os.environ.get("AWS_SESSION_TOKEN")
+        if not (self.access_key and self.secret_key):
+            raise ValueError("deploy needs AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY")
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            conn = self._local.conn = cls(self.host, timeout=DEPLOY_TIMEOUT)
+        return conn
+
+    def request(self, method: str, key: str, body: bytes = b"", headers: dict = None, payload_sha: str = None) -> tuple:
+        """-> (HTTP status, response body); raises DeployError once retries are used up."""
+        path = f"{self.base_path}/{self.bucket}/{key}"
+        payload_sha = payload_sha or (sha256_bytes(body) if body else EMPTY_SHA256)
+        error = None
+        for attempt in range(DEPLOY_RETRIES + 1):
+            if attempt:
+                time.sleep(min(0.25 * 2**attempt, 5.0))
+            amz_date = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+            signed = sigv4_headers(
+                method,
+                self.host,
+                path,
+                "",
+                headers or {},
+                payload_sha,
+                self.access_key,
+                self.secret_key,
+                self.region,
+                amz_date,
+                self.token,
+            )
+            conn = self._connection()
+            try:
+                conn.request(method, quote(path, safe="/~"), body=body, headers=signed)
+                resp = conn.getresponse()
+                data = resp.read()
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                self._local.conn = None
+                error = DeployError(f"{method} {key}: {type(e).__name__}: {e}")
+                continue
+            if resp.status >= 500 or resp.status == 429:
+                error = DeployError(f"{method} {key}: HTTP {resp.status}")
+                continue
+            return resp.status, data
+        raise error
+
+    def _check(self, method: str, key: str, status: int, data: bytes, ok=(200, 204)) -> None:
+        if status not in ok:
+            raise DeployError(f"{method} {key}: HTTP {status} {data[:300].decode('utf-8', 'replace')}")
+
+    def get(self, key: str):
+        """Object body, or None if there is no such object."""
+        status, data = self.request("GET", key)
+        if status == 404:
+            return None
+        self._check("GET", key, status, data, ok=(200,))
+        return data
+
+    def put(self, key: str, data: bytes, headers: dict, payload_sha: str = None) -> None:
+        status, body = self.request("PUT", key, data, headers, payload_sha)
+        self._check("PUT", key, status, body, ok=(200,))
+
+    def delete(self, key: str) -> None:
+        status, body = self.request("DELETE", key)
+        self._check("DELETE", key, status, body, ok=(200, 204, 404))
+
+
+def object_headers(rel_s: str, files: dict, immutable: set) -> dict:
+    """Content-Type / Content-Encoding / Cache-Control of a dist/ file in the bucket.
+
+    A precompressed sibling (page.html.gz next to page.html) keeps the type of the page
+    plus Content-Encoding, so an edge rule can serve it for the plain URL.
+    """
+    base, dot, ext = rel_s.rpartition(".")
+    if dot and ext in DEPLOY_ENCODINGS and base in files:
+        headers = object_headers(base, files, immutable)
+        headers["Content-Encoding"] = DEPLOY_ENCODINGS[ext]
+        return headers
+    suffix = os.path.splitext(rel_s)[1].lower()
+    content_type = DEPLOY_CONTENT_TYPES.get(suffix) or mimetypes.guess_type(rel_s)[0] or "application/octet-stream"
+    if rel_s == SW_REL_PATH.as_posix():
+        cache = DEPLOY_CACHE_NONE
+    elif rel_s in immutable:
+        cache = DEPLOY_CACHE_IMMUTABLE
+    else:
+        cache = DEPLOY_CACHE_CONTROL
+    return {"Content-Type": content_type, "Cache-Control": cache}
+
+
+def deploy_rank(rel_s: str) -> int:
+    """Upload wave: 0 = assets, 1 = pages, 2 = files pointing at pages (sitemaps, feeds, robots.txt, sw.js)."""
+    base, dot, ext = rel_s.rpartition(".")
+    if dot and ext in DEPLOY_ENCODINGS:
+        rel_s = base
+    if (
+        rel_s in ("sitemap.xml", "robots.txt", "feed.json", "atom.xml", SW_REL_PATH.as_posix())
+        or rel_s.startswith(f"{SITEMAP_DIR.as_posix()}/")
+    ):
+        return 2
+    return 1 if rel_s.endswith(".html") else 0
+
+
+def dist_files(dist: Path = DIST, manifest_path: Path = BUILD_MANIFEST) -> dict:
+    """rel -> sha256 of everything in dist/: the build manifest's list, or hashed from disk without one."""
+    root = Path(dist).resolve()
+    manifest = load_manifest(manifest_path) if manifest_path is not None else {}
+    files = manifest.get("files")
+    if files and all(os.path.isfile(os.path.join(root, rel_s)) for rel_s in files):
+        return dict(files)
+    return {p.relative_to(root).as_posix(): file_hash(p) for p in sorted(root.rglob("*")) if p.is_file()}
+
+
+def deploy(
+    client: S3Client,
+    dist: Path = DIST,
+    prefix: str = "",
+    manifest_path: Path = BUILD_MANIFEST,
+    connections: int = DEPLOY_CONNECTIONS,
+    dry_run: bool = False,
+) -> dict:
+    """Upload what changed in dist/ since the last deploy, delete what is gone -> stats."""
+    root = Path(dist).resolve()
+    if not root.is_dir():
+        raise DeployError(f"{dist} does not exist — build first")
+    files = dist_files(root, manifest_path)
+    immutable = set()
+    if ASSET_MAP_REL.as_posix() in files:
+        asset_map = json.loads(read_text(root / ASSET_MAP_REL))
+        immutable = {url.lstrip("/") for url in [*asset_map.get("assets", {}).values(), *asset_map.get("retired", {})]}
+    wanted = {}
+    for rel_s, sha in files.items():
+        h = object_headers(rel_s, files, immutable)
+        wanted[rel_s] = [sha, h["Content-Type"], h.get("Content-Encoding", ""), h["Cache-Control"]]
+
+    remote_manifest = client.get(prefix + DEPLOY_MANIFEST_KEY)
+    remote = json.loads(remote_manifest)["files"] if remote_manifest else {}
+    uploads = sorted(rel_s for rel_s, entry in wanted.items() if remote.get(rel_s) != entry)
+    deletions = sorted(set(remote) - set(wanted))
+    stats = {
+        "uploaded": len(uploads),
+        "deleted": len(deletions),
+        "unchanged": len(wanted) - len(uploads),
+        "bytes": sum(os.path.getsize(os.path.join(root, rel_s)) for rel_s in uploads),
+    }
+    print(
+        f"DEPLOY {'(dry run) ' if dry_run else ''}— {stats['uploaded']} to upload ({stats['bytes']:,} bytes), "
+        f"{stats['deleted']} to delete, {stats['unchanged']} unchanged"
+    )
+    if dry_run or not (uploads or deletions):
+        return stats
+
+    def upload(rel_s: str) -> None:
+        data = (root / rel_s).read_bytes()
+        sha, content_type, encoding, cache = wanted[rel_s]
+        if sha256_bytes(data) != sha:
+            raise DeployError(f"{rel_s} changed since the build — rebuild, then deploy")
+        headers = {"Content-Type": content_type, "Cache-Control": cache, "x-amz-meta-sha256": sha}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        client.put(prefix + rel_s, data, headers, sha)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, connections)) as pool:
+        # each wave completes before the next starts; a failure stops the deploy before
+        # anything that could point at the missing object goes out
+        for rank in (0, 1, 2):
+            list(pool.map(upload, [rel_s for rel_s in uploads if deploy_rank(rel_s) == rank]))
+        for rank in (2, 1, 0):
+            wave = [prefix + rel_s for rel_s in deletions if deploy_rank(rel_s) == rank]
+            list(pool.map(client.delete, wave))
+    body = json.dumps({"version": DEPLOY_MANIFEST_VERSION, "files": wanted}, separators=(",", ":"), sort_keys=True)
+    client.put(
+        prefix + DEPLOY_MANIFEST_KEY,
+        body.encode("utf-8"),
+        {"Content-Type": "application/json", "Cache-Control": "no-store"},
+    )
+    print(f"DEPLOY OK — {time.perf_counter() - started:.2f}s")
+    return stats
+
+
+def budget_arg(value: str) -> tuple:
+    """argparse type for --budget KIND.METRIC=BYTES -> ("KIND.METRIC", BYTES)"""
+    key, sep, limit = value.partition("=")
+    kind, _, metric = key.partition(".")
+    if not sep or (kind != "*" and kind not in PAGE_BUDGETS) or metric not in AUDIT_METRICS or not limit.isdigit():
+        raise argparse.ArgumentTypeError(f"expected KIND.METRIC=BYTES, got {value!r}")
+    return key, int(limit)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OX500 static build (source -> dist/)")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=("build", "serve", "watch", "deploy"),
+        default="build",
+        help="build once (default), watch sources and rebuild, watch + serve dist/ with live reload, "
+        "or upload dist/ to an S3-compatible bucket",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="re-render only outputs whose inputs changed since the last build (see .build-cache/manifest.json)",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        metavar="N",
+        help="render log / node pages across N worker processes (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="constant-memory build: index logs.json first, then re-read one full log per page",
+    )
+    parser.add_argument(
+        "--changes",
+        type=Path,
+        metavar="FILE",
+        help=f"where to write the added / changed / deleted files manifest (default: {CHANGES_PATH.relative_to(ROOT)})",
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="write .gz (+ .br / .zst if brotli / zstandard are installed) next to every text output",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="also publish assets under content-hashed names and point templates / CSS at them",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=LIST_PAGE_SIZE,
+        metavar="N",
+        help=f"logs per disruption node / archive page (default: {LIST_PAGE_SIZE}, 0 = no pagination)",
+    )
+    parser.add_argument(
+        "--api",
+        action="store_true",
+        help="also write the static JSON API (api/) and feed.json / atom.xml for the latest logs",
+    )
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help="write a client-side full-text index to search/ (sharded by term prefix, see assets/js/search.js)",
+    )
+    parser.add_argument(
+        "--service-worker",
+        action="store_true",
+        help="write /sw.js: hash-versioned precache of the page shell, cached pages, PREV / NEXT prefetch",
+    )
+    parser.add_argument(
+        "--sitemap-gzip",
+        action="store_true",
+        help="write the sitemap index children as sitemaps/*.xml.gz",
+    )
+    parser.add_argument(
+        "--optimize-images",
+        action="store_true",
+        help="recompress img/ + bg/ rasters and add 1200x630 OG / logo variants (needs Pillow)",
+    )
+    parser.add_argument(
+        "--optimize-css",
+        action="store_true",
+        help="minify style.css and inline the critical rules of each template into <head>",
+    )
+    parser.add_argument(
+        "--audit",
+        type=Path,
+        nargs="?",
+        const=AUDIT_REPORT,
+        metavar="FILE",
+        help=f"page weight per page / page type -> JSON; fail the build over budget (default: {AUDIT_REPORT.relative_to(ROOT)})",
+    )
+    parser.add_argument(
+        "--budget",
+        type=budget_arg,
+        action="append",
+        default=[],
+        metavar="KIND.METRIC=BYTES",
+        help=f"with --audit: override a budget, e.g. log.gzip_bytes=20000 (KIND: {', '.join(PAGE_BUDGETS)} or *; "
+        f"METRIC: {', '.join(AUDIT_METRICS)}; 0 = no limit)",
+    )
+    parser.add_argument(
+        "--if-needed",
+        action="store_true",
+        help="skip the build when inputs and options are unchanged and no scheduled log went live since the last "
+        f"one; the next release date goes to {RELEASE_STAMP.relative_to(ROOT)}",
+    )
+    parser.add_argument(
+        "--check-links",
+        type=Path,
+        nargs="?",
+        const=LINK_REPORT,
+        metavar="FILE",
+        help="resolve every internal link / asset / sitemap URL; fail the build on broken ones, report orphan "
+        f"pages and unused assets (default: {LINK_REPORT.relative_to(ROOT)})",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        nargs="?",
+        const=PROFILE_REPORT,
+        metavar="FILE",
+        help=f"per-phase wall / CPU time, files, bytes and slowest pages -> JSON (default: {PROFILE_REPORT.relative_to(ROOT)})",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="with --profile: tracemalloc peak per phase and top allocations (slower)",
+    )
+    parser.add_argument(
+        "--profile-cprofile",
+        action="store_true",
+        help=f"with --profile: cProfile the main process into {PROFILE_PSTATS.relative_to(ROOT)}",
+    )
+    parser.add_argument(
+        "--endpoint",
+        default=os.environ.get("AWS_ENDPOINT_URL") or "https://s3.amazonaws.com",
+        help="deploy: S3 API endpoint, e.g. http://127.0.0.1:9000 for MinIO (default: $AWS_ENDPOINT_URL or AWS)",
+    )
+    parser.add_argument("--bucket", default=os.environ.get("S3_BUCKET"), help="deploy: bucket (default: $S3_BUCKET)")
+    parser.add_argument("--prefix", default="", help="deploy: key prefix inside the bucket (default: bucket root)")
+    parser.add_argument(
+        "--region",
+        default=os.environ.get("AWS_REGION") or os.environ.get("AWS_DEFAULT_REGION") or "us-east-1",
+        help="deploy: signing region (default: $AWS_REGION or us-east-1)",
+    )
+    parser.add_argument(
+        "--connections",
+        type=int,
+        default=DEPLOY_CONNECTIONS,
+        metavar="N",
+        help=f"deploy: concurrent uploads (default: {DEPLOY_CONNECTIONS})",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="deploy: only print what would be uploaded / deleted")
+    parser.add_argument("--host", default="127.0.0.1", help="serve: address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="serve: port (default: 8000)")
+    args = parser.parse_args(argv)
+    if args.jobs < 0:
+        parser.error("--jobs must be 0 (one per CPU) or more")
+    if args.page_size < 0:
+        parser.error("--page-size must be 0 (no pagination) or more")
+    if (args.profile_memory or args.profile_cprofile) and args.profile is None:
+        args.profile = PROFILE_REPORT
+    if args.command == "deploy":
+        if not args.bucket:
+            parser.error("deploy needs --bucket (or $S3_BUCKET)")
+        try:
+            client = S3Client(args.endpoint, args.bucket, region=args.region)
+        except ValueError as e:
+            parser.error(str(e))
+        prefix = args.prefix.strip("/")
+        deploy(
+            client,
+            prefix=f"{prefix}/" if prefix else "",
+            connections=args.connections,
+            dry_run=args.dry_run,
+        )
+        return
+    if args.command != "build":
+        # rebuilds are always incremental; per-rebuild profiling / audits / link checks would only
+        # be noise, and a service worker would answer live reloads from its page cache (the stale page)
+        if args.service_worker:
+            print("WATCH — --service-worker is ignored while previewing")
+        watch(
+            {
+                "jobs": args.jobs or os.cpu_count() or 1,
+                "stream": args.stream,
+                "changes_path": args.changes,
+                "compress": args.compress,
+                "fingerprint": args.fingerprint,
+                "optimize_css": args.optimize_css,
+                "optimize_images": args.optimize_images,
+                "page_size": args.page_size,
+                "sitemap_gzip": args.sitemap_gzip,
+                "search": args.search,
+                "api": args.api,
+            },
+            host=args.host,
+            port=args.port if args.command == "serve" else None,
+        )
+        return
+    build(
+        incremental=args.incremental,
+        jobs=args.jobs or os.cpu_count() or 1,
+        stream=args.stream,
+        changes_path=args.changes,
+        compress=args.compress,
+        fingerprint=args.fingerprint,
+        optimize_css=args.optimize_css,
+        optimize_images=args.optimize_images,
+        page_size=args.page_size,
+        sitemap_gzip=args.sitemap_gzip,
+        search=args.search,
+        api=args.api,
+        service_worker=args.service_worker,
+        audit=args.audit,
+        budgets=dict(args.budget),
+        check_links=args.check_links,
+        if_needed=args.if_needed,
+        profile=args.profile,
+        profile_memory=args.profile_memory,
+        profile_cprofile=args.profile_cprofile,
+    )
 
 
 if __name__ == "__main__":
-    build()
+    main()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# build.py / bench.py are scripts at the repo root, not an installed package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,39 @@
+"""Shared by the test modules: the sample archive and a build into a temporary directory."""
+
+import copy
+import json
+
+import build
+
+ARCHIVE = json.loads((build.ROOT / "logs.json").read_text(encoding="utf-8"))
+
+
+def sample_archive() -> dict:
+    return copy.deepcopy(ARCHIVE)
+
+
+def run_build(archive: dict, dist, cache_dir, **options) -> dict:
+    """build() of an in-memory archive (templates, style.css, assets from the repo) into dist."""
+    config = build.BuildConfig(archive=archive, cache_dir=cache_dir)
+    return build.build(config=config, output=build.DirectoryOutput(dist), **options)
+
+
+def tree(dist) -> dict:
+    """rel path -> bytes of every file under dist (following the generation symlink)."""
+    root = dist.resolve()
+    return {p.relative_to(root).as_posix(): p.read_bytes() for p in sorted(root.rglob("*")) if p.is_file()}
+
+
+def source_tree(root):
+    """A build root with the repo's templates, style.css and assets; logs.json / logs/ are up to the test."""
+    root.mkdir(parents=True, exist_ok=True)
+    for p in [*build.ROOT.glob("template-*.html"), build.ROOT / "style.css"]:
+        (root / p.name).write_bytes(p.read_bytes())
+    (root / "assets").symlink_to(build.ROOT / "assets", target_is_directory=True)
+    return root
+
+
+def run_tree_build(root, dist, cache_dir, **options) -> dict:
+    """build() of the sources under root (logs.json and / or logs/*.json) into dist."""
+    config = build.BuildConfig(root=root, cache_dir=cache_dir)
+    return build.build(config=config, output=build.DirectoryOutput(dist), **options)
@@ -0,0 +1,123 @@
+"""--api: JSON API pages, per-log / per-disruption documents, feed.json and atom.xml."""
+
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import bench
+import build
+from helpers import run_build, tree
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+@pytest.fixture
+def archive(tmp_path):
+    path = tmp_path / "generated.json"
+    bench.generate_archive(path, 7, disruptions=2, future=0)
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+@pytest.fixture
+def files(tmp_path, archive, monkeypatch):
+    monkeypatch.setattr(build, "API_PAGE_SIZE", 3)
+    monkeypatch.setattr(build, "FEED_SIZE", 5)
+    run_build(archive, tmp_path / "dist", tmp_path / "cache", api=True)
+    return tree(tmp_path / "dist")
+
+
+def load(files: dict, rel_s: str):
+    return json.loads(files[rel_s])
+
+
+def newest_first(archive: dict) -> list:
+    return [log["id"] for log in reversed(archive["logs"])]
+
+
+def test_no_api_without_the_flag(tmp_path, archive):
+    run_build(archive, tmp_path / "dist", tmp_path / "cache")
+    files = tree(tmp_path / "dist")
+
+    assert not [rel_s for rel_s in files if rel_s.startswith("api/") or rel_s in ("feed.json", "atom.xml")]
+
+
+def test_index_and_pages(archive, files):
+    index = load(files, "api/index.json")
+    assert (index["total"], index["page_size"], index["pages"]) == (7, 3, 3)
+    assert index["first_page"] == "/api/logs/page-1.json"
+    assert sum(d["count"] for d in index["disruptions"]) == 7
+
+    pages = [load(files, f"api/logs/page-{n}.json") for n in (1, 2, 3)]
+    assert "api/logs/page-4.json" not in files
+    assert [len(p["logs"]) for p in pages] == [3, 3, 1]
+    assert [l["id"] for p in pages for l in p["logs"]] == newest_first(archive)
+    assert (pages[0]["prev"], pages[0]["next"]) == (None, "/api/logs/page-2.json")
+    assert (pages[2]["prev"], pages[2]["next"]) == ("/api/logs/page-2.json", None)
+
+
+def test_log_documents(archive, files):
+    ids = [log["id"] for log in archive["logs"]]
+    assert {f"api/logs/{i}.json" for i in ids} <= set(files)
+
+    for n, log in enumerate(archive["logs"]):
+        doc = load(files, f"api/logs/{log['id']}.json")
+        assert (doc["id"], doc["title"], doc["text"]) == (log["id"], log["title"], log["text"])
+        assert doc["api"] == f"/api/logs/{log['id']}.json"
+        assert doc["prev"] == (ids[n - 1] if n else None)
+        assert doc["next"] == (ids[n + 1] if n + 1 < len(ids) else None)
+        assert doc["url"].startswith("https://ox500.com/logs/")
+        assert doc["url"].removeprefix("https://ox500.com/") in files
+
+
+def test_disruption_documents(files):
+    index = load(files, "api/index.json")
+
+    for entry in index["disruptions"]:
+        doc = load(files, entry["api"].lstrip("/"))
+        assert (doc["slug"], doc["name"], doc["count"]) == (entry["slug"], entry["name"], entry["count"])
+        assert len(doc["logs"]) == doc["count"]
+        assert {l["disruption"] for l in doc["logs"]} == {entry["slug"]}
+
+
+def test_json_feed(archive, files):
+    feed = load(files, "feed.json")
+
+    assert feed["version"] == "https://jsonfeed.org/version/1.1"
+    assert feed["feed_url"] == "https://ox500.com/feed.json"
+    items = feed["items"]
+    assert [item["title"].split(" // ")[0] for item in items] == [f"LOG {i}" for i in newest_first(archive)[:5]]
+    for item in items:
+        assert item["id"] == item["url"]
+        assert item["date_published"].endswith("T00:00:00Z")
+
+
+def test_atom_feed(archive, files):
+    feed = ET.fromstring(files["atom.xml"])
+    entries = feed.findall(f"{ATOM}entry")
+
+    assert len(entries) == 5
+    assert [e.find(f"{ATOM}title").text.split(" // ")[0] for e in entries] == [
+        f"LOG {i}" for i in newest_first(archive)[:5]
+    ]
+    published = [e.find(f"{ATOM}published").text for e in entries]
+    assert feed.find(f"{ATOM}updated").text == max(published)
+    assert load(files, "feed.json")["items"][0]["date_published"] == published[0]
+
+
+def test_feed_timestamp():
+    assert build.feed_timestamp("2025-12-07") == "2025-12-07T00:00:00Z"
+
+
+def test_unchanged_api_files_are_not_rewritten(tmp_path, archive):
+    dist, cache = tmp_path / "dist", tmp_path / "cache"
+    run_build(archive, dist, cache, api=True)
+    before = {p.relative_to(dist.resolve()): p.stat().st_ino for p in dist.resolve().rglob("*.json")}
+
+    archive["logs"][0]["text"] += "\nOne more line."
+    run_build(archive, dist, cache, api=True)
+    after = {p.relative_to(dist.resolve()): p.stat().st_ino for p in dist.resolve().rglob("*.json")}
+
+    changed = {str(rel) for rel in before if before[rel] != after.get(rel)}
+    assert f"api/logs/{archive['logs'][0]['id']}.json" in changed
+    assert "api/index.json" not in changed
@@ -0,0 +1,73 @@
+"""--audit: page weight per page type against budgets; a page over budget fails the build."""
+
+import argparse
+import json
+
+import pytest
+
+import build
+from helpers import run_build, sample_archive, tree
+
+
+def test_page_kinds():
+    assert build.page_kind("index.html") == "index"
+    assert build.page_kind("archive.html") == "archive"
+    assert build.page_kind("archive/page/2.html") == "archive"
+    assert build.page_kind("disruption/archive-snapshot.html") == "node"
+    assert build.page_kind("logs/2025/12/log-01612-im-not-done.html") == "log"
+    assert build.page_kind("404.html") is None
+    assert build.page_kind("feed.json") is None
+
+
+def test_budget_arg():
+    assert build.budget_arg("log.gzip_bytes=20000") == ("log.gzip_bytes", 20000)
+    assert build.budget_arg("*.asset_count=8") == ("*.asset_count", 8)
+    for value in ("log.gzip_bytes", "page.gzip_bytes=1", "log.weight=1", "log.gzip_bytes=-1"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            build.budget_arg(value)
+
+
+def test_within_budget(tmp_path):
+    report_path = tmp_path / "audit.json"
+    run_build(sample_archive(), tmp_path / "dist", tmp_path / "cache", audit=report_path)
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    files = tree(tmp_path / "dist")
+
+    assert report["over_budget_count"] == 0
+    assert report["types"]["log"]["pages"] == 3
+    assert report["types"]["index"]["html_bytes"]["max"] == len(files["index.html"])
+    # the stylesheet is an asset of every page
+    assert "assets/css/style.css" in report["assets"]["files"]
+
+
+def test_over_budget_fails_and_keeps_the_live_generation(tmp_path):
+    dist, cache, report_path = tmp_path / "dist", tmp_path / "cache", tmp_path / "audit.json"
+    run_build(sample_archive(), dist, cache)
+    live = tree(dist)
+    archive = sample_archive()
+    archive["logs"][0]["text"] += "\nOne more line."
+
+    with pytest.raises(build.BudgetError, match="3 page budget"):
+        run_build(archive, dist, cache, audit=report_path, budgets={"log.html_bytes": 1000})
+
+    over = json.loads(report_path.read_text(encoding="utf-8"))["over_budget"]
+    assert {(o["kind"], o["metric"], o["budget"]) for o in over} == {("log", "html_bytes", 1000)}
+    assert tree(dist) == live
+
+
+def test_wildcard_budget(tmp_path):
+    report_path = tmp_path / "audit.json"
+
+    with pytest.raises(build.BudgetError):
+        run_build(
+            sample_archive(), tmp_path / "dist", tmp_path / "cache", audit=report_path, budgets={"*.asset_count": 1}
+        )
+
+    kinds = {o["kind"] for o in json.loads(report_path.read_text(encoding="utf-8"))["over_budget"]}
+    assert kinds == {"log", "node", "archive", "index"}
+
+
+def test_audit_needs_a_readable_output(tmp_path):
+    config = build.BuildConfig(archive=sample_archive(), cache_dir=None)
+    with pytest.raises(ValueError, match="read back"):
+        build.build(config=config, output=build.ArchiveOutput(tmp_path / "site.zip"), audit=tmp_path / "audit.json")
@@ -0,0 +1,39 @@
+"""Write avoidance: identical output is not rewritten, and changes.json lists what a deploy must upload."""
+
+import json
+
+from helpers import run_build, sample_archive, tree
+
+
+def inodes(dist) -> dict:
+    root = dist.resolve()
+    return {p.relative_to(root).as_posix(): p.stat().st_ino for p in root.rglob("*") if p.is_file()}
+
+
+def test_rebuild_of_the_same_archive_changes_nothing(tmp_path):
+    first = run_build(sample_archive(), tmp_path / "dist", tmp_path / "cache")
+    before = inodes(tmp_path / "dist")
+    second = run_build(sample_archive(), tmp_path / "dist", tmp_path / "cache")
+
+    assert first["added"] and not (first["changed"] or first["deleted"])
+    assert (second["added"], second["changed"], second["deleted"]) == ({}, {}, {})
+    assert second["unchanged"] == len(first["added"])
+    # unchanged files are the previous generation's, hardlinked
+    assert inodes(tmp_path / "dist") == before
+
+
+def test_changes_json_lists_changed_and_deleted_files(tmp_path):
+    archive = sample_archive()
+    run_build(archive, tmp_path / "dist", tmp_path / "cache")
+    archive["logs"][0]["text"] += "\nOne more line."
+    gone = archive["logs"].pop()
+
+    changes = run_build(archive, tmp_path / "dist", tmp_path / "cache")
+
+    assert json.loads((tmp_path / "cache" / "changes.json").read_text(encoding="utf-8")) == changes
+    assert f"logs/2025/12/log-{archive['logs'][0]['id']}-{archive['logs'][0]['slug']}.html" in changes["changed"]
+    assert f"logs/2025/12/log-{gone['id']}-{gone['slug']}.html" in changes["deleted"]
+    assert not changes["added"]
+    files = tree(tmp_path / "dist")
+    assert all(rel_s in files for rel_s in changes["changed"])
+    assert not any(rel_s in files for rel_s in changes["deleted"])
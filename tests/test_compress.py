@@ -0,0 +1,47 @@
+"""--compress: precompressed siblings, reused while their source is unchanged."""
+
+import gzip
+
+import build
+from helpers import run_build, sample_archive, tree
+
+
+def log_rel(log: dict) -> str:
+    return f"logs/2025/12/log-{log['id']}-{log['slug']}.html"
+
+
+def sibling_inodes(dist) -> dict:
+    root = dist.resolve()
+    return {p.relative_to(root).as_posix(): p.stat().st_ino for p in root.rglob("*.gz")}
+
+
+def test_siblings_decompress_to_their_source(tmp_path):
+    run_build(sample_archive(), tmp_path / "dist", tmp_path / "cache", compress=True)
+    files = tree(tmp_path / "dist")
+
+    gz = [rel_s for rel_s in files if rel_s.endswith(".gz") and not rel_s.startswith("sitemaps/")]
+    assert "index.html.gz" in gz and "assets/css/style.css.gz" in gz
+    for rel_s in gz:
+        assert gzip.decompress(files[rel_s]) == files[rel_s[:-3]]
+    for rel_s in files:
+        assert not rel_s.endswith((".png.gz", ".jpg.gz", ".webp.gz"))
+
+
+def test_unchanged_siblings_are_reused(tmp_path, monkeypatch):
+    archive = sample_archive()
+    run_build(archive, tmp_path / "dist", tmp_path / "cache", compress=True)
+    before = sibling_inodes(tmp_path / "dist")
+    archive["logs"][0]["text"] += "\nOne more line."
+    edited, untouched = log_rel(archive["logs"][0]), log_rel(archive["logs"][1])
+
+    packed = []
+    real = gzip.compress
+    monkeypatch.setattr(build.gzip, "compress", lambda data, **kw: packed.append(data) or real(data, **kw))
+    run_build(archive, tmp_path / "dist", tmp_path / "cache", compress=True)
+
+    files = tree(tmp_path / "dist")
+    after = sibling_inodes(tmp_path / "dist")
+    assert after[untouched + ".gz"] == before[untouched + ".gz"]
+    assert after[edited + ".gz"] != before[edited + ".gz"]
+    assert gzip.decompress(files[edited + ".gz"]) == files[edited]
+    assert files[edited] in packed and files[untouched] not in packed
@@ -0,0 +1,70 @@
+"""--optimize-css: minifier, critical CSS selection, the inline budget."""
+
+import re
+
+import build
+from helpers import run_build, sample_archive, tree
+
+SHELL = """<html><head><link rel="stylesheet" href="/assets/css/style.css"></head>
+<body><div class="veil"></div><main class="shell"><h1 class="title">X</h1></main></body></html>"""
+
+
+def critical(css: str, kind: str = "log", max_bytes: int = None) -> tuple:
+    classes, ids, tags = build.markup_tokens(SHELL, kind)
+    return build.critical_css(build.parse_css_blocks(build.minify_css(css)), classes, ids, tags, max_bytes)
+
+
+def test_minify_keeps_strings():
+    css = '/* note */ a  >  b { content: "a  ;  b" ;  color:  red ; }\nul :hover{color: blue}'
+
+    # "ul :hover" (descendant) differs from "ul:hover", so a space before ":" is kept
+    assert build.minify_css(css) == 'a>b{content:"a  ;  b";color:red}ul :hover{color:blue}'
+
+
+def test_only_rules_the_shell_can_match():
+    css, over = critical(".shell{padding:1px}.absent{color:red}.shell .title{margin:0}h2{margin:0}"
+                         ".title:hover{color:red}@keyframes x{to{opacity:0}}")
+
+    assert css == ".shell{padding:1px}.shell .title{margin:0}"
+    assert over == 0
+
+
+def test_generated_markup_depends_on_the_page_kind():
+    rules = ".log-entry{color:red}.nav-prev{color:blue}"
+
+    assert critical(rules, "log")[0] == ".nav-prev{color:blue}"
+    assert critical(rules, "index")[0] == ".log-entry{color:red}"
+
+
+def test_decorative_overlays_are_left_out():
+    css, _ = critical(
+        ".veil{position:fixed;inset:0;pointer-events:none}.veil{background:red}.veil::before{content:\"x\"}"
+        ".shell::after{content:\"\";position:absolute;pointer-events:none}.shell::after,.title{color:red}"
+        ".shell{position:relative}.title{position:absolute;top:0}"
+        '.shell{background:url("data:image/png;base64,AAAA");color:red}'
+    )
+
+    assert css == ".title{color:red}.shell{position:relative}.title{position:absolute;top:0}.shell{color:red}"
+
+
+def test_rules_past_the_budget_stay_in_the_stylesheet():
+    rules = "".join(f".shell{{margin:{n}px}}" for n in range(100))
+    full, _ = critical(rules)
+
+    css, over = critical(rules, max_bytes=100)
+
+    assert len(css.encode()) <= 100 and full.startswith(css)
+    assert over == len(full.encode()) - len(css.encode())
+
+
+def test_inlined_css_fits_the_budget(tmp_path):
+    run_build(sample_archive(), tmp_path / "dist", tmp_path / "cache", optimize_css=True)
+    files = tree(tmp_path / "dist")
+
+    for rel_s in ("index.html", "archive.html", "logs/2025/12/log-01612-im-not-done.html"):
+        page = files[rel_s].decode()
+        inlined = re.search(r"<style>(.*?)</style>", page, re.S).group(1)
+        assert 0 < len(inlined.encode()) <= build.CRITICAL_CSS_MAX_BYTES
+        assert "ox500-bg-noise" not in inlined and "#ox500-bg::after" not in inlined
+        assert 'rel="preload" href="/assets/css/style.css" as="style"' in page
+        assert '<noscript><link rel="stylesheet" href="/assets/css/style.css"></noscript>' in page
@@ -0,0 +1,196 @@
+"""deploy() against an in-process S3 fake (http.server): what is uploaded, in which order, with which headers."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import build
+
+BUCKET = "site"
+
+
+class FakeS3(ThreadingHTTPServer):
+    """Objects in memory; every request is logged, fail[key] = n answers the next n requests with 503."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeS3Handler)
+        self.objects = {}  # key -> (body, headers)
+        self.log = []  # (method, key)
+        self.fail = {}
+        self.lock = threading.Lock()
+
+
+class FakeS3Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _key(self) -> str:
+        prefix = f"/{BUCKET}/"
+        assert self.path.startswith(prefix), self.path
+        return self.path[len(prefix):]
+
+    def _send(self, status: int, body: bytes = b"") -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, method: str) -> None:
+        key = self._key()
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        assert self.headers["Authorization"].startswith("AWS4-HMAC-SHA256 Credential=AKTEST/")
+        server = self.server
+        with server.lock:
+            server.log.append((method, key))
+            if server.fail.get(key):
+                server.fail[key] -= 1
+                self._send(503)
+                return
+            if method == "GET":
+                if key not in server.objects:
+                    self._send(404, b"<Error><Code>NoSuchKey</Code></Error>")
+                    return
+                self._send(200, server.objects[key][0])
+            elif method == "PUT":
+                server.objects[key] = (body, {k.lower(): v for k, v in self.headers.items()})
+                self._send(200)
+            else:
+                server.objects.pop(key, None)
+                self._send(204)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+@pytest.fixture
+def s3():
+    server = FakeS3()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(build.time, "sleep", lambda seconds: None)
+
+
+@pytest.fixture
+def client(s3):
+    return build.S3Client(f"http://127.0.0.1:{s3.server_address[1]}", BUCKET, access_key="AKTEST", secret_key="secret")
+
+
+@pytest.fixture
+def dist(tmp_path):
+    root = tmp_path / "dist"
+    files = {
+        "index.html": "<html>home</html>",
+        "index.html.gz": "gzip bytes",
+        "logs/one.html": "<html>one</html>",
+        "logs/two.html": "<html>two</html>",
+        "assets/css/style.abc123.css": "body{}",
+        "assets/js/search.js": "// search",
+        "assets/asset-map.json": json.dumps({"assets": {"/assets/css/style.css": "/assets/css/style.abc123.css"}}),
+        "sitemap.xml": "<urlset/>",
+        "feed.json": "{}",
+        "sw.js": "// worker",
+    }
+    for rel_s, text in files.items():
+        (root / rel_s).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel_s).write_text(text, encoding="utf-8")
+    return root
+
+
+def run_deploy(client, dist):
+    return build.deploy(client, dist, manifest_path=None, connections=4)
+
+
+def puts(s3):
+    return [key for method, key in s3.log if method == "PUT"]
+
+
+def test_first_deploy_uploads_in_waves_and_writes_the_manifest_last(s3, client, dist):
+    stats = run_deploy(client, dist)
+
+    assert stats["uploaded"] == 10 and stats["deleted"] == 0
+    uploaded = puts(s3)
+    assert uploaded[-1] == build.DEPLOY_MANIFEST_KEY
+    ranks = [build.deploy_rank(key) for key in uploaded[:-1]]
+    assert ranks == sorted(ranks)
+    assert set(uploaded[:-1]) == {p.relative_to(dist).as_posix() for p in dist.rglob("*") if p.is_file()}
+
+
+def test_object_headers(s3, client, dist):
+    run_deploy(client, dist)
+    headers = {key: h for key, (_, h) in s3.objects.items()}
+
+    assert headers["index.html"]["content-type"] == "text/html; charset=utf-8"
+    assert headers["index.html"]["cache-control"] == build.DEPLOY_CACHE_CONTROL
+    assert "content-encoding" not in headers["index.html"]
+    assert headers["index.html.gz"]["content-type"] == "text/html; charset=utf-8"
+    assert headers["index.html.gz"]["content-encoding"] == "gzip"
+    assert headers["assets/css/style.abc123.css"]["content-type"] == "text/css; charset=utf-8"
+    assert headers["assets/css/style.abc123.css"]["cache-control"] == build.DEPLOY_CACHE_IMMUTABLE
+    assert headers["sw.js"]["cache-control"] == build.DEPLOY_CACHE_NONE
+    assert headers["feed.json"]["content-type"] == "application/json"
+
+
+def test_unchanged_files_are_skipped(s3, client, dist):
+    run_deploy(client, dist)
+    s3.log.clear()
+
+    stats = run_deploy(client, dist)
+
+    assert stats == {"uploaded": 0, "deleted": 0, "unchanged": 10, "bytes": 0}
+    assert s3.log == [("GET", build.DEPLOY_MANIFEST_KEY)]
+
+
+def test_deletes_follow_uploads(s3, client, dist):
+    run_deploy(client, dist)
+    s3.log.clear()
+    (dist / "logs" / "one.html").write_text("<html>one, edited</html>", encoding="utf-8")
+    (dist / "logs" / "two.html").unlink()
+
+    stats = run_deploy(client, dist)
+
+    assert (stats["uploaded"], stats["deleted"]) == (1, 1)
+    assert s3.log[1:] == [
+        ("PUT", "logs/one.html"),
+        ("DELETE", "logs/two.html"),
+        ("PUT", build.DEPLOY_MANIFEST_KEY),
+    ]
+    assert "logs/two.html" not in s3.objects
+    assert s3.objects["logs/one.html"][0] == b"<html>one, edited</html>"
+
+
+def test_503_is_retried(s3, client, dist, no_backoff):
+    s3.fail["logs/one.html"] = 2
+
+    run_deploy(client, dist)
+
+    assert s3.log.count(("PUT", "logs/one.html")) == 3
+    assert s3.objects["logs/one.html"][0] == b"<html>one</html>"
+
+
+def test_a_failed_wave_stops_the_deploy(s3, client, dist, no_backoff):
+    s3.fail["assets/js/search.js"] = build.DEPLOY_RETRIES + 1
+
+    with pytest.raises(build.DeployError):
+        run_deploy(client, dist)
+
+    assert not [key for key in puts(s3) if build.deploy_rank(key) > 0]
+    assert build.DEPLOY_MANIFEST_KEY not in s3.objects
@@ -0,0 +1,52 @@
+"""--fingerprint: hashed asset names, assets/asset-map.json and retirement of superseded names."""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import build
+from helpers import sample_archive, tree
+
+STYLE = (build.ROOT / "style.css").read_text(encoding="utf-8")
+
+
+def fingerprint_build(tmp_path, style: str) -> tuple:
+    config = build.BuildConfig(archive=sample_archive(), sources={"style.css": style}, cache_dir=tmp_path / "cache")
+    build.build(config=config, output=build.DirectoryOutput(tmp_path / "dist"), fingerprint=True)
+    files = tree(tmp_path / "dist")
+    return files, json.loads(files["assets/asset-map.json"])
+
+
+def test_asset_map_and_hashed_references(tmp_path):
+    files, asset_map = fingerprint_build(tmp_path, STYLE)
+
+    css = asset_map["assets"]["/assets/css/style.css"]
+    sha = build.text_hash(files["assets/css/style.css"].decode())
+    assert css == "/" + build.fingerprint_name("assets/css/style.css", sha)
+    assert files[css[1:]] == files["assets/css/style.css"]
+    for hashed_url in asset_map["assets"].values():
+        assert hashed_url[1:] in files
+    assert f'href="{css}"'.encode() in files["index.html"]
+    assert b'href="/assets/css/style.css"' not in files["index.html"]
+    assert asset_map["retired"] == {}
+
+
+def test_superseded_names_are_kept_then_retired(tmp_path):
+    _, first = fingerprint_build(tmp_path, STYLE)
+    old_css = first["assets"]["/assets/css/style.css"]
+
+    files, second = fingerprint_build(tmp_path, STYLE + "\n.added{color:red}\n")
+
+    new_css = second["assets"]["/assets/css/style.css"]
+    today = datetime.now(timezone.utc).date()
+    assert new_css != old_css
+    assert second["retired"] == {old_css: today.isoformat()}
+    assert old_css[1:] in files and old_css.encode() not in files["index.html"]
+
+    # ASSET_RETENTION_DAYS later the old name goes
+    live_map = (tmp_path / "dist").resolve() / "assets" / "asset-map.json"
+    expired = (today - timedelta(days=build.ASSET_RETENTION_DAYS)).isoformat()
+    live_map.write_text(json.dumps({"assets": second["assets"], "retired": {old_css: expired}}), encoding="utf-8")
+    files, third = fingerprint_build(tmp_path, STYLE + "\n.added{color:red}\n")
+
+    assert third["retired"] == {}
+    assert old_css[1:] not in files and new_css[1:] in files
@@ -0,0 +1,43 @@
+"""Staged generations: dist/ is a symlink swapped per build; concurrent builds do not mix files."""
+
+import os
+
+from helpers import run_build, sample_archive, tree
+
+
+def test_dist_is_swapped_to_a_new_generation(tmp_path):
+    run_build(sample_archive(), tmp_path / "dist", tmp_path / "cache")
+    first = (tmp_path / "dist").resolve()
+    run_build(sample_archive(), tmp_path / "dist", tmp_path / "cache", incremental=True)
+
+    assert (tmp_path / "dist").is_symlink()
+    assert (tmp_path / "dist").resolve() != first
+    assert not list((tmp_path / ".dist-gens").glob("staging-*"))
+
+
+def test_manifest_of_another_generation_is_not_trusted(tmp_path):
+    archive = sample_archive()
+    run_build(archive, tmp_path / "dist", tmp_path / "cache")
+    # another build (its own cache) publishes different pages in between
+    edited = sample_archive()
+    for log in edited["logs"]:
+        log["text"] += "\nEdited elsewhere."
+    run_build(edited, tmp_path / "dist", tmp_path / "other-cache")
+
+    run_build(archive, tmp_path / "dist", tmp_path / "cache", incremental=True)
+    run_build(archive, tmp_path / "full", tmp_path / "full-cache")
+
+    assert tree(tmp_path / "dist") == tree(tmp_path / "full")
+
+
+def test_leftover_stages_of_dead_builds_are_removed(tmp_path):
+    run_build(sample_archive(), tmp_path / "dist", tmp_path / "cache")
+    dead = tmp_path / ".dist-gens" / "staging-999999999-abc"
+    dead.mkdir()
+    alive = tmp_path / ".dist-gens" / f"staging-{os.getpid()}-abc"
+    alive.mkdir()
+
+    run_build(sample_archive(), tmp_path / "dist", tmp_path / "cache")
+
+    assert not dead.exists()
+    assert alive.exists()
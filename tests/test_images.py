@@ -0,0 +1,48 @@
+"""--optimize-images: recompressed rasters, OG / logo variants and compact copies of large PNGs."""
+
+import io
+
+import pytest
+
+import build
+from helpers import sample_archive, tree
+
+Image = pytest.importorskip("PIL.Image")
+
+
+@pytest.fixture(scope="module")
+def site(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp("images")
+    style = (build.ROOT / "style.css").read_text(encoding="utf-8")
+    style += '.logo{background:url("/assets/img/Logo-ox500.png")}'
+    config = build.BuildConfig(archive=sample_archive(), sources={"style.css": style}, cache_dir=tmp_path / "cache")
+    build.build(config=config, output=build.DirectoryOutput(tmp_path / "dist"), optimize_images=True)
+    return tree(tmp_path / "dist")
+
+
+def size_of(data: bytes) -> tuple:
+    with Image.open(io.BytesIO(data)) as img:
+        return img.format, img.size
+
+
+def test_variants(site):
+    assert size_of(site["assets/img/Logo-ox500.og.jpg"]) == ("JPEG", (1200, 630))
+    fmt, (w, h) = size_of(site["assets/img/Logo-ox500.logo.webp"])
+    assert fmt == "WEBP" and max(w, h) == 512
+    assert b'og:image" content="https://ox500.com/assets/img/Logo-ox500.og.jpg"' in site["index.html"]
+
+
+def test_outputs_are_never_larger_than_their_source(site):
+    for rel_s in ("assets/img/Logo-ox500.png", "assets/img/og-image.jpg", "assets/bg/rebellion-surface.webp"):
+        assert len(site[rel_s]) <= (build.ROOT / rel_s).stat().st_size
+
+
+def test_large_png_gets_a_compact_webp_copy(site):
+    png, compact = site["assets/img/Logo-ox500.png"], site["assets/img/Logo-ox500.compact.webp"]
+
+    assert len(png) > build.IMAGE_COMPACT_MIN_BYTES
+    assert size_of(compact) == ("WEBP", size_of(png)[1])
+    assert len(compact) < len(png)
+    # small images get none
+    assert "assets/img/og-image.compact.webp" not in site
+    assert b'url("/assets/img/Logo-ox500.compact.webp")' in site["assets/css/style.css"]
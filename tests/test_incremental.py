@@ -0,0 +1,48 @@
+"""--incremental: a rebuild after each archive edit equals a full build of the edited archive."""
+
+import copy
+
+import pytest
+
+from helpers import ARCHIVE, run_build, tree
+
+
+def archive_versions() -> list:
+    """ARCHIVE, then one edit at a time: a log rewritten, a log moved to a new series, an older log added."""
+    versions = [ARCHIVE]
+    archive = copy.deepcopy(ARCHIVE)
+    archive["logs"][0]["text"] += "\nOne more line."
+    versions.append(copy.deepcopy(archive))
+    archive["logs"][1]["series"] = "DISRUPTION_SERIES // SECOND WAVE"
+    versions.append(copy.deepcopy(archive))
+    added = dict(archive["logs"][2], id="01600", slug="found-later", title="FOUND LATER", date="2025-11-30")
+    archive["logs"].append(added)
+    versions.append(archive)
+    return versions
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"page_size": 1, "search": True, "api": True},
+        {"fingerprint": True, "compress": True, "service_worker": True, "optimize_css": True},
+    ],
+    ids=["default", "paged-search-api", "fingerprint-compress-sw-css"],
+)
+def test_incremental_build_matches_full_build(tmp_path, options):
+    versions = archive_versions()
+    run_build(versions[0], tmp_path / "inc", tmp_path / "inc-cache", **options)
+    for n, archive in enumerate(versions[1:], 1):
+        changes = run_build(archive, tmp_path / "inc", tmp_path / "inc-cache", incremental=True, **options)
+        run_build(archive, tmp_path / f"full-{n}", tmp_path / f"full-{n}-cache", **options)
+
+        assert changes["changed"] and changes["unchanged"]
+        assert tree(tmp_path / "inc") == tree(tmp_path / f"full-{n}"), f"after edit {n}"
+
+
+def test_incremental_build_without_changes_renders_nothing(tmp_path):
+    run_build(ARCHIVE, tmp_path / "dist", tmp_path / "cache")
+    changes = run_build(ARCHIVE, tmp_path / "dist", tmp_path / "cache", incremental=True)
+
+    assert not (changes["added"] or changes["changed"] or changes["deleted"])
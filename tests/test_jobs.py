@@ -0,0 +1,10 @@
+"""--jobs: pages rendered on a process pool are the same pages."""
+
+from helpers import sample_archive, run_build, tree
+
+
+def test_parallel_build_matches_serial_build(tmp_path):
+    run_build(sample_archive(), tmp_path / "serial", tmp_path / "serial-cache")
+    run_build(sample_archive(), tmp_path / "parallel", tmp_path / "parallel-cache", jobs=2)
+
+    assert tree(tmp_path / "parallel") == tree(tmp_path / "serial")
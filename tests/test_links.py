@@ -0,0 +1,59 @@
+"""--check-links: internal links resolved against the outputs; a broken one fails the build."""
+
+import json
+
+import pytest
+
+import build
+from helpers import run_build, sample_archive, tree
+
+
+def load(path) -> dict:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def test_resolve_link():
+    page = "logs/2025/12/log-01612-im-not-done.html"
+
+    assert build.resolve_link(page, "/archive.html") == "archive.html"
+    assert build.resolve_link(page, "../../../index.html") == "index.html"
+    assert build.resolve_link(page, "log-01614-remember.html") == "logs/2025/12/log-01614-remember.html"
+    assert build.resolve_link(page, "/disruption/") == "disruption/"
+    assert build.resolve_link(page, "/") == ""
+    # the regexes cut fragments / queries, so "#top" arrives as ""
+    for url in ("", "https://example.com/a.html", "//cdn.example.com/x.js", "mailto:a@b.c", "data:image/png;base64,"):
+        assert build.resolve_link(page, url) is None
+
+
+def test_link_exists():
+    produced = {"index.html", "archive.html", "disruption/index.html"}
+
+    assert build.link_exists("", produced)
+    assert build.link_exists("disruption/", produced) and build.link_exists("disruption", produced)
+    assert not build.link_exists("logs/", produced)
+
+
+def test_clean_site(tmp_path):
+    report_path = tmp_path / "links.json"
+    run_build(sample_archive(), tmp_path / "dist", tmp_path / "cache", fingerprint=True, check_links=report_path)
+    report = load(report_path)
+
+    assert report["broken_count"] == 0 and report["links"] > 0
+    assert report["scanned"] == len([r for r in tree(tmp_path / "dist") if r.endswith(build.LINK_SCANNED_SUFFIXES)])
+
+
+def test_broken_link_fails_and_keeps_the_live_generation(tmp_path):
+    dist, cache, report_path = tmp_path / "dist", tmp_path / "cache", tmp_path / "links.json"
+    run_build(sample_archive(), dist, cache)
+    live = tree(dist)
+    template = (build.ROOT / "template-log.html").read_text(encoding="utf-8")
+    template = template.replace("</body>", '<a href="/logs/missing.html">gone</a><img src="../gone.png"></body>')
+    config = build.BuildConfig(archive=sample_archive(), sources={"template-log.html": template}, cache_dir=cache)
+
+    with pytest.raises(build.LinkError, match="6 broken internal link"):
+        build.build(config=config, output=build.DirectoryOutput(dist), check_links=report_path)
+
+    broken = load(report_path)["broken"]
+    assert {b["target"] for b in broken} == {"/logs/missing.html", "/logs/2025/gone.png"}
+    assert {b["page"] for b in broken} == {r for r in live if r.startswith("logs/")}
+    assert tree(dist) == live
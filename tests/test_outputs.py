@@ -0,0 +1,91 @@
+"""Memory and archive outputs (--output zip / tar): the same files as a directory build."""
+
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+import build
+from helpers import run_build, sample_archive, tree
+
+OPTIONS = {"fingerprint": True, "api": True, "search": True}
+
+
+@pytest.fixture(scope="module")
+def expected(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("directory")
+    run_build(sample_archive(), tmp / "dist", tmp / "cache", **OPTIONS)
+    return tree(tmp / "dist")
+
+
+def run_output(output, **options) -> dict:
+    config = build.BuildConfig(archive=sample_archive(), cache_dir=None)
+    return build.build(config=config, output=output, **{**OPTIONS, **options})
+
+
+class Pipe(io.RawIOBase):
+    """Write-only, not seekable: what a build streaming into stdout or an upload sees."""
+
+    def __init__(self):
+        self.buf = io.BytesIO()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self.buf.write(data)
+
+
+def untar(data: bytes) -> dict:
+    with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+        return {m.name: tar.extractfile(m).read() for m in tar.getmembers()}
+
+
+def unzip(data: bytes) -> dict:
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        return {name: zf.read(name) for name in zf.namelist()}
+
+
+def test_memory(expected):
+    output = build.MemoryOutput()
+    run_output(output)
+
+    assert output.files == expected
+
+
+@pytest.mark.parametrize("fmt", ["tar", "tar.gz", "tar.xz"])
+def test_tar(tmp_path, expected, fmt):
+    path = tmp_path / f"site.{fmt}"
+    run_output(build.ArchiveOutput(path))
+
+    assert untar(path.read_bytes()) == expected
+    with tarfile.open(path) as tar:
+        hashed = [m for m in tar.getmembers() if m.islnk()]
+    # --fingerprint names are hardlinks, not second copies
+    assert hashed and all(m.linkname in expected for m in hashed)
+
+
+def test_zip(tmp_path, expected):
+    path = tmp_path / "site.zip"
+    run_output(build.ArchiveOutput(path))
+
+    assert unzip(path.read_bytes()) == expected
+
+
+@pytest.mark.parametrize("fmt, unpack", [("tar.gz", untar), ("zip", unzip)])
+def test_archive_into_a_pipe(expected, fmt, unpack):
+    pipe = Pipe()
+    run_output(build.ArchiveOutput(pipe, fmt=fmt))
+
+    assert unpack(pipe.buf.getvalue()) == expected
+
+
+def test_archive_cannot_be_compressed(tmp_path):
+    with pytest.raises(ValueError, match="read back"):
+        run_output(build.ArchiveOutput(tmp_path / "site.zip"), compress=True)
+
+
+def test_unknown_archive_format(tmp_path):
+    with pytest.raises(ValueError, match="unknown archive format"):
+        build.ArchiveOutput(tmp_path / "site.rar", fmt="rar")
@@ -0,0 +1,62 @@
+"""--page-size: archive and disruption node listings split into pages, every log listed once."""
+
+import json
+import re
+
+import pytest
+
+import bench
+import build
+from helpers import run_build, tree
+
+
+@pytest.fixture
+def archive(tmp_path):
+    path = tmp_path / "generated.json"
+    bench.generate_archive(path, 7, disruptions=1, future=0)
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def listed_ids(page: bytes) -> list:
+    return re.findall(r'<span class="log-id">LOG: (\d+)</span>', page.decode())
+
+
+def test_archive_pages(tmp_path, archive):
+    run_build(archive, tmp_path / "dist", tmp_path / "cache", page_size=3)
+    files = tree(tmp_path / "dist")
+
+    pages = ["archive.html", "archive/page/2.html", "archive/page/3.html"]
+    assert sorted(rel_s for rel_s in files if rel_s.startswith("archive")) == sorted(pages)
+    ids = [listed_ids(files[rel_s]) for rel_s in pages]
+    assert [len(i) for i in ids] == [3, 3, 1]
+    # newest first, each log once
+    assert sum(ids, []) == [log["id"] for log in reversed(archive["logs"])]
+    assert b'<link rel="next" href="https://ox500.com/archive/page/2.html" />' in files["archive.html"]
+    assert b'<link rel="prev" href="https://ox500.com/archive/page/2.html" />' in files["archive/page/3.html"]
+    assert b'rel="next"' not in files["archive/page/3.html"]
+
+
+def test_node_pages(tmp_path, archive):
+    run_build(archive, tmp_path / "dist", tmp_path / "cache", page_size=4)
+    files = tree(tmp_path / "dist")
+
+    node = [rel_s for rel_s in files if rel_s.startswith("disruption/") and rel_s.count("/") == 1]
+    assert len(node) == 1
+    second = node[0][: -len(".html")] + "/page/2.html"
+    assert len(listed_ids(files[node[0]])) == 4 and len(listed_ids(files[second])) == 3
+
+
+def test_page_size_zero_is_one_page(tmp_path, archive):
+    run_build(archive, tmp_path / "dist", tmp_path / "cache", page_size=0)
+    files = tree(tmp_path / "dist")
+
+    assert not [rel_s for rel_s in files if "/page/" in rel_s]
+    assert len(listed_ids(files["archive.html"])) == 7
+
+
+def test_negative_page_size_is_rejected(tmp_path, archive, capsys):
+    with pytest.raises(ValueError, match="page_size"):
+        run_build(archive, tmp_path / "dist", tmp_path / "cache", page_size=-1)
+    with pytest.raises(SystemExit):
+        build.main(["build", "--page-size", "-1"])
+    assert "--page-size must be 0 (no pagination) or more" in capsys.readouterr().err
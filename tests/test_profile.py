@@ -0,0 +1,35 @@
+"""--profile: phases, and bytes written counting only what was actually written."""
+
+import json
+
+from helpers import run_build, sample_archive, tree
+
+
+def phases(report_path) -> dict:
+    return {p["phase"]: p for p in json.loads(report_path.read_text(encoding="utf-8"))["phases"]}
+
+
+def test_phases_and_written_bytes(tmp_path):
+    report = tmp_path / "profile.json"
+    run_build(sample_archive(), tmp_path / "dist", tmp_path / "cache", fingerprint=True, profile=report)
+    files = tree(tmp_path / "dist")
+    by_phase = phases(report)
+
+    assert {"assets", "css", "fingerprint", "render", "sitemap", "publish"} <= set(by_phase)
+    # a first build writes every file once; hashed names are links to those files
+    hashed = {url.lstrip("/") for url in json.loads(files["assets/asset-map.json"])["assets"].values()}
+    written = sum(len(data) for rel_s, data in files.items() if rel_s not in hashed)
+    assert sum(p["bytes_written"] for p in by_phase.values()) == written
+
+
+def test_hashed_aliases_are_linked_not_written(tmp_path):
+    report = tmp_path / "profile.json"
+    run_build(sample_archive(), tmp_path / "dist", tmp_path / "cache", fingerprint=True, profile=report)
+    files = tree(tmp_path / "dist")
+    asset_map = json.loads(files["assets/asset-map.json"])["assets"]
+    fp = phases(report)["fingerprint"]
+
+    # one link per hashed name; the only file written is asset-map.json itself
+    assert fp["linked"] == len(asset_map)
+    assert (fp["written"], fp["bytes_written"]) == (1, len(files["assets/asset-map.json"]))
+    assert phases(report)["css"]["bytes_written"] == len(files["assets/css/style.css"]) + len(files["style.css"])
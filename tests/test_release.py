@@ -0,0 +1,114 @@
+"""--if-needed: the release stamp, scheduled logs going live, and one date per build."""
+
+import json
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+import build
+from helpers import run_build, sample_archive, tree
+
+STYLE_EDIT = "\nbody { outline: 0; }\n"
+
+
+def clock(days: int = 0, step: int = 0):
+    """build.datetime whose now() is `days` ahead, moving on `step` days at every call."""
+    calls = []
+
+    class Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            calls.append(None)
+            return super().now(tz) + timedelta(days=days + step * (len(calls) - 1))
+
+    return Clock
+
+
+def today(days: int = 0) -> str:
+    """The real UTC date `days` ahead (build.datetime may be a patched clock)."""
+    return (datetime.now(timezone.utc).date() + timedelta(days=days)).isoformat()
+
+
+def stamp(cache) -> dict:
+    return json.loads((cache / "release.json").read_text(encoding="utf-8"))
+
+
+@pytest.fixture
+def archive():
+    """The sample archive plus a log scheduled three days ahead."""
+    archive = sample_archive()
+    archive["logs"].append(dict(archive["logs"][-1], id="01620", slug="scheduled", date=today(3)))
+    return archive
+
+
+def test_build_needed():
+    built = {"input_key": "k", "built_on": "2025-12-07", "rebuild_on": "2025-12-10"}
+
+    assert not build.build_needed(built, "k", "2025-12-07")
+    assert not build.build_needed(built, "k", "2025-12-09")
+    assert build.build_needed(built, "k", "2025-12-10")  # a scheduled log is due
+    assert build.build_needed(built, "other", "2025-12-08")  # inputs changed
+    assert build.build_needed(built, "k", "2025-12-06")  # clock moved backwards
+    assert not build.build_needed(dict(built, rebuild_on=None), "k", "2099-01-01")
+    assert build.build_needed({}, "k", "2025-12-07")
+
+
+def test_unchanged_inputs_skip_the_build(tmp_path, archive):
+    dist, cache = tmp_path / "dist", tmp_path / "cache"
+    first = run_build(archive, dist, cache, if_needed=True)
+    live = dist.resolve()
+
+    second = run_build(archive, dist, cache, if_needed=True)
+
+    assert (second["added"], second["changed"], second["deleted"]) == ({}, {}, {})
+    assert second["unchanged"] == len(first["added"]) == stamp(cache)["files"]
+    assert dist.resolve() == live
+
+    archive["logs"][0]["text"] += "\nOne more line."
+    third = run_build(archive, dist, cache, if_needed=True)
+    assert third["changed"] and dist.resolve() != live
+
+
+def test_options_are_part_of_the_stamp(tmp_path, archive):
+    dist, cache = tmp_path / "dist", tmp_path / "cache"
+    run_build(archive, dist, cache, if_needed=True)
+
+    changes = run_build(archive, dist, cache, if_needed=True, api=True)
+
+    assert "api/index.json" in changes["added"]
+
+
+def test_scheduled_log_goes_live_on_its_day(tmp_path, archive, monkeypatch):
+    dist, cache = tmp_path / "dist", tmp_path / "cache"
+    run_build(archive, dist, cache, if_needed=True)
+    scheduled = "logs/" + today(3)[:7].replace("-", "/") + "/log-01620-scheduled.html"
+
+    assert stamp(cache)["next_release"] == stamp(cache)["rebuild_on"] == today(3)
+    assert scheduled not in tree(dist)
+
+    monkeypatch.setattr(build, "datetime", clock(days=2))
+    assert run_build(archive, dist, cache, if_needed=True)["added"] == {}
+
+    monkeypatch.setattr(build, "datetime", clock(days=3))
+    changes = run_build(archive, dist, cache, if_needed=True)
+    assert scheduled in changes["added"] and scheduled in tree(dist)
+    assert stamp(cache)["built_on"] == today(3) and stamp(cache)["next_release"] is None
+
+
+def test_one_date_per_build(tmp_path, monkeypatch):
+    """A build running past midnight dates retired assets and the release stamp alike."""
+    dist, cache = tmp_path / "dist", tmp_path / "cache"
+    run_build(sample_archive(), dist, cache, fingerprint=True)
+    style = (build.ROOT / "style.css").read_text(encoding="utf-8") + STYLE_EDIT
+    config = build.BuildConfig(archive=sample_archive(), sources={"style.css": style}, cache_dir=cache)
+
+    # every datetime.now() call is a day later than the one before
+    monkeypatch.setattr(build, "datetime", clock(step=1))
+    build.build(config=config, output=build.DirectoryOutput(dist), fingerprint=True)
+
+    built_on = stamp(cache)["built_on"]
+    retired = json.loads(tree(dist)["assets/asset-map.json"])["retired"]
+    assert built_on == today()
+    assert retired and set(retired.values()) == {built_on}
+    retention = timedelta(days=build.ASSET_RETENTION_DAYS)
+    assert stamp(cache)["rebuild_on"] == (date.fromisoformat(built_on) + retention).isoformat()
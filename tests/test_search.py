@@ -0,0 +1,73 @@
+"""--search: term shards, document blocks and the search box."""
+
+import json
+
+import build
+from helpers import run_build, sample_archive, tree
+
+
+def two_logs() -> dict:
+    archive = sample_archive()
+    first, second = archive["logs"][0], archive["logs"][1]
+    first.update(id="00007", title="STATIC ROOM", excerpt="static", text="The static hums. Static again.")
+    second.update(id="01500", title="ÉCHO", excerpt="room", text="Nothing but an echo in the room.")
+    archive["logs"] = [first, second]
+    return archive
+
+
+def test_search_terms():
+    log = {"title": "I’m Static", "excerpt": "static noise", "text": "The static and the NOISE, it's a_b"}
+
+    assert build.search_terms(log) == {"im": 3, "static": 6, "noise": 3, "its": 1}
+
+
+def test_shard_names():
+    assert build.search_shard_name("static") == "st"
+    assert build.search_shard_name("écho") == "ue9-63"
+
+
+def test_shards_and_documents(tmp_path):
+    run_build(two_logs(), tmp_path / "dist", tmp_path / "cache", search=True)
+    files = tree(tmp_path / "dist")
+
+    def load(rel_s: str):
+        return json.loads(files[rel_s])
+
+    meta = load("search/meta.json")
+    assert meta["docs"] == 2 and meta["prefix_len"] == build.SEARCH_PREFIX_LEN
+    assert {f"search/t/{name}.json" for name in meta["shards"]} == {r for r in files if r.startswith("search/t/")}
+    # best match first: title + excerpt + text beats text alone
+    assert load("search/t/st.json")["static"] == [7, 3 + 2 + 2]
+    assert load("search/t/ro.json")["room"] == [1500, 2 + 1, 7, 3]  # ties: newest id first
+    assert load("search/t/ue9-63.json")["écho"] == [1500, 3]
+    assert not any("the" in load(rel_s) for rel_s in files if rel_s.startswith("search/t/"))  # stopword
+    docs = load("search/d/0.json") | load("search/d/1.json")
+    assert docs["7"][0] == "STATIC ROOM" and docs["1500"][0] == "ÉCHO"
+    assert docs["7"][1].endswith("/log-00007-im-not-done.html")
+
+
+def test_search_box_and_script_only_with_search(tmp_path):
+    run_build(two_logs(), tmp_path / "plain", tmp_path / "plain-cache")
+    run_build(two_logs(), tmp_path / "search", tmp_path / "search-cache", search=True)
+    plain, search = tree(tmp_path / "plain"), tree(tmp_path / "search")
+
+    assert "assets/js/search.js" not in plain and b"data-ox500-search" not in plain["index.html"]
+    assert "assets/js/search.js" in search
+    for rel_s in ("index.html", "archive.html"):
+        page = search[rel_s].decode()
+        assert page.index("</header>") < page.index("data-ox500-search")
+        assert '<script src="/assets/js/search.js" defer></script>' in page
+
+
+def test_only_edited_logs_are_tokenized(tmp_path, monkeypatch):
+    archive = two_logs()
+    run_build(archive, tmp_path / "dist", tmp_path / "cache", search=True)
+    archive["logs"][1]["text"] += " Another room."
+    tokenized = []
+    terms = build.search_terms
+    monkeypatch.setattr(build, "search_terms", lambda log: tokenized.append(log["id"]) or terms(log))
+
+    run_build(archive, tmp_path / "dist", tmp_path / "cache", search=True, incremental=True)
+
+    assert tokenized == ["01500"]
+    assert json.loads(tree(tmp_path / "dist")["search/t/ro.json"])["room"] == [1500, 4, 7, 3]
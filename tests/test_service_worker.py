@@ -0,0 +1,61 @@
+"""--service-worker: /sw.js precaches the page shell by content hash, every page registers it."""
+
+import hashlib
+import json
+import re
+
+import build
+from helpers import run_build, sample_archive, tree
+
+STYLE_EDIT = "\nbody { outline: 0; }\n"
+
+
+def precache(files: dict) -> dict:
+    m = re.search(r"const PRECACHE = (\{.*?\});", files["sw.js"].decode(), re.S)
+    return json.loads(m.group(1))
+
+
+def build_with_sw(tmp_path, name: str, sources: dict = None, **options) -> dict:
+    config = build.BuildConfig(archive=sample_archive(), sources=sources, cache_dir=tmp_path / f"{name}-cache")
+    dist = tmp_path / name
+    build.build(config=config, output=build.DirectoryOutput(dist), service_worker=True, **options)
+    return tree(dist)
+
+
+def test_no_worker_without_the_flag(tmp_path):
+    run_build(sample_archive(), tmp_path / "dist", tmp_path / "cache")
+    files = tree(tmp_path / "dist")
+
+    assert "sw.js" not in files
+    assert not any(b"serviceWorker" in data for rel_s, data in files.items() if rel_s.endswith(".html"))
+
+
+def test_precache_lists_the_shell_with_content_hashes(tmp_path):
+    files = build_with_sw(tmp_path, "dist")
+    entries = precache(files)
+
+    assert {"/assets/css/style.css", "/favicon.ico"} <= set(entries)
+    for url, rev in entries.items():
+        rel_s = url[1:]
+        assert not rel_s.endswith(".html") and rel_s != "sw.js"
+        assert rev == hashlib.sha256(files[rel_s]).hexdigest()[: build.SW_HASH_LEN]
+    pages = [data for rel_s, data in files.items() if rel_s.endswith(".html")]
+    assert pages and all(b'navigator.serviceWorker.register("/sw.js")' in data for data in pages)
+
+
+def test_precache_uses_fingerprinted_names(tmp_path):
+    files = build_with_sw(tmp_path, "dist", fingerprint=True)
+    hashed = json.loads(files["assets/asset-map.json"])["assets"]
+
+    assert set(precache(files)) <= set(hashed.values()) | {"/favicon.ico"}
+    assert hashed["/assets/css/style.css"] in precache(files)
+
+
+def test_a_stylesheet_edit_changes_only_its_entry(tmp_path):
+    before = precache(build_with_sw(tmp_path, "before"))
+    style = (build.ROOT / "style.css").read_text(encoding="utf-8") + STYLE_EDIT
+    after = precache(build_with_sw(tmp_path, "after", sources={"style.css": style}))
+
+    changed = {url for url in before if before[url] != after.get(url)}
+    assert changed == {"/assets/css/style.css"}
+    assert set(after) == set(before)
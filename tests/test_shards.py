@@ -0,0 +1,54 @@
+"""Sharded sources: logs.json plus logs/*.json build the same site as one logs.json."""
+
+import json
+
+import pytest
+
+import bench
+from helpers import run_tree_build, source_tree, tree
+
+
+def write_json(path, data) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+
+@pytest.fixture
+def archive(tmp_path):
+    path = tmp_path / "generated.json"
+    bench.generate_archive(path, 40, disruptions=3, future=0)
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("stream", [False, True], ids=["full", "stream"])
+def test_sharded_build_matches_single_file_build(tmp_path, archive, stream):
+    single = source_tree(tmp_path / "single")
+    write_json(single / "logs.json", archive)
+    sharded = source_tree(tmp_path / "sharded")
+    logs = archive["logs"]
+    write_json(sharded / "logs.json", {"site": archive["site"], "logs": logs[:10]})
+    # shards in any order, without a site block of their own
+    write_json(sharded / "logs" / "b.json", {"logs": logs[10:25]})
+    write_json(sharded / "logs" / "a.json", {"logs": logs[25:]})
+
+    run_tree_build(single, tmp_path / "single-dist", tmp_path / "single-cache")
+    run_tree_build(sharded, tmp_path / "sharded-dist", tmp_path / "sharded-cache", stream=stream)
+
+    assert tree(tmp_path / "sharded-dist") == tree(tmp_path / "single-dist")
+
+
+def test_duplicate_ids_across_shards_fail(tmp_path, archive):
+    root = source_tree(tmp_path / "src")
+    write_json(root / "logs.json", archive)
+    write_json(root / "logs" / "extra.json", {"logs": archive["logs"][:1]})
+
+    with pytest.raises(ValueError, match="duplicate log id 00001"):
+        run_tree_build(root, tmp_path / "dist", tmp_path / "cache")
+
+
+def test_shards_without_a_site_block_fail(tmp_path, archive):
+    root = source_tree(tmp_path / "src")
+    write_json(root / "logs" / "only.json", {"logs": archive["logs"]})
+
+    with pytest.raises(ValueError, match='only.json: missing "site" block'):
+        run_tree_build(root, tmp_path / "dist", tmp_path / "cache")
@@ -0,0 +1,103 @@
+"""sitemap.xml: an index of sitemaps/ children split at the URL / byte limits, rewritten only when URLs move."""
+
+import gzip
+import json
+import re
+
+import bench
+import build
+from helpers import run_build, sample_archive, tree
+
+
+def sitemap_entries(n: int):
+    return ((f"https://example.com/p/{i:04d}.html", f"2025-01-{1 + i % 28:02d}", "0.8") for i in range(n))
+
+
+def locs(xml: bytes) -> list:
+    return re.findall(r"<loc>(.*?)</loc>", xml.decode())
+
+
+def written(output) -> dict:
+    return {rel_s: output.read(rel_s) for rel_s in output.files}
+
+
+def test_children_split_at_the_url_limit(monkeypatch):
+    monkeypatch.setattr(build, "SITEMAP_MAX_URLS", 10)
+    output = build.MemoryOutput()
+    output.begin()
+
+    results = build.write_sitemap_children("pages", sitemap_entries(25), output)
+    children = [(rel.as_posix(), lastmod) for _, rel, lastmod in results]
+
+    assert [rel_s for rel_s, _ in children] == ["sitemaps/pages.xml", "sitemaps/pages-2.xml", "sitemaps/pages-3.xml"]
+    files = written(output)
+    assert [len(locs(files[rel_s])) for rel_s, _ in children] == [10, 10, 5]
+    assert sum((locs(files[rel_s]) for rel_s, _ in children), []) == [loc for loc, _, _ in sitemap_entries(25)]
+    assert children[0][1] == "2025-01-10"
+
+
+def test_children_split_at_the_byte_limit(monkeypatch):
+    entry = len(build.sitemap_url_entry(*next(sitemap_entries(1))).encode())
+    limit = len(build.SITEMAP_URLSET_HEAD) + 4 * entry + len(build.SITEMAP_URLSET_TAIL)
+    monkeypatch.setattr(build, "SITEMAP_MAX_BYTES", limit)
+    output = build.MemoryOutput()
+    output.begin()
+
+    children = [rel.as_posix() for _, rel, _ in build.write_sitemap_children("pages", sitemap_entries(9), output)]
+
+    files = written(output)
+    assert [len(locs(files[rel_s])) for rel_s in children] == [4, 4, 1]
+    assert all(len(files[rel_s]) <= limit for rel_s in children)
+
+
+def test_gzipped_children():
+    output = build.MemoryOutput()
+    output.begin()
+
+    (result, rel, _), = build.write_sitemap_children("pages", sitemap_entries(3), output, gzipped=True)
+
+    assert rel.as_posix() == "sitemaps/pages.xml.gz"
+    assert len(locs(gzip.decompress(output.read(rel.as_posix())))) == 3
+
+
+def test_index_lists_every_child(tmp_path):
+    path = tmp_path / "generated.json"
+    bench.generate_archive(path, 30, disruptions=2, years=(2024, 2024), future=0)
+    run_build(json.loads(path.read_text(encoding="utf-8")), tmp_path / "dist", tmp_path / "cache")
+    files = tree(tmp_path / "dist")
+
+    children = locs(files["sitemap.xml"])
+    assert children[0] == "https://ox500.com/sitemaps/pages.xml"
+    assert {c.removeprefix("https://ox500.com/") for c in children} == {r for r in files if r.startswith("sitemaps/")}
+    urls = sum((locs(files[c.removeprefix("https://ox500.com/")]) for c in children), [])
+    assert len(urls) == len(set(urls)) == 30 + 1 + 2 + 1  # logs, home, two nodes, archive
+
+
+def test_sitemaps_are_not_rewritten_for_a_text_edit_or_a_new_day(tmp_path, monkeypatch):
+    archive = sample_archive()
+    run_build(archive, tmp_path / "dist", tmp_path / "cache")
+    archive["logs"][0]["text"] += "\nOne more line."
+
+    class Tomorrow(build.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return super().now(tz) + build.timedelta(days=1)
+
+    rendered = []
+    write_children = build.write_sitemap_children
+
+    def counted(name, *args):
+        rendered.append(name)
+        return write_children(name, *args)
+
+    monkeypatch.setattr(build, "datetime", Tomorrow)
+    monkeypatch.setattr(build, "write_sitemap_children", counted)
+    changes = run_build(archive, tmp_path / "dist", tmp_path / "cache", incremental=True)
+
+    assert changes["changed"] and rendered == []
+    assert (tmp_path / "dist" / "sitemap.xml").exists()
+
+    # a new log moves URLs: everything is rendered again
+    archive["logs"].append(dict(archive["logs"][0], id="01620", slug="new"))
+    run_build(archive, tmp_path / "dist", tmp_path / "cache", incremental=True)
+    assert "pages" in rendered
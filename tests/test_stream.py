@@ -0,0 +1,28 @@
+"""--stream: the two-pass build that re-reads log bodies from disk writes the same site."""
+
+import bench
+from helpers import run_tree_build, source_tree, tree
+
+
+def test_streamed_build_matches_full_build(tmp_path):
+    root = source_tree(tmp_path / "src")
+    bench.generate_archive(root / "logs.json", 60, disruptions=4, future=0)
+
+    run_tree_build(root, tmp_path / "full", tmp_path / "full-cache")
+    run_tree_build(root, tmp_path / "streamed", tmp_path / "streamed-cache", stream=True)
+
+    full = tree(tmp_path / "full")
+    assert sum(rel_s.startswith("logs/") for rel_s in full) == 60
+    assert tree(tmp_path / "streamed") == full
+
+
+def test_streamed_incremental_build_matches_full_build(tmp_path):
+    root = source_tree(tmp_path / "src")
+    bench.generate_archive(root / "logs.json", 60, disruptions=4, future=0)
+    run_tree_build(root, tmp_path / "streamed", tmp_path / "streamed-cache", stream=True)
+    bench.generate_archive(root / "logs.json", 61, disruptions=4, future=0, seed=2)
+
+    run_tree_build(root, tmp_path / "streamed", tmp_path / "streamed-cache", stream=True, incremental=True)
+    run_tree_build(root, tmp_path / "full", tmp_path / "full-cache")
+
+    assert tree(tmp_path / "streamed") == tree(tmp_path / "full")
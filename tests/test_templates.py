@@ -0,0 +1,32 @@
+"""Template placeholder errors."""
+
+import pytest
+
+import build
+from helpers import sample_archive
+
+
+def test_unknown_placeholder():
+    with pytest.raises(build.TemplateError, match=r"page\.html: unknown placeholders \{\{NOPE\}\}"):
+        build.compile_template("<p>{{LANG}} {{NOPE}}</p>", "page.html", {"LANG"})
+
+
+def test_missing_required_placeholder():
+    with pytest.raises(build.TemplateError, match=r"missing required \{\{JSONLD\}\}"):
+        build.compile_template("<p>{{LANG}}</p>", "page.html", {"LANG", "JSONLD"}, {"JSONLD"})
+
+
+def test_render_without_a_value():
+    tpl = build.compile_template("<p>{{LANG}}</p>", "page.html", {"LANG"})
+
+    assert build.render(tpl, {"LANG": "en"}) == "<p>en</p>"
+    with pytest.raises(build.TemplateError, match=r"page\.html: no value for \{\{LANG\}\}"):
+        build.render(tpl, {})
+
+
+def test_a_bad_template_fails_the_build(tmp_path):
+    source = (build.ROOT / "template-log.html").read_text(encoding="utf-8").replace("{{LOG_ID}}", "{{LOG_NUMBER}}")
+    config = build.BuildConfig(archive=sample_archive(), sources={"template-log.html": source}, cache_dir=None)
+
+    with pytest.raises(build.TemplateError, match=r"template-log\.html: unknown placeholders \{\{LOG_NUMBER\}\}"):
+        build.build(config=config, output=build.DirectoryOutput(tmp_path / "dist"))